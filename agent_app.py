@@ -8,10 +8,13 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-import requests
 from datetime import datetime
 import os
 
+from utils.agent_snapshot import AgentSnapshot
+from utils.analytics_worker import AnalyticsWorker, trends_job, stability_job, rolling_stability_job
+from utils.chat_facts import ChatFacts
+
 # Konfigurace
 st.set_page_config(
     page_title="AI Agent - Tekro",
@@ -23,54 +26,57 @@ st.set_page_config(
 # API URL - konfigurovatelná přes environment variable nebo sidebar
 DEFAULT_API_URL = os.environ.get("TEKRO_API_URL", "http://localhost:8888")
 
+# Složka lokálních snímků dat (Parquet) - data jsou po restartu hned k dispozici
+SNAPSHOT_DIR = os.environ.get("TEKRO_AGENT_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "agent_cache"))
+
+
+@st.cache_resource
+def get_snapshot(api_url: str) -> AgentSnapshot:
+    """Lokální snímek dat pro URL API (sdílený všemi session)"""
+    return AgentSnapshot(api_url, SNAPSHOT_DIR, max_age=3600)
+
 
-@st.cache_data(ttl=3600)  # Cache na 1 hodinu (3600 sekund)
-def fetch_all_data(api_url: str) -> dict:
-    """Načte všechna data z API a rozdělí podle typu"""
-    try:
-        response = requests.get(f"{api_url}/data", timeout=30)
-        response.raise_for_status()
-        all_records = response.json()
-
-        # Rozdělit podle _type
-        data = {
-            "businesses": [],
-            "crops": [],
-            "fields": [],
-            "pozemky": [],
-            "varieties_seed": [],
-            "sbernamista": [],
-            "sbernasrazky": [],
-            "typpozemek": [],
-            "roky": [],
-            "sumplodiny": [],
-            "userpodniky": [],
-            "odpisy": []
-        }
-
-        for record in all_records:
-            record_type = record.pop("_type", None)
-            if record_type and record_type in data:
-                data[record_type].append(record)
-
-        # Konvertovat na DataFrame
-        result = {}
-        for key, records in data.items():
-            if records:
-                result[key] = pd.DataFrame(records)
-            else:
-                result[key] = pd.DataFrame()
-
-        result["_last_update"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        result["_status"] = "ok"
-        return result
-
-    except requests.exceptions.RequestException as e:
-        return {
-            "_status": "error",
-            "_error": str(e),
-            "_last_update": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+@st.cache_resource
+def get_worker() -> AnalyticsWorker:
+    """Pool procesů pro těžké analýzy (výsledky ve složce snímků)"""
+    return AnalyticsWorker(os.path.join(SNAPSHOT_DIR, "analytics"))
+
+
+@st.fragment(run_every=1)
+def show_progress(key: str, label: str):
+    """Průběh úlohy - překresluje jen sebe, po dokončení celou stránku"""
+    status = get_worker().status(key)
+    if status['state'] != 'running':
+        st.rerun()
+    st.progress(status['progress'], text=f"{label}: {status['message']}" if status['message'] else label)
+
+
+def run_analysis(label: str, kind: str, params: tuple, func, *args):
+    """
+    Výsledek analýzy z workeru; dokud se počítá, zobrazí průběh a vrátí None
+
+    Args:
+        label: Popis pro ukazatel průběhu
+        kind: Druh úlohy
+        params: Hodnoty, na kterých výsledek závisí (vždy včetně verze dat)
+        func, args: Úloha z utils.analytics_worker a její data
+    """
+    worker = get_worker()
+    key = worker.submit(kind, params, func, *args)
+    status = worker.status(key)
+    if status['state'] == 'done':
+        return worker.result(key)
+    if status['state'] == 'error':
+        st.error(f"{label} selhal: {status['error']}")
+        return None
+    show_progress(key, label)
+    return None
+
+
+@st.cache_resource(max_entries=2)
+def get_chat_facts(version: str, _fields: pd.DataFrame, _crops: pd.DataFrame, _businesses: pd.DataFrame) -> ChatFacts:
+    """Předpočítané odpovědi chatu pro jednu verzi dat"""
+    return ChatFacts(_fields, _crops, _businesses)
 
 
 def main():
@@ -82,21 +88,32 @@ def main():
         st.header("Konfigurace")
         api_url = st.text_input("API URL", value=DEFAULT_API_URL)
 
+        snapshot = get_snapshot(api_url)
+
         if st.button("🔄 Obnovit data"):
-            st.cache_data.clear()
+            with st.spinner("Kontrola změn v API..."):
+                snapshot.refresh()
             st.rerun()
 
         st.divider()
 
-        # Načtení dat
-        data = fetch_all_data(api_url)
+        # Načtení dat - ze snímku, první spuštění stáhne data z API
+        data = snapshot.get()
+        if data is None:
+            with st.spinner("Stahování dat z API..."):
+                snapshot.refresh()
+            data = snapshot.get()
+        else:
+            snapshot.refresh_async()
 
-        if data.get("_status") == "error":
-            st.error(f"Chyba: {data.get('_error')}")
+        if data is None:
+            st.error(f"Chyba: {snapshot.error}")
             st.stop()
 
         st.success(f"Data načtena: {data.get('_last_update')}")
-        st.caption("Automatická aktualizace každou hodinu")
+        if snapshot.error:
+            st.warning(f"Obnova z API selhala, zobrazen uložený snímek ({snapshot.error})")
+        st.caption(f"Poslední kontrola změn: {data.get('_checked_at')} · automaticky každou hodinu na pozadí")
 
         # Statistiky
         st.divider()
@@ -275,60 +292,67 @@ def render_trend_forecast(data: dict):
 
     fields = data.get("fields", pd.DataFrame())
     crops = data.get("crops", pd.DataFrame())
+    businesses = data.get("businesses", pd.DataFrame())
+    varieties = data.get("varieties_seed", pd.DataFrame())
 
     if fields.empty or crops.empty:
         st.warning("Žádná data k dispozici")
         return
 
-    col1, col2 = st.columns(2)
+    trends = run_analysis("Výpočet trendů", "trends", (data.get("_version", ""),), trends_job, fields)
+    if trends is None:
+        return
+
+    col1, col2, col3 = st.columns(3)
 
     with col1:
         selected_crop = st.selectbox("Plodina", crops['nazev'].tolist(), key="forecast_crop")
 
     with col2:
+        series_type = st.radio("Řada", ["Celkem", "Podle podniku", "Podle odrůdy"], horizontal=True, key="forecast_series")
+
+    with col3:
         forecast_years = st.slider("Roky predikce", 1, 5, 2)
 
-    # Data pro plodinu
     crop_id = crops[crops['nazev'] == selected_crop]['id'].iloc[0]
-    crop_fields = fields[fields['plodina_id'] == crop_id].copy()
+    level, member = 'plodina', {}
+
+    if series_type != "Celkem":
+        level = 'podnik' if series_type == "Podle podniku" else 'odruda'
+        names = businesses if level == 'podnik' else varieties
+        names = names.set_index('id')['nazev'] if not names.empty else pd.Series(dtype=str)
+        member_ids = trends.members(level, crop_id)
+        if not member_ids:
+            st.info("Pro vybranou plodinu nejsou řady s alespoň 2 roky")
+            return
+        member_id = st.selectbox("Podnik" if level == 'podnik' else "Odrůda", member_ids,
+                                 format_func=lambda i: names.get(i, f"ID {i}"), key=f"forecast_{level}")
+        member = {f"{level}_id": member_id}
+        series_label = f"{selected_crop} - {names.get(member_id, f'ID {member_id}')}"
+    else:
+        series_label = selected_crop
 
-    if crop_fields.empty or 'rok_sklizne' not in crop_fields.columns:
+    yearly = trends.history(level, crop_id, **member)
+    if yearly.empty:
         st.info("Žádná data pro vybranou plodinu")
         return
 
-    # Agregace
-    yearly = crop_fields.groupby('rok_sklizne').agg({
-        'vymera': 'sum',
-        'cista_vaha': 'sum'
-    }).reset_index()
-    yearly['vynos'] = yearly['cista_vaha'] / yearly['vymera']
-    yearly = yearly.sort_values('rok_sklizne')
-
-    if len(yearly) < 2:
+    trend = trends.trend(level, crop_id, **member)
+    if trend is None:
         st.warning("Nedostatek dat pro predikci (potřeba min. 2 roky)")
         return
 
-    # Lineární regrese
-    x = yearly['rok_sklizne'].values
-    y = yearly['vynos'].values
-
-    x_mean, y_mean = np.mean(x), np.mean(y)
-    slope = np.sum((x - x_mean) * (y - y_mean)) / np.sum((x - x_mean) ** 2)
-    intercept = y_mean - slope * x_mean
-
-    # Predikce
-    last_year = int(max(x))
-    future_years = np.array([last_year + i for i in range(1, forecast_years + 1)])
-    future_values = slope * future_years + intercept
-
-    residuals = y - (slope * x + intercept)
-    std_error = np.std(residuals)
+    slope, intercept = trend['slope'], trend['intercept']
+    pred = trends.forecast(trend, forecast_years)
+    x = yearly['rok'].values
+    future_years = pred['Rok'].values
+    future_values = pred['Predikce'].values
 
     # Graf
     fig = go.Figure()
 
     fig.add_trace(go.Scatter(
-        x=yearly['rok_sklizne'], y=yearly['vynos'],
+        x=yearly['rok'], y=yearly['vynos'],
         mode='markers+lines', name='Historická data',
         line=dict(color='#2E86AB', width=2), marker=dict(size=10)
     ))
@@ -349,16 +373,16 @@ def render_trend_forecast(data: dict):
         marker=dict(size=12, color='#C73E1D', symbol='star')
     ))
 
-    # Interval spolehlivosti
+    # Predikční interval
     fig.add_trace(go.Scatter(
         x=np.concatenate([future_years, future_years[::-1]]),
-        y=np.concatenate([future_values + 1.96*std_error, (future_values - 1.96*std_error)[::-1]]),
+        y=np.concatenate([pred['Max'].values, pred['Min'].values[::-1]]),
         fill='toself', fillcolor='rgba(199, 62, 29, 0.2)',
         line=dict(color='rgba(255,255,255,0)'), name='95% interval'
     ))
 
     fig.update_layout(
-        title=f'Predikce výnosu: {selected_crop}',
+        title=f'Predikce výnosu: {series_label}',
         xaxis_title='Rok', yaxis_title='Výnos (t/ha)',
         legend=dict(orientation='h', yanchor='bottom', y=1.02)
     )
@@ -371,18 +395,25 @@ def render_trend_forecast(data: dict):
     with col2:
         st.metric("Změna za rok", f"{slope:+.3f} t/ha")
     with col3:
-        r_sq = 1 - (np.sum(residuals**2) / np.sum((y - y_mean)**2)) if np.sum((y - y_mean)**2) > 0 else 0
-        st.metric("R²", f"{r_sq:.2%}")
+        st.metric("R²", f"{trend['r2']:.2%}")
 
     # Tabulka
     pred_df = pd.DataFrame({
-        'Rok': future_years.astype(int),
-        'Predikce (t/ha)': future_values.round(2),
-        'Min (95%)': (future_values - 1.96*std_error).round(2),
-        'Max (95%)': (future_values + 1.96*std_error).round(2)
+        'Rok': pred['Rok'],
+        'Predikce (t/ha)': pred['Predikce'].round(2),
+        'Min (95%)': pred['Min'].round(2),
+        'Max (95%)': pred['Max'].round(2)
     })
     st.dataframe(pred_df, use_container_width=True, hide_index=True)
 
+    # Srovnání trendů všech plodin z téže tabulky koeficientů
+    with st.expander("Trendy všech plodin"):
+        overview = trends.overview('plodina')
+        overview['Plodina'] = overview['plodina_id'].map(crops.set_index('id')['nazev'])
+        overview = overview.rename(columns={'n': 'Roky', 'last_year': 'Poslední rok', 'slope': 'Změna za rok (t/ha)', 'r2': 'R²'})
+        overview = overview[['Plodina', 'Roky', 'Poslední rok', 'Změna za rok (t/ha)', 'R²']].sort_values('Změna za rok (t/ha)')
+        st.dataframe(overview.round(3), use_container_width=True, hide_index=True)
+
 
 def render_stability_analysis(data: dict):
     """Analýza stability výnosů"""
@@ -395,40 +426,36 @@ def render_stability_analysis(data: dict):
         st.warning("Žádná data k dispozici")
         return
 
-    # Příprava dat
-    df = fields.copy()
-    if 'nazev_honu' in df.columns:
-        df['pole'] = df['nazev_honu'].fillna('Pole ' + df['id'].astype(str))
-    else:
-        df['pole'] = 'Pole ' + df['id'].astype(str)
+    # Linie polí z API - starší API je nemá, spočítají se v úloze z polí
+    lineage = data.get("field_lineage", pd.DataFrame())
+    version = data.get("_version", "")
+    all_years = []
+    if 'rok_sklizne' in fields.columns:
+        all_years = sorted(int(y) for y in pd.to_numeric(fields['rok_sklizne'], errors='coerce').dropna().unique())
 
-    if not crops.empty:
-        df = df.merge(crops[['id', 'nazev']], left_on='plodina_id', right_on='id', how='left', suffixes=('', '_crop'))
-        df['plodina'] = df['nazev'].fillna('Neznámá')
-    else:
-        df['plodina'] = 'Neznámá'
-
-    df['vynos'] = df['cista_vaha'] / df['vymera']
-
-    # Výpočet stability
-    stability = []
-    for (pole, plodina), group in df.groupby(['pole', 'plodina']):
-        yields = group['vynos'].dropna()
-        if len(yields) >= 2:
-            mean_y = yields.mean()
-            cv = (yields.std() / mean_y * 100) if mean_y > 0 else 0
-            stability.append({
-                'Pole': pole, 'Plodina': plodina, 'Roky': len(yields),
-                'Průměr': mean_y, 'CV (%)': cv,
-                'Min': yields.min(), 'Max': yields.max()
-            })
-
-    if not stability:
+    # Výběr období a vážení
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        if len(all_years) > 1:
+            year_range = st.select_slider("Roky sklizně", options=all_years,
+                                          value=(all_years[0], all_years[-1]), key="stab_years")
+        else:
+            year_range = (all_years[0], all_years[-1]) if all_years else (None, None)
+    with col2:
+        weighted = st.checkbox("Vážit výměrou", key="stab_weighted")
+
+    years = None
+    if all_years and year_range != (all_years[0], all_years[-1]):
+        years = [y for y in all_years if year_range[0] <= y <= year_range[1]]
+
+    stab_df = run_analysis("Výpočet stability", "stability", (version, years, weighted),
+                           stability_job, fields, crops, lineage, years, weighted)
+    if stab_df is None:
+        return
+    if stab_df.empty:
         st.info("Nedostatek dat pro analýzu stability")
         return
 
-    stab_df = pd.DataFrame(stability).sort_values('CV (%)', ascending=False)
-
     # Filtry
     col1, col2 = st.columns(2)
     with col1:
@@ -440,10 +467,10 @@ def render_stability_analysis(data: dict):
     top = stab_df.head(top_n)
     fig = go.Figure()
     fig.add_trace(go.Bar(
-        y=[f"{r['Pole']}<br>({r['Plodina']})" for _, r in top.iterrows()],
+        y=top['Pole'].astype(str) + '<br>(' + top['Plodina'].astype(str) + ')',
         x=top['CV (%)'],
         orientation='h',
-        marker_color=['#C73E1D' if cv > cv_threshold else '#2E86AB' for cv in top['CV (%)']],
+        marker_color=np.where(top['CV (%)'] > cv_threshold, '#C73E1D', '#2E86AB'),
         text=top['CV (%)'].round(1),
         textposition='outside'
     ))
@@ -469,6 +496,23 @@ def render_stability_analysis(data: dict):
     display['Max'] = display['Max'].round(2)
     st.dataframe(display, use_container_width=True, hide_index=True)
 
+    # Vývoj variability v klouzavém okně
+    with st.expander("Vývoj variability (klouzavé okno)"):
+        window = st.slider("Okno (sezóny)", 2, 10, 3, key="stab_window")
+        rolling = run_analysis("Klouzavé okno", "rolling", (version, window, weighted),
+                               rolling_stability_job, fields, crops, lineage, window, weighted)
+        if rolling is None:
+            pass
+        elif rolling.empty:
+            st.info("Nedostatek dat pro klouzavé okno")
+        else:
+            trend = rolling.groupby('Rok')['CV (%)'].agg(['mean', 'median']).reset_index()
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=trend['Rok'], y=trend['mean'], mode='lines+markers', name='Průměrné CV'))
+            fig.add_trace(go.Scatter(x=trend['Rok'], y=trend['median'], mode='lines+markers', name='Medián CV'))
+            fig.update_layout(title=f'Variabilita výnosů za posledních {window} sezón', xaxis_title='Rok', yaxis_title='CV (%)')
+            st.plotly_chart(fig, use_container_width=True)
+
 
 def render_chat(data: dict):
     """Chat s AI agentem"""
@@ -476,6 +520,9 @@ def render_chat(data: dict):
 
     st.info("Prototyp konverzačního rozhraní. V produkci bude napojeno na ChatGPT/Claude API.")
 
+    facts = get_chat_facts(data.get("_version", ""), data.get("fields", pd.DataFrame()),
+                           data.get("crops", pd.DataFrame()), data.get("businesses", pd.DataFrame()))
+
     # Historie
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
@@ -489,7 +536,7 @@ def render_chat(data: dict):
         st.session_state.chat_history.append({"role": "user", "content": prompt})
 
         # Generování odpovědi
-        response = generate_response(prompt, data)
+        response = generate_response(prompt, facts)
         st.session_state.chat_history.append({"role": "assistant", "content": response})
         st.rerun()
 
@@ -508,7 +555,7 @@ def render_chat(data: dict):
     for i, q in enumerate(queries):
         if cols[i].button(q):
             st.session_state.chat_history.append({"role": "user", "content": q})
-            response = generate_response(q, data)
+            response = generate_response(q, facts)
             st.session_state.chat_history.append({"role": "assistant", "content": response})
             st.rerun()
 
@@ -517,44 +564,67 @@ def render_chat(data: dict):
         st.rerun()
 
 
-def generate_response(query: str, data: dict) -> str:
-    """Generuje odpověď na dotaz"""
-    fields = data.get("fields", pd.DataFrame())
+def generate_response(query: str, facts: ChatFacts) -> str:
+    """Generuje odpověď na dotaz z předpočítaných faktů (plodinu, podnik a rok bere z textu dotazu)"""
     q = query.lower()
-
-    if "průměr" in q or "vynos" in q or "výnos" in q:
-        if not fields.empty and 'vymera' in fields.columns and 'cista_vaha' in fields.columns:
-            area = fields['vymera'].sum()
-            prod = fields['cista_vaha'].sum()
-            avg = prod / area if area > 0 else 0
-            return f"**Průměrný výnos:** {avg:.2f} t/ha\n\nCelková výměra: {area:,.0f} ha\nCelková produkce: {prod:,.0f} t"
+    default = f"Rozumím dotazu: *{query}*\n\nZkuste:\n- Průměrný výnos?\n- Nejlepší pole?\n- Trend výnosů?\n- Doporuč odrůdy\n- Výnos podniku Zbiroh?\n- Nejlepší pole 2024?"
+    if "doporuč" in q or "odrůd" in q:
+        return "**Doporučení:**\n\n1. Analyzujte historická data v záložce 'Analýza výnosů'\n2. Identifikujte stabilní pole v 'Stabilita výnosů'\n3. Používejte predikce pro plánování"
+    if facts.empty:
+        return default
+
+    crop_id, year = facts.match_crop(q), facts.match_year(q)
+    crop_label = f" - {facts.crop_names[crop_id]}" if crop_id is not None else ""
+    year_label = f" ({year})" if year is not None else ""
+
+    # Trend před průměrem - "Trend výnosů?" obsahuje i "výnos"
+    if "trend" in q:
+        yearly = facts.year_series(crop_id)
+        if len(yearly) >= 2:
+            first, last = yearly.iloc[0], yearly.iloc[-1]
+            change = last['vynos'] - first['vynos']
+            trend = "rostoucí" if change > 0 else "klesající" if change < 0 else "stabilní"
+            return f"**Trend výnosů{crop_label}:** {trend}\n\n{int(first['rok'])}: {first['vynos']:.2f} t/ha\n{int(last['rok'])}: {last['vynos']:.2f} t/ha\nZměna: {change:+.2f} t/ha"
 
     elif "nejlep" in q or "top" in q:
-        if not fields.empty:
-            df = fields.copy()
-            df['vynos'] = df['cista_vaha'] / df['vymera']
-            top = df.nlargest(5, 'vynos')
-            result = "**TOP 5 polí podle výnosu:**\n\n"
-            for i, (_, r) in enumerate(top.iterrows(), 1):
-                name = r.get('nazev_honu', f"Pole {r['id']}")
-                result += f"{i}. {name} - {r['vynos']:.2f} t/ha\n"
+        top = facts.top_fields(crop_id, year)
+        if top:
+            result = f"**TOP {len(top)} polí podle výnosu{crop_label}{year_label}:**\n\n"
+            for i, (name, vynos) in enumerate(top, 1):
+                result += f"{i}. {name} - {vynos:.2f} t/ha\n"
             return result
 
-    elif "trend" in q:
-        if not fields.empty and 'rok_sklizne' in fields.columns:
-            yearly = fields.groupby('rok_sklizne').agg({'vymera': 'sum', 'cista_vaha': 'sum'}).reset_index()
-            yearly['vynos'] = yearly['cista_vaha'] / yearly['vymera']
-            if len(yearly) >= 2:
-                first, last = yearly.iloc[0], yearly.iloc[-1]
-                change = last['vynos'] - first['vynos']
-                trend = "rostoucí" if change > 0 else "klesající" if change < 0 else "stabilní"
-                return f"**Trend výnosů:** {trend}\n\n{int(first['rok_sklizne'])}: {first['vynos']:.2f} t/ha\n{int(last['rok_sklizne'])}: {last['vynos']:.2f} t/ha\nZměna: {change:+.2f} t/ha"
-
-    elif "doporuč" in q or "odrůd" in q:
-        return "**Doporučení:**\n\n1. Analyzujte historická data v záložce 'Analýza výnosů'\n2. Identifikujte stabilní pole v 'Stabilita výnosů'\n3. Používejte predikce pro plánování"
+    elif "podnik" in q or facts.match_business(q) is not None:
+        business_id = facts.match_business(q)
+        if business_id is not None and business_id in facts.businesses:
+            b = facts.businesses[business_id]
+            return (f"**Podnik {facts.business_names[business_id]}:**\n\n"
+                    f"Průměrný výnos: {b['vynos']:.2f} t/ha\nVýměra: {b['vymera']:,.0f} ha\n"
+                    f"Produkce: {b['cista_vaha']:,.0f} t\nZáznamů polí: {b['zaznamu']}, plodin: {b['plodin']}")
+        ranking = sorted(facts.businesses.items(), key=lambda item: item[1]['vynos'], reverse=True)
+        if ranking:
+            result = "**Podniky podle průměrného výnosu:**\n\n"
+            for i, (business_id, b) in enumerate(ranking, 1):
+                name = facts.business_names.get(business_id, f"Podnik {business_id}")
+                result += f"{i}. {name} - {b['vynos']:.2f} t/ha ({b['vymera']:,.0f} ha)\n"
+            return result
 
-    return f"Rozumím dotazu: *{query}*\n\nZkuste:\n- Průměrný výnos?\n- Nejlepší pole?\n- Trend výnosů?\n- Doporuč odrůdy"
+    elif "průměr" in q or "vynos" in q or "výnos" in q:
+        if year is not None:
+            yearly = facts.year_series(crop_id)
+            row = yearly[yearly['rok'] == year]
+            if row.empty:
+                return f"Pro rok {year}{crop_label} nejsou data."
+            area, prod = row['vymera'].iloc[0], row['cista_vaha'].iloc[0]
+        elif crop_id is not None:
+            yearly = facts.year_series(crop_id)
+            area, prod = yearly['vymera'].sum(), yearly['cista_vaha'].sum()
+        else:
+            area, prod = facts.totals['vymera'], facts.totals['cista_vaha']
+        avg = prod / area if area > 0 else 0
+        return f"**Průměrný výnos{crop_label}{year_label}:** {avg:.2f} t/ha\n\nCelková výměra: {area:,.0f} ha\nCelková produkce: {prod:,.0f} t"
 
+    return default
 
 if __name__ == "__main__":
     main()
@@ -2,16 +2,41 @@
 API endpoint pro veřejný přístup k datům
 Spuštění: uvicorn api:app --reload --port 8000
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 import pandas as pd
 import os
+import json
+import hashlib
 from typing import Optional
 
+from utils.partitioned_table import read_table, table_exists, table_version
+from utils.field_lineage import LINEAGE_FILE, FieldLineage
+
 # Cesta k datům
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 
+# Datové sady v /data: typ záznamu (_type) -> CSV soubor
+DATASETS = {
+    "businesses": "businesses.csv",
+    "crops": "crops.csv",
+    "fields": "fields.csv",
+    "pozemky": "pozemky.csv",
+    "varieties_seed": "varieties_seed.csv",
+    "sbernamista": "sbernamista.csv",
+    "sbernasrazky": "sbernasrazky.csv",
+    "typpozemek": "typpozemek.csv",
+    "roky": "roky.csv",
+    "sumplodiny": "sumplodiny.csv",
+    "userpodniky": "userpodniky.csv",
+    "odpisy": "odpisy.csv",
+    "field_lineage": LINEAGE_FILE
+}
+
+# Linie polí - API je jen čte, řádky polí, které aplikace ještě nezařadila, doplní v paměti
+lineage = FieldLineage(os.path.join(DATA_DIR, LINEAGE_FILE))
+
 app = FastAPI(
     title="Tekro Sklizeň API",
     description="Veřejné API pro přístup k zemědělským datům",
@@ -28,12 +53,30 @@ app.add_middleware(
 )
 
 
+def read_dataset(filename: str) -> Optional[pd.DataFrame]:
+    """Tabulka datové sady (None, pokud neexistuje); linie polí bez zápisu na disk"""
+    if filename == LINEAGE_FILE:
+        if not table_exists(DATA_DIR, 'fields.csv'):
+            return None
+        return lineage.refresh(DATA_DIR, save=False)
+    if not table_exists(DATA_DIR, filename):
+        return None
+    return read_table(DATA_DIR, filename)
+
+
+def dataset_version(filename: str) -> Optional[str]:
+    """Verze datové sady - linie polí závisí i na verzi tabulky polí"""
+    if filename == LINEAGE_FILE:
+        fields_version = table_version(DATA_DIR, 'fields.csv')
+        return f"{table_version(DATA_DIR, LINEAGE_FILE)}/{fields_version}" if fields_version else None
+    return table_version(DATA_DIR, filename)
+
+
 def load_csv_as_dict(filename: str) -> list:
     """Načte CSV soubor a vrátí jako seznam slovníků"""
     try:
-        filepath = os.path.join(DATA_DIR, filename)
-        if os.path.exists(filepath):
-            df = pd.read_csv(filepath)
+        df = read_dataset(filename)
+        if df is not None:
             # Nahradit NaN a Inf hodnotami None pro JSON kompatibilitu
             df = df.replace([float('inf'), float('-inf')], None)
             # Konverze na Python typy (nahradí numpy NaN za None)
@@ -54,6 +97,27 @@ def load_csv_as_dict(filename: str) -> list:
         return [{"error": str(e)}]
 
 
+def dataset_versions() -> dict:
+    """Verze datových sad (mění se s každým zápisem souboru)"""
+    return {data_type: dataset_version(filename) for data_type, filename in DATASETS.items()}
+
+
+def versions_etag(versions: dict) -> str:
+    """ETag ze značek verzí - klient s aktuálními daty dostane 304"""
+    digest = hashlib.sha1(json.dumps(versions, sort_keys=True).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def load_csv_as_columns(filename: str) -> dict:
+    """Načte CSV soubor a vrátí sloupce jako seznamy hodnot (None místo NaN a Inf)"""
+    df = read_dataset(filename)
+    if df is None:
+        return {}
+    df = df.replace([float('inf'), float('-inf')], None)
+    df = df.astype(object).where(df.notna(), None)
+    return {col: df[col].tolist() for col in df.columns}
+
+
 @app.get("/")
 def root():
     """Hlavní endpoint s informacemi o API"""
@@ -61,7 +125,8 @@ def root():
         "name": "Tekro Sklizeň API",
         "version": "1.0.0",
         "endpoints": {
-            "/data": "Všechna data v jednom JSON objektu",
+            "/data": "Všechna data v jednom JSON objektu (?types=fields,crops jen vybrané sady, ?layout=columns po sloupcích)",
+            "/data/versions": "Verze datových sad (podmíněně přes If-None-Match)",
             "/data/businesses": "Seznam podniků",
             "/data/crops": "Seznam plodin",
             "/data/fields": "Data o polích a sklizni",
@@ -72,31 +137,56 @@ def root():
             "/data/typpozemek": "Typy pozemků",
             "/data/roky": "Roky",
             "/data/sumplodiny": "Souhrn plodin",
-            "/data/odpisy": "Odpisy (prodeje)"
+            "/data/odpisy": "Odpisy (prodeje)",
+            "/data/field_lineage": "Linie polí - stabilní klíč pole napříč sezónami"
         }
     }
 
 
+@app.get("/data/versions")
+def get_data_versions(request: Request, response: Response):
+    """
+    Vrátí verze datových sad
+
+    Klient pošle ETag z minulé odpovědi v If-None-Match a při beze změny
+    dostane prázdnou odpověď 304; jinak si stáhne jen sady se změněnou verzí.
+    """
+    versions = dataset_versions()
+    etag = versions_etag(versions)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return versions
+
+
 @app.get("/data")
-def get_all_data():
-    """Vrátí všechna data jako jeden JSON objekt - pole záznamů"""
+def get_all_data(request: Request, response: Response, types: Optional[str] = None,
+                 layout: str = "records"):
+    """
+    Vrátí všechna data jako jeden JSON objekt - pole záznamů
+
+    Args:
+        types: Jen vybrané datové sady oddělené čárkou (např. fields,crops)
+        layout: "records" = pole záznamů s _type, "columns" = {sada: {sloupec: [hodnoty]}}
+    """
     all_records = []
 
-    # Načtení všech datových zdrojů
-    datasets = {
-        "businesses": "businesses.csv",
-        "crops": "crops.csv",
-        "fields": "fields.csv",
-        "pozemky": "pozemky.csv",
-        "varieties_seed": "varieties_seed.csv",
-        "sbernamista": "sbernamista.csv",
-        "sbernasrazky": "sbernasrazky.csv",
-        "typpozemek": "typpozemek.csv",
-        "roky": "roky.csv",
-        "sumplodiny": "sumplodiny.csv",
-        "userpodniky": "userpodniky.csv",
-        "odpisy": "odpisy.csv"
-    }
+    datasets = DATASETS
+    if types:
+        wanted = {t.strip() for t in types.split(",")}
+        datasets = {data_type: filename for data_type, filename in DATASETS.items() if data_type in wanted}
+
+    # Podmíněný dotaz - data se neposílají, pokud se od ETagu klienta nezměnila
+    etag = versions_etag({data_type: dataset_version(filename) for data_type, filename in datasets.items()})
+    if layout == "columns":
+        etag = etag[:-1] + '-columns"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    # Sloupcový tvar - menší odpověď a klient nestaví tabulky po záznamech
+    if layout == "columns":
+        return {data_type: load_csv_as_columns(filename) for data_type, filename in datasets.items()}
 
     for data_type, filename in datasets.items():
         records = load_csv_as_dict(filename)
@@ -133,14 +223,11 @@ def get_fields(
         business_id: Filtr podle ID podniku
         crop_id: Filtr podle ID plodiny
     """
-    filepath = os.path.join(DATA_DIR, "fields.csv")
-    if not os.path.exists(filepath):
+    if not table_exists(DATA_DIR, "fields.csv"):
         return []
 
-    df = pd.read_csv(filepath)
-
-    if year is not None and 'rok_sklizne' in df.columns:
-        df = df[df['rok_sklizne'] == year]
+    # Pole uložená po rocích - načte se jen oddíl požadovaného roku
+    df = read_table(DATA_DIR, "fields.csv", years=[year] if year is not None else None)
 
     if business_id is not None and 'podnik_id' in df.columns:
         df = df[df['podnik_id'] == business_id]
@@ -215,6 +302,12 @@ def get_odpisy(year: Optional[int] = None):
     return df.to_dict(orient='records')
 
 
+@app.get("/data/field_lineage")
+def get_field_lineage():
+    """Vrátí linie polí (id pole -> pole_key)"""
+    return load_csv_as_dict(LINEAGE_FILE)
+
+
 @app.get("/stats/summary")
 def get_summary_stats():
     """Vrátí souhrnné statistiky"""
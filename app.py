@@ -59,11 +59,12 @@ def show_login_page():
                 else:
                     st.error("Nesprávné uživatelské jméno nebo heslo")
 
-        st.info("💡 Demo přístupy:\n- Admin: adminpetr\n- Editor: agronom\n- Watcher: zemedelec")
+        if config.AUTH_DEMO:
+            st.info("💡 Demo přístupy (jakékoliv heslo):\n- Admin: adminpetr\n- Editor: agronom\n- Watcher: zemedelec")
 
 
-def fetch_and_save_rain(biz_id: int, sensor_addr: str, dm, use_yesterday: bool = False) -> tuple[bool, str, float | None]:
-    """Stáhne a uloží srážky pro podnik. Vrací (success, message, rain_mm)
+def fetch_rain(sensor_addr: str, use_yesterday: bool = False) -> dict:
+    """Stáhne počasí z meteostanice. Vrací dict z agdata_api (případně s klíčem 'error')
 
     Args:
         use_yesterday: Pokud True, stáhne včerejší data (pro automatické stahování v 5:00)
@@ -71,9 +72,17 @@ def fetch_and_save_rain(biz_id: int, sensor_addr: str, dm, use_yesterday: bool =
     from utils.agdata_api import get_today_weather, get_yesterday_weather
 
     if use_yesterday:
-        weather = get_yesterday_weather(sensor_addr)
-    else:
-        weather = get_today_weather(sensor_addr, fallback_yesterday=False)
+        return get_yesterday_weather(sensor_addr)
+    return get_today_weather(sensor_addr, fallback_yesterday=False)
+
+
+def fetch_and_save_rain(biz_id: int, sensor_addr: str, dm, use_yesterday: bool = False) -> tuple[bool, str, float | None]:
+    """Stáhne a uloží srážky pro podnik. Vrací (success, message, rain_mm)
+
+    Args:
+        use_yesterday: Pokud True, stáhne včerejší data (pro automatické stahování v 5:00)
+    """
+    weather = fetch_rain(sensor_addr, use_yesterday)
 
     if 'error' in weather:
         return False, f"Chyba: {weather['error']}", None
@@ -85,37 +94,16 @@ def fetch_and_save_rain(biz_id: int, sensor_addr: str, dm, use_yesterday: bool =
     # Použít datum z API (může být včerejší pokud dnešní data nejsou k dispozici)
     api_date = weather.get('date')
 
-    # Zkontrolovat, zda už existuje záznam pro toto datum
-    srazky_df = dm.get_sbernasrazky()
-    today_str = api_date
+    result = dm.upsert_sbernasrazky([{'PodnikID': biz_id, 'Datum': api_date, 'Objem': rain}])
+    if not result:
+        return False, f"{api_date}: chyba při ukládání", rain
 
-    existing = srazky_df[
-        (srazky_df['PodnikID'] == biz_id) &
-        (srazky_df['Datum'].astype(str) == today_str)
-    ]
+    # Uložit kompletní počasí (teplota, vlhkost, surové metriky) - až po srážkách
+    if api_date:
+        dm.save_weather([{**weather, 'podnik_id': biz_id}])
 
-    if not existing.empty:
-        # Aktualizovat existující záznam
-        idx = existing.index[0]
-        srazky_df.loc[idx, 'Objem'] = rain
-        dm.save_sbernasrazky(srazky_df)
+    if result['updated']:
         return True, f"{api_date}: {rain:.1f} mm (aktualizováno)", rain
-
-    # Přidat nový záznam
-    misto_mapping = {1: 30, 2: 29, 3: 28, 4: 27, 5: 26, 6: 25, 8: 42, 9: 43}
-    misto_id = misto_mapping.get(int(biz_id), 30)
-
-    new_id = srazky_df['id'].max() + 1 if not srazky_df.empty else 1
-    new_row = {
-        'id': new_id,
-        'MistoID': misto_id,
-        'PodnikID': biz_id,
-        'Datum': today_str,
-        'Objem': rain
-    }
-    srazky_df = pd.concat([srazky_df, pd.DataFrame([new_row])], ignore_index=True)
-    dm.save_sbernasrazky(srazky_df)
-
     return True, f"{api_date}: {rain:.1f} mm", rain
 
 
@@ -162,8 +150,23 @@ def check_auto_fetch():
             st.toast("Automatické stahování srážek z předchozího dne...", icon="🌧️")
 
     if should_fetch:
-        for _, biz in businesses_with_sensor.iterrows():
-            fetch_and_save_rain(int(biz['id']), biz['sensor_addr'], dm, use_yesterday=True)
+        # Stáhnout všechny stanice a uložit jednou dávkou
+        rows = []
+        weather_days = []
+        for biz_id, sensor_addr in zip(businesses_with_sensor['id'], businesses_with_sensor['sensor_addr']):
+            weather = fetch_rain(sensor_addr, use_yesterday=True)
+            if 'error' in weather or not weather.get('date'):
+                continue
+            weather_days.append({**weather, 'podnik_id': int(biz_id)})
+            rows.append({
+                'PodnikID': int(biz_id),
+                'Datum': weather['date'],
+                'Objem': weather.get('rain_mm') or 0.0
+            })
+
+        if rows:
+            dm.upsert_sbernasrazky(rows)
+            dm.save_weather(weather_days)
 
         # Zapsat flag
         os.makedirs(os.path.dirname(flag_file), exist_ok=True)
@@ -201,7 +204,6 @@ def show_weather_widget():
     st.markdown("**Meteostanice**")
 
     # Získat dnešní data pro zobrazení
-    srazky_df = dm.get_sbernasrazky()
     today_str = date.today().strftime('%Y-%m-%d')
 
     for _, biz in businesses_with_sensor.iterrows():
@@ -210,15 +212,12 @@ def show_weather_widget():
         biz_id = int(biz['id'])
 
         # Zjistit, zda existuje dnešní záznam
-        today_record = srazky_df[
-            (srazky_df['PodnikID'] == biz_id) &
-            (srazky_df['Datum'].astype(str) == today_str)
-        ]
+        today_record = dm.get_srazka(biz_id, today_str)
 
         with st.expander(f"{biz_name}", expanded=False):
             # Zobrazit dnešní hodnotu, pokud existuje
-            if not today_record.empty:
-                rain_val = today_record.iloc[0]['Objem']
+            if today_record is not None:
+                rain_val = today_record['Objem']
                 st.metric("Dnešní srážky", f"{rain_val:.1f} mm")
 
             # Tlačítko pro manuální stažení a uložení
@@ -313,86 +312,95 @@ def show_sidebar():
             logout()
 
 
+def get_page_data(page: str):
+    """DataManager pro stránku - stránky podniků vidí jen podniky uživatele"""
+    data_manager = get_data_manager()
+    if page not in config.SCOPED_PAGES:
+        return data_manager
+    return data_manager.scoped(get_auth_manager().data_scope(st.session_state.user))
+
+
 def show_main_content():
     """Zobrazí hlavní obsah podle vybrané stránky"""
     selected_page = st.session_state.get('selected_page', 'Přehled Tekro')
+    data_manager = get_page_data(selected_page)
 
     # Import a zobrazení příslušné stránky
     if selected_page == 'Nástěnka':
         from page_modules import dashboard
-        dashboard.show(get_data_manager(), st.session_state.user)
+        dashboard.show(data_manager, st.session_state.user)
     elif selected_page == 'Podniky Tekro':
         from page_modules import podniky_prehled
-        podniky_prehled.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        podniky_prehled.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Pozemky Tekro':
         from page_modules import pozemky_tekro
-        pozemky_tekro.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        pozemky_tekro.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Zadávání dat':
         from page_modules import zadavani
-        zadavani.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        zadavani.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Přehled podniku':
         from page_modules import prehled_podniku
-        prehled_podniku.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        prehled_podniku.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Odrůdy':
         from page_modules import odrudy
-        odrudy.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        odrudy.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Podniky':
         from page_modules import businesses
-        businesses.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        businesses.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Plodiny':
         from page_modules import crops
-        crops.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        crops.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Pole':
         from page_modules import fields
-        fields.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        fields.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Pozemky':
         from page_modules import pozemky
-        pozemky.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        pozemky.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Sběrná místa':
         from page_modules import sbernamista
-        sbernamista.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        sbernamista.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Odrůdy osiva':
         from page_modules import varieties_seed
-        varieties_seed.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        varieties_seed.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Uživatelé':
         from page_modules import users
-        users.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        users.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Roky':
         from page_modules import roky
-        roky.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        roky.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Sběrné srážky':
         from page_modules import sbernasrazky
-        sbernasrazky.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        sbernasrazky.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Odpisy':
         from page_modules import odpisy
-        odpisy.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        odpisy.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Souhrn plodin':
         from page_modules import sumplodiny
-        sumplodiny.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        sumplodiny.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Typy pozemků':
         from page_modules import typpozemek
-        typpozemek.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        typpozemek.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Přístup k podnikům':
         from page_modules import userpodniky
-        userpodniky.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        userpodniky.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Statistiky':
         from page_modules import statistiky
-        statistiky.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        statistiky.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Srážky Tekro':
         from page_modules import srazky_tekro
-        srazky_tekro.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        srazky_tekro.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Přehled Tekro':
         from page_modules import prehled_tekro
-        prehled_tekro.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        prehled_tekro.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Plodiny Tekro':
         from page_modules import plodiny_tekro
-        plodiny_tekro.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        plodiny_tekro.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Osevní plány Tekro':
         from page_modules import osevni_plany
-        osevni_plany.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        osevni_plany.show(data_manager, st.session_state.user, get_auth_manager())
     elif selected_page == 'Přehled nabídek':
         from page_modules import prehled_nabidek
-        prehled_nabidek.show(get_data_manager(), st.session_state.user, get_auth_manager())
+        prehled_nabidek.show(data_manager, st.session_state.user, get_auth_manager())
 
 
 def main():
@@ -0,0 +1,69 @@
+"""
+Benchmark kopírování osevního plánu: add_record po řádcích vs. add_records
+
+Spuštění: python benchmarks/bench_add_records.py [počet_polí]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st
+import config
+from utils.data_manager import DataManager
+from utils.partitioned_table import read_table
+
+
+def make_source(n: int) -> list:
+    """Připraví n polí ke zkopírování (stejné sloupce jako v fields.py)"""
+    return [{
+        'vymera': 10.0 + i % 50,
+        'sklizeno': 0,
+        'cista_vaha': 0,
+        'hruba_vaha': 0,
+        'plodina_id': None,
+        'odruda_id': None,
+        'podnik_id': 1 + i % 8,
+        'cislo_honu': str(i),
+        'nazev_honu': f"Hon {i}",
+        'stmn': '',
+        'datum_seti': '',
+        'datum_vznik': '2026-01-01 00:00:00',
+        'rok_sklizne': 2027,
+        'operation': 'insert'
+    } for i in range(n)]
+
+
+def run(label: str, func) -> float:
+    st.session_state.clear()
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {count:>6} polí  {elapsed:8.3f} s")
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rows = make_source(n)
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        read_table(config.DATA_DIR, 'fields.csv').to_csv(os.path.join(tmp_dir, 'fields.csv'), index=False)
+        dm = DataManager(tmp_dir)
+
+        slow = run("add_record (po řádcích)", lambda: sum(dm.add_record('fields.csv', dict(r)) for r in rows))
+        fast = run("add_records (dávka)", lambda: dm.add_records('fields.csv', rows))
+
+        ids = dm.get_fields()['id']
+        assert ids.is_unique, "ID nejsou unikátní"
+        print(f"Zrychlení: {slow / fast:.0f}x")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
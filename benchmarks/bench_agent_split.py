@@ -0,0 +1,77 @@
+"""
+Benchmark načtení odpovědi /data v agentovi: pole záznamů vs. sloupcový tvar
+
+Měří celou cestu od textu odpovědi (json.loads) po DataFrame pro každou
+sadu - layout=records s rozdělením podle _type a layout=columns.
+
+Spuštění: python benchmarks/bench_agent_split.py [počet_záznamů]
+"""
+import os
+import sys
+import json
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from utils.agent_snapshot import DATA_TYPES, frames_from_columns, split_records
+from utils.partitioned_table import read_table
+
+
+def make_tables(n: int) -> dict:
+    """Aktuální sady z CSV zopakované tak, aby měly dohromady n záznamů"""
+    tables = {data_type: read_table(config.DATA_DIR, f"{data_type}.csv") for data_type in DATA_TYPES}
+    total = sum(len(df) for df in tables.values())
+    repeats = n // total + 1
+    tables = {data_type: pd.concat([df] * repeats, ignore_index=True) for data_type, df in tables.items()}
+    # Oříznout poměrně k velikosti sad
+    return {data_type: df.head(len(df) * n // (total * repeats)) for data_type, df in tables.items()}
+
+
+def records_payload(tables: dict) -> str:
+    """Odpověď /data jako pole záznamů s _type"""
+    records = []
+    for data_type, df in tables.items():
+        df = df.astype(object).where(df.notna(), None)
+        for record in df.to_dict(orient='records'):
+            record['_type'] = data_type
+            records.append(record)
+    return json.dumps(records, ensure_ascii=False)
+
+
+def columns_payload(tables: dict) -> str:
+    """Odpověď /data?layout=columns"""
+    columns = {}
+    for data_type, df in tables.items():
+        df = df.astype(object).where(df.notna(), None)
+        columns[data_type] = {col: df[col].tolist() for col in df.columns}
+    return json.dumps(columns, ensure_ascii=False)
+
+
+def run(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30} {sum(len(df) for df in result.values()):>9} záznamů  {elapsed:8.3f} s")
+    return result, elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"Příprava {n} záznamů...")
+    tables = make_tables(n)
+    records_text, columns_text = records_payload(tables), columns_payload(tables)
+    print(f"Velikost odpovědi: záznamy {len(records_text) / 1e6:.0f} MB, sloupce {len(columns_text) / 1e6:.0f} MB")
+
+    slow_frames, slow = run("layout=records + split_records", lambda: split_records(json.loads(records_text)))
+    fast_frames, fast = run("layout=columns", lambda: frames_from_columns(json.loads(columns_text)))
+
+    for data_type in DATA_TYPES:
+        pd.testing.assert_frame_equal(slow_frames[data_type], fast_frames[data_type])
+    print(f"Zrychlení: {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark workeru analýz: úlohy stability postupně v jednom procesu vs. AnalyticsWorker
+
+Spuštění: python benchmarks/bench_analytics_worker.py [počet_řádků] [počet_úloh]
+"""
+import os
+import sys
+import time
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_stability import make_history
+from utils.analytics_worker import AnalyticsWorker, rolling_stability_job, trends_job
+
+
+def no_progress(done, total, message=""):
+    pass
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    jobs = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    fields, crops = make_history(n)
+    windows = list(range(3, 3 + jobs))
+    print(f"Historie: {n} řádků, {jobs} úloh klouzavé stability + trendy, {os.cpu_count()} jader")
+
+    start = time.perf_counter()
+    serial = [rolling_stability_job(fields, crops, None, window, False, progress=no_progress) for window in windows]
+    trends_job(fields, progress=no_progress)
+    slow = time.perf_counter() - start
+    print(f"{'postupně v jednom procesu':<32} {slow:8.2f} s")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        worker = AnalyticsWorker(cache_dir)
+        start = time.perf_counter()
+        keys = [worker.submit('rolling', ('bench', window, False), rolling_stability_job, fields, crops, None, window, False)
+                for window in windows]
+        keys.append(worker.submit('trends', ('bench',), trends_job, fields))
+        while any(worker.status(key)['state'] == 'running' for key in keys):
+            time.sleep(0.05)
+        fast = time.perf_counter() - start
+        print(f"{'AnalyticsWorker (procesy)':<32} {fast:8.2f} s")
+
+        for key, expected in zip(keys, serial):
+            pd.testing.assert_frame_equal(worker.result(key), expected)
+
+        start = time.perf_counter()
+        worker.submit('rolling', ('bench', windows[0], False), rolling_stability_job, fields, crops, None, windows[0], False)
+        worker.result(keys[0])
+        print(f"{'opakovaný dotaz (uložený)':<32} {time.perf_counter() - start:8.2f} s")
+        worker.shutdown()
+
+    print(f"Zrychlení: {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark přihlášení a kontrol přístupu: původní čtení CSV vs. indexy AuthManager
+
+Spuštění: python benchmarks/bench_auth.py [počet_opakování]
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from utils.auth import AuthManager
+
+
+def podniky_loop(users_df: pd.DataFrame, user_id) -> list:
+    """Původní get_user_podniky - při každém volání načte userpodniky.csv a businesses.csv"""
+    userpodniky_df = pd.read_csv(os.path.join(config.DATA_DIR, 'userpodniky.csv'))
+    businesses_df = pd.read_csv(os.path.join(config.DATA_DIR, 'businesses.csv'))
+    user = users_df[users_df['id'] == user_id]
+    if not user.empty and user.iloc[0]['role'] == 'admin':
+        return businesses_df['id'].tolist()
+    return userpodniky_df[userpodniky_df['userId'] == user_id]['podnikId'].tolist()
+
+
+def login_loop(users_df: pd.DataFrame, username: str) -> list:
+    """Původní authenticate - hledání jména v tabulce a podniky z disku"""
+    user = users_df[users_df['username'] == username].iloc[0]
+    return podniky_loop(users_df, user['id'])
+
+
+def run(label: str, func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed / repeat * 1e6:10.1f} µs / dávka")
+    return elapsed
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    # Demo režim - měří se indexy, ne cena hashe hesla (viz bench_password_cost.py)
+    auth = AuthManager(os.path.join(config.DATA_DIR, 'users.csv'), demo=True)
+    users = auth.users_df
+    usernames = users['username'].tolist()
+    print(f"{len(users)} uživatelů, {repeat} opakování přihlášení všech")
+
+    slow = run("přihlášení - čtení CSV", lambda: [login_loop(users, name) for name in usernames], repeat)
+    fast = run("přihlášení - indexy", lambda: [auth.authenticate(name, '') for name in usernames], repeat)
+
+    logged = [auth.authenticate(name, '') for name in usernames]
+    for user in logged:
+        assert sorted(user['podniky']) == sorted(podniky_loop(users, user['id'])), user['username']
+
+    checks = [(user, podnik_id) for user in logged for podnik_id in range(12)]
+    run("kontrola can_edit_podnik (×{})".format(len(checks)),
+        lambda: [auth.can_edit_podnik(user, podnik_id) for user, podnik_id in checks], repeat)
+    print(f"Zrychlení přihlášení: {slow / fast:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Výběr ceny bcrypt pro cílovou dobu ověření hesla na tomto stroji
+
+Změří ověření hesla pro jednotlivé ceny, doporučí nejvyšší cenu, která
+se vejde do cílové doby, a pak zkusí nával současných přihlášení přes
+pool hesel - jak dlouho čeká poslední přihlášení a jak moc se zdrží
+vlákno s obyčejnou prací v Pythonu (ostatní session).
+
+Spuštění: python benchmarks/bench_password_cost.py [cíl_ms] [současných_přihlášení]
+"""
+import os
+import sys
+import time
+import hashlib
+import threading
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from utils.passwords import check_password, hash_password, verify_password
+
+ROUNDS = range(8, 17)
+PASSWORD = 'correct horse battery staple'
+
+
+def verify_ms(user: dict, repeat: int) -> float:
+    """Medián doby ověření v ms"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        assert check_password(PASSWORD, user)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def ticker(stop: threading.Event, lags: list):
+    """Krátké kroky v Pythonu - měří, o kolik se zdrží proti plánu"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        sum(range(2000))
+        time.sleep(0.005)
+        lags.append(time.perf_counter() - start - 0.005)
+
+
+def main():
+    target = float(sys.argv[1]) if len(sys.argv) > 1 else 250.0
+    logins = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print(f"Cíl {target:.0f} ms na ověření, {os.cpu_count()} jader, bcrypt {bcrypt.__version__}")
+
+    chosen = ROUNDS[0]
+    for rounds in ROUNDS:
+        user = {'password': hash_password(PASSWORD, rounds)}
+        elapsed = verify_ms(user, 3 if rounds < 14 else 1)
+        print(f"  bcrypt cena {rounds:2d}  {elapsed:9.1f} ms")
+        if elapsed > target:
+            break
+        chosen = rounds
+
+    salt = os.urandom(16)
+    legacy = {'password_salt': salt.hex(), 'password_iters': 200000,
+              'password_hash': hashlib.pbkdf2_hmac('sha256', PASSWORD.encode(), salt, 200000).hex()}
+    print(f"  PBKDF2-SHA256 200000 iter.  {verify_ms(legacy, 3):9.1f} ms (starší účty)")
+    assert not check_password('spatne', legacy)
+
+    print(f"\nDoporučeno: TEKRO_BCRYPT_ROUNDS={chosen} (nastaveno {config.BCRYPT_ROUNDS})")
+
+    user = {'password': hash_password(PASSWORD, chosen)}
+    verify_password(PASSWORD, user)
+    assert not verify_password('spatne', user)
+    stop, lags = threading.Event(), []
+    thread = threading.Thread(target=ticker, args=(stop, lags))
+    thread.start()
+    time.sleep(0.1)
+    baseline = len(lags)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=logins) as sessions:
+        done = list(sessions.map(lambda _: (verify_password(PASSWORD, user), time.perf_counter() - start)[1],
+                                 range(logins)))
+    stop.set()
+    thread.join()
+    assert len(done) == logins
+    print(f"{logins} současných přihlášení (pool {config.PASSWORD_WORKERS} vláken): "
+          f"poslední za {max(done) * 1000:.0f} ms, "
+          f"zdržení ostatní práce max {max(lags[baseline:]) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark stránky uživatele s jedním podnikem: celé tabulky a filtr na stránce vs. ScopedData
+
+Spuštění: python benchmarks/bench_scoped_data.py [počet_polí] [počet_opakování]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from utils.aggregations import Aggregations
+from utils.data_manager import DataManager
+
+PODNIKY = 8
+
+
+def make_fields(n: int, seed: int = 1) -> pd.DataFrame:
+    """n polí rozložených rovnoměrně do PODNIKY podniků a 10 sezón"""
+    rng = np.random.default_rng(seed)
+    vymera = rng.uniform(1, 60, n).round(2)
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'podnik_id': np.arange(n) % PODNIKY + 1,
+        'plodina_id': rng.integers(1, 13, n),
+        'nazev_honu': 'Hon ' + pd.Series(np.arange(n) // PODNIKY).astype(str),
+        'vymera': vymera,
+        'sklizeno': vymera,
+        'cista_vaha': (vymera * rng.normal(6, 1.5, n)).round(2),
+        'rok_sklizne': 2017 + np.arange(n) // PODNIKY % 10,
+    })
+
+
+def page_filter(dm: DataManager, podniky: list, year: int):
+    """Původní stránka: celé pole a souhrn všech podniků, pak filtr podle uživatele"""
+    fields = dm.get_fields()
+    fields = fields[fields['podnik_id'].isin(podniky)]
+    summary = Aggregations(dm).get_pole_podniky_summary_by_year(year, 'Y')
+    return fields, summary[summary['podnik_id'].isin(podniky)]
+
+
+def page_scoped(dm: DataManager, podniky: list, year: int):
+    """Stránka nad pohledem omezeným na podniky uživatele"""
+    data = dm.scoped(podniky)
+    return data.get_fields(), Aggregations(data).get_pole_podniky_summary_by_year(year, 'Y')
+
+
+def run(label: str, func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<36} {elapsed * 1000:9.1f} ms / načtení")
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    podniky, year = [3], 2026
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        make_fields(n).to_csv(os.path.join(tmp_dir, 'fields.csv'), index=False)
+        for name in ('crops.csv', 'businesses.csv'):
+            shutil.copy(os.path.join(config.DATA_DIR, name), tmp_dir)
+        dm = DataManager(tmp_dir)
+        dm.get_fields()
+        print(f"{n} polí v {PODNIKY} podnicích, uživatel s podnikem {podniky}")
+
+        slow = run("celé tabulky + filtr na stránce", lambda: page_filter(dm, podniky, year), repeat)
+        fast = run("ScopedData (index podniku)", lambda: page_scoped(dm, podniky, year), repeat)
+
+        old_fields, old_summary = page_filter(dm, podniky, year)
+        new_fields, new_summary = page_scoped(dm, podniky, year)
+        pd.testing.assert_frame_equal(new_fields, old_fields)
+        pd.testing.assert_frame_equal(new_summary.reset_index(drop=True), old_summary.reset_index(drop=True))
+        print(f"Zrychlení: {slow / fast:.1f}x")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark analýzy stability výnosů: cyklus přes skupiny vs. YieldStability
+
+Spuštění: python benchmarks/bench_stability.py [počet_řádků]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.yield_stability import YieldStability, prepare_yields
+
+
+def make_history(n: int, years: int = 20, seed: int = 1) -> tuple:
+    """Syntetická historie polí: n řádků rozložených do `years` sezón"""
+    rng = np.random.default_rng(seed)
+    fields_count = max(n // years, 1)
+    field = np.arange(n) % fields_count
+    vymera = rng.uniform(1, 60, n).round(2)
+    fields = pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'nazev_honu': 'Hon ' + pd.Series(field).astype(str),
+        'plodina_id': rng.integers(1, 13, n),
+        'vymera': vymera,
+        'cista_vaha': (vymera * rng.normal(6, 1.5, n)).round(2),
+        'rok_sklizne': 2026 - years + np.arange(n) // fields_count % years + 1,
+    })
+    crops = pd.DataFrame({'id': range(1, 13), 'nazev': [f"Plodina {i}" for i in range(1, 13)]})
+    return fields, crops
+
+
+def stability_loop(fields: pd.DataFrame, crops: pd.DataFrame) -> pd.DataFrame:
+    """Původní výpočet - mean/std po skupinách v cyklu"""
+    df = prepare_yields(fields, crops)
+    stability = []
+    for (pole, plodina), group in df.groupby(['pole', 'plodina']):
+        yields = group['vynos'].dropna()
+        if len(yields) >= 2:
+            mean_y = yields.mean()
+            cv = (yields.std() / mean_y * 100) if mean_y > 0 else 0
+            stability.append({
+                'Pole': pole, 'Plodina': plodina, 'Roky': len(yields),
+                'Průměr': mean_y, 'CV (%)': cv,
+                'Min': yields.min(), 'Max': yields.max()
+            })
+    return pd.DataFrame(stability).sort_values('CV (%)', ascending=False)
+
+
+def run(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {len(result):>8} řádků  {elapsed:8.3f} s")
+    return result, elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    fields, crops = make_history(n)
+    print(f"Historie: {n} řádků, {fields['rok_sklizne'].nunique()} sezón")
+
+    slow_df, slow = run("cyklus přes skupiny", lambda: stability_loop(fields, crops))
+    stability = YieldStability(fields, crops)
+    fast_df, fast = run("YieldStability.table", stability.table)
+    run("YieldStability.table (vážená)", lambda: stability.table(weighted=True))
+    run("YieldStability.rolling (okno 5)", lambda: stability.rolling(window=5))
+
+    key = ['Pole', 'Plodina']
+    a = slow_df.sort_values(key).reset_index(drop=True)
+    b = fast_df.sort_values(key).reset_index(drop=True)
+    pd.testing.assert_frame_equal(a, b, check_dtype=False)
+    print(f"Zrychlení: {slow / fast:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
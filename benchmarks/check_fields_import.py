@@ -0,0 +1,68 @@
+"""
+Kontrola opakovaného importu polí: dva sešity jednoho podniku
+
+Nový sešit podniku (např. doplněk) nesmí smazat pole, která vznikla
+z jiného, už naimportovaného sešitu téhož podniku.
+
+Spuštění: python benchmarks/check_fields_import.py
+"""
+import os
+import sys
+import shutil
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from utils.fields_import import FIELDS_COLUMNS, import_fields
+from utils.partitioned_table import read_table
+
+YEAR = 2025
+PODNIK = 1
+
+
+def write_workbook(path: str, hony: list):
+    """Sešit ve tvaru exportu Tekro (titulek, hlavička s Plodina, řádky polí)"""
+    rows = [['Tekro excel export', None, None, None, None]]
+    rows.append(['Plodina', 'Název honu', 'Odrůda', 'Výměra', 'Čistá váha'])
+    rows += [['Pšenice ozimá', hon, '', 10.0, 60.0] for hon in hony]
+    pd.DataFrame(rows).to_excel(path, header=False, index=False)
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        data_dir, import_dir = os.path.join(tmp_dir, 'data'), os.path.join(tmp_dir, 'import')
+        os.makedirs(data_dir)
+        os.makedirs(import_dir)
+        for name in ('crops.csv', 'varieties_seed.csv'):
+            shutil.copy(os.path.join(config.DATA_DIR, name), data_dir)
+        pd.DataFrame(columns=FIELDS_COLUMNS).to_csv(os.path.join(data_dir, 'fields.csv'), index=False)
+
+        def hony():
+            fields = read_table(data_dir, 'fields.csv')
+            return sorted(fields.loc[(fields['rok_sklizne'] == YEAR) & (fields['podnik_id'] == PODNIK), 'nazev_honu'])
+
+        write_workbook(os.path.join(import_dir, 'zbiroh-2025-excel.xlsx'), ['A', 'B'])
+        import_fields(import_dir, YEAR, data_dir, workers=1)
+        assert hony() == ['A', 'B'], hony()
+
+        # Doplněk téhož podniku - první sešit je v manifestu aktuální a přeskočí se
+        write_workbook(os.path.join(import_dir, 'zbiroh-doplnek.xlsx'), ['C'])
+        result = import_fields(import_dir, YEAR, data_dir, workers=1)
+        assert result['skipped'] == ['zbiroh-2025-excel.xlsx'], result['skipped']
+        assert hony() == ['A', 'B', 'C'], hony()
+
+        # Změna doplňku nahradí jen jeho řádky
+        write_workbook(os.path.join(import_dir, 'zbiroh-doplnek.xlsx'), ['D'])
+        import_fields(import_dir, YEAR, data_dir, workers=1)
+        assert hony() == ['A', 'B', 'D'], hony()
+        print("OK: sešity jednoho podniku si pole nepřepisují")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
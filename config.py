@@ -11,6 +11,13 @@ DATA_DIR = os.path.join(BASE_DIR, 'data')
 APP_TITLE = "Tekro sklizeň"
 APP_ICON = "🌾"
 
+# Hesla - cena bcrypt pro nová hesla (vybrat benchmarks/bench_password_cost.py na cílovém stroji)
+BCRYPT_ROUNDS = int(os.environ.get('TEKRO_BCRYPT_ROUNDS', '12'))
+# Kolik hesel se ověřuje současně (další přihlášení čekají ve frontě)
+PASSWORD_WORKERS = int(os.environ.get('TEKRO_PASSWORD_WORKERS', '2'))
+# Demo režim - přihlášení s jakýmkoliv heslem (jen pro ukázková data)
+AUTH_DEMO = os.environ.get('TEKRO_AUTH_DEMO', '') == '1'
+
 # Menu položky podle rolí - rozděleno do skupin
 MENU_GROUPS = {
     'admin': {
@@ -97,6 +104,19 @@ MENU_ITEMS = {
     for role, groups in MENU_GROUPS.items()
 }
 
+# Stránky podniků - u uživatelů mimo admina dostanou data jen jejich podniků
+# (přehledy Tekro a správa číselníků zobrazují celou skupinu)
+SCOPED_PAGES = {
+    'Nástěnka',
+    'Zadávání dat',
+    'Přehled podniku',
+    'Odrůdy',
+    'Pole',
+    'Odpisy',
+    'Statistiky',
+    'Přehled nabídek',
+}
+
 # Mapování stránek na soubory
 PAGE_FILES = {
     'Nástěnka': 'dashboard',
@@ -0,0 +1,15 @@
+"""
+Import výměr pozemků z Excel exportů do pozemky.csv
+
+Použití:
+    python import_pozemky.py                          # složka 2025-data/pozemky
+    python import_pozemky.py --dir 2026-data/pozemky
+    python import_pozemky.py --dry-run                # jen počty změn
+"""
+import sys
+
+from utils.pozemky_import import main
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,15 @@
+"""
+Převod tabulek fields.csv a sbernasrazky.csv na oddíly po rocích
+
+Použití:
+    python migrate_partitions.py                      # data/fields/, data/sbernasrazky/
+    python migrate_partitions.py --table fields.csv
+    python migrate_partitions.py --back               # zpět do jednoho CSV
+"""
+import sys
+
+from utils.partitioned_table import main
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
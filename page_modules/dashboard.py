@@ -39,14 +39,6 @@ def show(data_manager, user):
     summary_not_main = agg.get_pole_summary_by_year(selected_year, 'N')
     summary_podniky_not_main = agg.get_pole_podniky_summary_by_year(selected_year, 'N')
 
-    # Filtrování podle přiřazených podniků uživatele
-    user_podniky = user.get('podniky', [])
-    if user.get('role') != 'admin' and user_podniky:
-        if not summary_podniky_main.empty:
-            summary_podniky_main = summary_podniky_main[summary_podniky_main['podnik_id'].isin(user_podniky)]
-        if not summary_podniky_not_main.empty:
-            summary_podniky_not_main = summary_podniky_not_main[summary_podniky_not_main['podnik_id'].isin(user_podniky)]
-
     # Statistiky
     col1, col2, col3, col4 = st.columns(4)
 
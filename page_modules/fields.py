@@ -13,16 +13,11 @@ def show(data_manager, user, auth_manager):
     # Načtení dat
     fields = data_manager.get_fields()
     crops = data_manager.get_crops()
-    businesses = data_manager.get_businesses()
     roky = data_manager.get_roky()
     varieties = data_manager.get_varieties_seed()
 
-    # Filtrovat podniky podle přiřazení uživatele
-    user_podniky = user.get('podniky', [])
-    if user.get('role') != 'admin' and user_podniky:
-        businesses_filtered = businesses[businesses['id'].isin(user_podniky)]
-    else:
-        businesses_filtered = businesses
+    # Podniky uživatele (data stránky jsou na ně omezená v data_manager)
+    businesses_filtered = data_manager.allowed_businesses()
 
     if businesses_filtered.empty:
         st.warning("Nemáte přiřazený žádný podnik. Kontaktujte administrátora.")
@@ -128,27 +123,25 @@ def show(data_manager, user, auth_manager):
                 if len(source_fields) == 0:
                     st.error("Žádná pole ke kopírování")
                 else:
-                    # Kopírování polí
-                    copied_count = 0
-                    for _, row in source_fields.iterrows():
-                        new_field = {
-                            'vymera': row.get('vymera', 0),
-                            'sklizeno': 0,  # Vynulovat
-                            'cista_vaha': 0,  # Vynulovat
-                            'hruba_vaha': 0,  # Vynulovat
-                            'plodina_id': None,  # Nevyplnit
-                            'odruda_id': None,  # Nevyplnit
-                            'podnik_id': selected_podnik,
-                            'cislo_honu': row.get('cislo_honu', ''),
-                            'nazev_honu': row.get('nazev_honu', ''),
-                            'stmn': row.get('stmn', ''),
-                            'datum_seti': '',
-                            'datum_vznik': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                            'rok_sklizne': int(target_year),
-                            'operation': 'insert'
-                        }
-                        if data_manager.add_record('fields.csv', new_field):
-                            copied_count += 1
+                    # Kopírování polí - jedna dávka místo záznamu po záznamu
+                    new_fields = pd.DataFrame({
+                        'vymera': source_fields['vymera'].fillna(0),
+                        'sklizeno': 0,  # Vynulovat
+                        'cista_vaha': 0,  # Vynulovat
+                        'hruba_vaha': 0,  # Vynulovat
+                        'plodina_id': None,  # Nevyplnit
+                        'odruda_id': None,  # Nevyplnit
+                        'podnik_id': selected_podnik,
+                        'cislo_honu': source_fields['cislo_honu'],
+                        'nazev_honu': source_fields['nazev_honu'],
+                        'stmn': source_fields['stmn'],
+                        'datum_seti': '',
+                        'datum_vznik': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                        'rok_sklizne': int(target_year),
+                        'operation': 'insert',
+                        '_zdroj_id': source_fields['id'],  # Původ pro linie polí
+                    })
+                    copied_count = data_manager.add_records('fields.csv', new_fields.to_dict('records'))
 
                     st.success(f"Úspěšně zkopírováno {copied_count} polí do roku {target_year}")
                     st.rerun()
@@ -7,6 +7,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 from io import BytesIO
+from utils.editor_diff import diff_editor
 
 
 def show(data_manager, user, auth_manager):
@@ -15,7 +16,6 @@ def show(data_manager, user, auth_manager):
     st.markdown("---")
 
     # Načtení dat (force reload pro aktuální data)
-    businesses = data_manager.get_businesses()
     fields = data_manager.get_fields()
     odpisy = data_manager.load_csv('odpisy.csv', force_reload=True)
 
@@ -25,12 +25,8 @@ def show(data_manager, user, auth_manager):
             if col in odpisy.columns:
                 odpisy[col] = pd.to_numeric(odpisy[col], errors='coerce').fillna(0)
 
-    # Filtrovat podniky podle přiřazení uživatele
-    user_podniky = user.get('podniky', [])
-    if user.get('role') != 'admin' and user_podniky:
-        businesses_filtered = businesses[businesses['id'].isin(user_podniky)]
-    else:
-        businesses_filtered = businesses
+    # Podniky uživatele (data stránky jsou na ně omezená v data_manager)
+    businesses_filtered = data_manager.allowed_businesses()
 
     if businesses_filtered.empty:
         st.warning("Nemáte přiřazený žádný podnik.")
@@ -549,37 +545,37 @@ def show(data_manager, user, auth_manager):
         # Tlačítko pro uložení změn
         if can_edit:
             if st.button("💾 Uložit změny v tabulce", type="primary"):
-                try:
-                    # Načíst všechny odpisy
-                    all_odpisy = data_manager.get_odpisy()
-
-                    # Smazat staré záznamy pro tento podnik a rok
-                    all_odpisy = all_odpisy[~((all_odpisy['podnik_id'] == selected_podnik) & (all_odpisy['rok'] == selected_year))]
-
-                    # Přidat upravené záznamy
-                    for idx, row in edited_df.iterrows():
-                        if pd.notna(row.get('prodano_t')) and row.get('prodano_t', 0) > 0:
-                            new_record = {
-                                'id': original_ids[idx] if idx < len(original_ids) else int(all_odpisy['id'].max() + 1) if not all_odpisy.empty else 1,
-                                'podnik_id': selected_podnik,
-                                'rok': selected_year,
-                                'datum_smlouvy': str(row.get('datum_smlouvy', ''))[:10],
-                                'stav': row.get('stav', 'nasmlouvano'),
-                                'prodano_t': row.get('prodano_t', 0),
-                                'nabidka_kc': row.get('nabidka_kc', 0),
-                                'castka_kc': row.get('castka_kc', 0),
-                                'poznamka': row.get('poznamka', ''),
-                                'faktura': row.get('faktura', '')
-                            }
-                            all_odpisy = pd.concat([all_odpisy, pd.DataFrame([new_record])], ignore_index=True)
-
-                    # Uložit
-                    all_odpisy.to_csv(f'{data_manager.data_dir}/odpisy.csv', index=False)
-                    data_manager.load_csv('odpisy.csv', force_reload=True)
-                    st.success("Změny byly uloženy!")
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Chyba při ukládání: {e}")
+                # Datum zpět na text jako v CSV
+                original = display_df_edit.copy()
+                edited = edited_df.copy()
+                for df in (original, edited):
+                    if 'datum_smlouvy' in df.columns:
+                        df['datum_smlouvy'] = pd.to_datetime(df['datum_smlouvy'], errors='coerce').dt.strftime('%Y-%m-%d')
+
+                # Rozdíl je dopočítaný sloupec - neukládá se
+                changes = diff_editor(original, edited, original_ids, columns=[c for c in edit_cols if c != 'rozdil_kc'])
+
+                # Řádky bez prodaného množství se neukládají (upravené na nulu se smažou)
+                if 'prodano_t' in edit_cols:
+                    updated_ok = pd.to_numeric(changes.updated['prodano_t'], errors='coerce').fillna(0) > 0
+                    inserted_ok = pd.to_numeric(changes.inserted['prodano_t'], errors='coerce').fillna(0) > 0
+                    changes.deleted += changes.updated.loc[~updated_ok, 'id'].tolist()
+                    changes.updated = changes.updated[updated_ok]
+                    changes.inserted = changes.inserted[inserted_ok]
+
+                fill = {col: value for col, value in {'stav': 'nasmlouvano', 'poznamka': '', 'faktura': ''}.items() if col in edit_cols}
+                changes.inserted = changes.inserted.fillna(fill)
+
+                if not changes:
+                    st.info("Žádné změny k uložení")
+                else:
+                    result = data_manager.apply_changes(
+                        'odpisy.csv', changes,
+                        defaults={'podnik_id': selected_podnik, 'rok': selected_year}
+                    )
+                    if result:
+                        st.success(f"Změny byly uloženy! ({changes.summary()})")
+                        st.rerun()
 
         # === STAŽENÍ PDF FAKTUR ===
         import os
@@ -12,12 +12,12 @@ def show(data_manager, user, auth_manager=None):
     st.title("📉 Odrůdy - přehled výnosů")
 
     # Načtení dat
-    fields = data_manager.get_fields()
     businesses = data_manager.get_businesses()
     crops = data_manager.get_crops()
     varieties = data_manager.get_varieties_seed()
 
-    if fields.empty:
+    years = data_manager.years('fields.csv')
+    if not years:
         st.warning("Žádná data o polích")
         return
 
@@ -26,35 +26,21 @@ def show(data_manager, user, auth_manager=None):
 
     with col1:
         # Výběr roku
-        if 'rok_sklizne' in fields.columns:
-            years = sorted(fields['rok_sklizne'].dropna().unique(), reverse=True)
-            if years:
-                current_year = datetime.now().year
-                default_year = current_year if current_year in years else years[0]
-                selected_year = st.selectbox(
-                    "Rok:",
-                    years,
-                    index=years.index(default_year) if default_year in years else 0
-                )
-            else:
-                st.warning("Žádná data o letech")
-                return
-        else:
-            st.warning("Chybí sloupec rok_sklizne")
-            return
+        current_year = datetime.now().year
+        default_year = current_year if current_year in years else years[0]
+        selected_year = st.selectbox(
+            "Rok:",
+            years,
+            index=years.index(default_year)
+        )
 
     # Filtrovat podle roku
-    fields_year = fields[fields['rok_sklizne'] == selected_year].copy()
+    fields_year = data_manager.fields(year=selected_year)
 
     if fields_year.empty:
         st.info(f"Žádná data pro rok {selected_year}")
         return
 
-    # Filtrování podle přiřazených podniků uživatele
-    user_podniky = user.get('podniky', [])
-    if user.get('role') != 'admin' and user_podniky:
-        fields_year = fields_year[fields_year['podnik_id'].isin(user_podniky)]
-
     # Připojit názvy podniků
     if not businesses.empty:
         fields_year = fields_year.merge(
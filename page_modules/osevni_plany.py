@@ -15,21 +15,11 @@ def render(data_manager):
 
     # Načtení dat
     businesses = data_manager.get_businesses()
-    fields = data_manager.get_fields()
     crops = data_manager.get_crops()
     varieties = data_manager.get_varieties_seed()
 
-    if fields.empty:
-        st.warning("Nejsou k dispozici žádná data.")
-        return
-
     # Získat všechny roky
-    if 'rok_sklizne' in fields.columns:
-        available_years = sorted(fields['rok_sklizne'].dropna().unique(), reverse=True)
-        available_years = [int(y) for y in available_years]
-    else:
-        st.warning("Data neobsahují informace o rocích.")
-        return
+    available_years = data_manager.years('fields.csv')
 
     if not available_years:
         st.warning("Nejsou k dispozici žádné roky.")
@@ -57,7 +47,7 @@ def render(data_manager):
     st.header(f"Osevní plány {selected_year} {podnik_name}")
 
     # Filtrovat data
-    year_fields = fields[(fields['rok_sklizne'] == selected_year) & (fields['podnik_id'] == selected_podnik)].copy()
+    year_fields = data_manager.fields(year=selected_year, podnik_ids=selected_podnik)
 
     if year_fields.empty:
         st.info(f"Pro rok {selected_year} a podnik {podnik_name} nejsou k dispozici žádná data.")
@@ -28,20 +28,10 @@ def render(data_manager):
 
     # Načtení dat
     businesses = data_manager.get_businesses()
-    fields = data_manager.get_fields()
     crops = data_manager.get_crops()
 
-    if fields.empty:
-        st.warning("Nejsou k dispozici žádná data.")
-        return
-
     # Výběr roku
-    if 'rok_sklizne' in fields.columns:
-        available_years = sorted(fields['rok_sklizne'].dropna().unique(), reverse=True)
-        available_years = [int(y) for y in available_years]
-    else:
-        st.warning("Data neobsahují informace o rocích.")
-        return
+    available_years = data_manager.years('fields.csv')
 
     if not available_years:
         st.warning("Nejsou k dispozici žádné roky.")
@@ -52,7 +42,7 @@ def render(data_manager):
     st.markdown("---")
 
     # Filtrovat data pro vybraný rok
-    year_fields = fields[fields['rok_sklizne'] == selected_year].copy()
+    year_fields = data_manager.fields(year=selected_year)
 
     if year_fields.empty:
         st.info(f"Pro rok {selected_year} nejsou k dispozici žádná data.")
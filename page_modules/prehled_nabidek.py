@@ -14,7 +14,6 @@ def show(data_manager, user, auth_manager):
     st.markdown("---")
 
     # Načtení dat
-    businesses = data_manager.get_businesses()
     odpisy = data_manager.load_csv('odpisy.csv', force_reload=True)
     nabidky = data_manager.load_csv('nabidky.csv', force_reload=True)
 
@@ -27,12 +26,8 @@ def show(data_manager, user, auth_manager):
     if not nabidky.empty:
         nabidky['nabidka_kc'] = pd.to_numeric(nabidky['nabidka_kc'], errors='coerce').fillna(0)
 
-    # Filtrovat podniky podle přiřazení uživatele
-    user_podniky = user.get('podniky', [])
-    if user.get('role') != 'admin' and user_podniky:
-        businesses_filtered = businesses[businesses['id'].isin(user_podniky)]
-    else:
-        businesses_filtered = businesses
+    # Podniky uživatele (data stránky jsou na ně omezená v data_manager)
+    businesses_filtered = data_manager.allowed_businesses()
 
     if businesses_filtered.empty:
         st.warning("Nemáte přiřazený žádný podnik.")
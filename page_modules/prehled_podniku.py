@@ -9,24 +9,17 @@ import plotly.graph_objects as go
 
 def show(data_manager, user, auth_manager=None):
     """Vstupní bod pro zobrazení stránky"""
-    # Získání podniků uživatele
-    user_businesses = []
-    if user['role'] != 'admin':
-        userpodniky = data_manager.get_userpodniky()
-        user_businesses = userpodniky[userpodniky['user_id'] == user['id']]['podnik_id'].tolist()
+    # Data jsou omezená na podniky uživatele už v data_manager (viz ScopedData)
+    render(data_manager)
 
-    render(data_manager, user_businesses)
 
-
-def render(data_manager, user_businesses):
+def render(data_manager):
     """Vykreslí stránku s přehledem podniku"""
     st.header("Přehled podniku")
 
     # Načtení dat
-    businesses = data_manager.get_businesses()
-    pozemky = data_manager.get_pozemky()
+    businesses = data_manager.allowed_businesses()
     typpozemek = data_manager.get_typpozemek()
-    fields = data_manager.get_fields()
     crops = data_manager.get_crops()
     sbernasrazky = data_manager.get_sbernasrazky()
     sbernamista = data_manager.get_sbernamista()
@@ -35,10 +28,6 @@ def render(data_manager, user_businesses):
         st.warning("Nejsou k dispozici žádné podniky.")
         return
 
-    # Filtrování podniků podle oprávnění
-    if user_businesses:
-        businesses = businesses[businesses['id'].isin(user_businesses)]
-
     # Výběr podniku
     podnik_options = {row['id']: row['nazev'] for _, row in businesses.iterrows()}
 
@@ -56,15 +45,8 @@ def render(data_manager, user_businesses):
     st.subheader(f"Podnik: {podnik_name}")
 
     # Výběr roku - z pozemků a polí
-    available_years = []
-    if not pozemky.empty and 'Year' in pozemky.columns:
-        pozemky_years = pozemky[pozemky['PodnikID'] == selected_podnik]['Year'].dropna().unique()
-        available_years.extend(pozemky_years)
-    if not fields.empty and 'rok_sklizne' in fields.columns:
-        fields_years = fields[fields['podnik_id'] == selected_podnik]['rok_sklizne'].dropna().unique()
-        available_years.extend(fields_years)
-
-    available_years = sorted(set([int(y) for y in available_years if pd.notna(y)]))
+    available_years = sorted(set(data_manager.years('pozemky.csv', podnik_ids=selected_podnik)) |
+                             set(data_manager.years('fields.csv', podnik_ids=selected_podnik)))
 
     if not available_years:
         st.warning("Pro vybraný podnik nejsou k dispozici žádná data.")
@@ -78,7 +60,7 @@ def render(data_manager, user_businesses):
     st.subheader(f"Půda - {selected_year}")
 
     # Filtrovat pozemky pro vybraný podnik a rok
-    podnik_pozemky = pozemky[(pozemky['PodnikID'] == selected_podnik) & (pozemky['Year'] == selected_year)]
+    podnik_pozemky = data_manager.pozemky(year=selected_year, podnik_ids=selected_podnik)
 
     if not podnik_pozemky.empty and not typpozemek.empty:
         # Sloučit s názvy typů pozemků
@@ -129,7 +111,7 @@ def render(data_manager, user_businesses):
     st.subheader(f"Sumární list plodin - {selected_year}")
 
     # Filtrovat pole pro vybraný podnik a rok
-    podnik_fields = fields[(fields['podnik_id'] == selected_podnik) & (fields['rok_sklizne'] == selected_year)]
+    podnik_fields = data_manager.fields(year=selected_year, podnik_ids=selected_podnik)
 
     if not podnik_fields.empty and not crops.empty:
         # Sloučit s názvy plodin
@@ -112,6 +112,26 @@ def show(data_manager, user, auth_manager):
                 suffixes=('', '_podnik')
             )
 
+        # Příznaky kontroly kvality
+        flags = data_manager.get_srazky_flags()
+        flag_labels = {
+            'duplicita': 'duplicita',
+            'zaporne': 'záporná hodnota',
+            'extrem_historie': 'extrém vůči historii',
+            'odlehla_sousede': 'odchylka od sousedů',
+            'nula_podezrela': 'podezřelá nula',
+            'vypadek': 'výpadek před záznamem',
+        }
+        if not flags.empty:
+            flag_values = flags[list(flag_labels.keys())].astype(bool)
+            flags = flags.assign(Kontrola=flag_values.dot(pd.Index([f"{label}, " for label in flag_labels.values()])).str.rstrip(', '))
+            display_df = display_df.merge(flags[['id', 'Kontrola', 'podezrely']], on='id', how='left')
+            display_df['Kontrola'] = display_df['Kontrola'].fillna('')
+            display_df['podezrely'] = display_df['podezrely'].fillna(False).astype(bool)
+
+            if st.checkbox("Jen podezřelé záznamy", value=False, key="srazky_jen_podezrele"):
+                display_df = display_df[display_df['podezrely']]
+
         # Filtrovat podle podniku
         if selected_filter_business != 'Vše' and 'Podnik' in display_df.columns:
             display_df = display_df[display_df['Podnik'] == selected_filter_business]
@@ -130,6 +150,8 @@ def show(data_manager, user, auth_manager):
             final_df['Místo'] = display_df['Místo'].values
         if 'Objem' in display_df.columns:
             final_df['Objem (t)'] = display_df['Objem'].values
+        if 'Kontrola' in display_df.columns:
+            final_df['Kontrola'] = display_df['Kontrola'].values
 
         can_edit = auth_manager.has_permission(user['role'], 'write')
 
@@ -143,7 +165,8 @@ def show(data_manager, user, auth_manager):
                 "Datum": st.column_config.TextColumn(width="small"),
                 "Podnik": st.column_config.TextColumn(width="medium"),
                 "Místo": st.column_config.TextColumn(width="medium"),
-                "Objem (t)": st.column_config.NumberColumn(format="%.2f", width="small")
+                "Objem (t)": st.column_config.NumberColumn(format="%.2f", width="small"),
+                "Kontrola": st.column_config.TextColumn(width="medium", disabled=True)
             }
         )
 
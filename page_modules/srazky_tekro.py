@@ -15,26 +15,21 @@ def show(data_manager, user, auth_manager=None):
 def render(data_manager, user):
     """Vykreslí stránku s přehledem srážek"""
 
-    # Načtení dat
+    # Načtení dat - předpočítané souhrny místo denních záznamů
     businesses = data_manager.get_businesses()
-    sbernasrazky = data_manager.get_sbernasrazky()
-
-    if sbernasrazky.empty:
-        st.warning("Nejsou k dispozici žádná data o srážkách.")
-        return
-
-    # Převést datum na datetime
-    sbernasrazky['Datum'] = pd.to_datetime(sbernasrazky['Datum'], errors='coerce')
-    sbernasrazky['rok'] = sbernasrazky['Datum'].dt.year
-    sbernasrazky['mesic'] = sbernasrazky['Datum'].dt.month
-    sbernasrazky['den'] = sbernasrazky['Datum'].dt.day
+    skryt_podezrele = st.checkbox(
+        "Skrýt podezřelé záznamy",
+        value=False,
+        help="Vynechá duplicity, záporné hodnoty a odlehlé hodnoty vůči historii i ostatním podnikům",
+        key="srazky_skryt_podezrele"
+    )
+    rollups = data_manager.get_srazky_rollups(valid_only=skryt_podezrele)
 
     # Získat všechny roky
-    all_years = sorted(sbernasrazky['rok'].dropna().unique(), reverse=True)
-    all_years = [int(y) for y in all_years]
+    all_years = rollups.years()
 
     if not all_years:
-        st.warning("Nejsou k dispozici žádné roky.")
+        st.warning("Nejsou k dispozici žádná data o srážkách.")
         return
 
     # Výběr roku
@@ -53,26 +48,9 @@ def render(data_manager, user):
     if 'srazky_detail_mesic' not in st.session_state:
         st.session_state.srazky_detail_mesic = None
 
-    # Sloučit s názvy podniků
-    if not businesses.empty:
-        sbernasrazky = sbernasrazky.merge(
-            businesses[['id', 'nazev', 'poradi']],
-            left_on='PodnikID',
-            right_on='id',
-            how='left',
-            suffixes=('', '_podnik')
-        )
-        sbernasrazky['podnik_nazev'] = sbernasrazky['nazev'].fillna('Neznámý')
-    else:
-        sbernasrazky['podnik_nazev'] = 'Neznámý'
-        sbernasrazky['poradi'] = 0
-
-    # Filtrovat data pro vybraný rok
-    year_data = sbernasrazky[sbernasrazky['rok'] == selected_year]
-
     # Pokud je vybrán detail
     if st.session_state.srazky_detail_podnik and st.session_state.srazky_detail_mesic:
-        render_detail(data_manager, user, year_data, selected_year,
+        render_detail(data_manager, user, rollups, selected_year,
                      st.session_state.srazky_detail_podnik,
                      st.session_state.srazky_detail_mesic,
                      mesice_nazvy, businesses)
@@ -80,52 +58,34 @@ def render(data_manager, user):
 
     st.header(f"Srážky {selected_year}")
 
-    if year_data.empty:
+    # Tabulka podnik x měsíc pro vybraný rok
+    month_table = rollups.month_table(selected_year)
+
+    if month_table.empty:
         st.info(f"Pro rok {selected_year} nejsou k dispozici žádná data.")
         return
 
-    # Agregace podle podniků a měsíců
-    pivot_data = year_data.groupby(['podnik_nazev', 'PodnikID', 'mesic']).agg({
-        'Objem': 'sum'
-    }).reset_index()
-
-    # Seřadit podniky podle pořadí
-    if not businesses.empty and 'poradi' in businesses.columns:
-        podnik_order = businesses.sort_values('poradi')[['id', 'nazev']].values.tolist()
+    # Seřadit podniky podle pořadí, srážky podniků mimo číselník se nezobrazují
+    if not businesses.empty:
+        month_table = month_table[month_table.index.isin(businesses['id'])]
+        if month_table.empty:
+            st.info(f"Pro rok {selected_year} nejsou k dispozici žádná data.")
+            return
+        podniky = businesses.drop_duplicates('id').set_index('id')[['nazev', 'poradi']].reindex(month_table.index)
     else:
-        podnik_order = [[None, name] for name in sorted(year_data['podnik_nazev'].unique())]
-
-    # Vytvořit tabulku
-    data_rows = []
-    podnik_info = []
-
-    for podnik_id, podnik_nazev in podnik_order:
-        if podnik_id:
-            podnik_data = pivot_data[pivot_data['PodnikID'] == podnik_id]
-        else:
-            podnik_data = pivot_data[pivot_data['podnik_nazev'] == podnik_nazev]
-
-        if podnik_data.empty:
-            continue
-
-        row = {'Podnik': podnik_nazev}
-        celkem = 0
-
-        for mesic_num, mesic_nazev in mesice_nazvy.items():
-            mesic_hodnota = podnik_data[podnik_data['mesic'] == mesic_num]['Objem'].sum()
-            col_name = f"{mesic_nazev[:3]} [mm]"
-            row[col_name] = int(mesic_hodnota)
-            celkem += mesic_hodnota
-
-        row['Celkem [mm]'] = int(celkem)
-        data_rows.append(row)
-        podnik_info.append((podnik_id, podnik_nazev))
-
-    if not data_rows:
-        st.info("Žádná data pro zobrazení.")
-        return
-
-    df = pd.DataFrame(data_rows)
+        podniky = pd.DataFrame({'nazev': None, 'poradi': None}, index=month_table.index)
+    podniky = podniky.sort_values('poradi', na_position='last')
+    month_table = month_table.loc[podniky.index]
+
+    df = month_table.astype(int)
+    # Červen a Červenec mají stejné první tři znaky
+    zkratky = {m: nazev[:3] for m, nazev in mesice_nazvy.items()}
+    zkratky.update({6: 'Čvn', 7: 'Čvc'})
+    df.columns = [f"{zkratky[m]} [mm]" for m in month_table.columns]
+    df.insert(0, 'Podnik', podniky['nazev'].fillna('Neznámý').values)
+    df['Celkem [mm]'] = month_table.sum(axis=1).astype(int).values
+    df = df.reset_index(drop=True)
+    podnik_info = [int(p) for p in month_table.index]
 
     # Styling - zelený první sloupec, modrý Celkem sloupec
     def highlight_rows(row):
@@ -159,15 +119,43 @@ def render(data_manager, user):
     # Automatický proklik po výběru řádku
     if selection and selection.selection and selection.selection.rows:
         selected_idx = selection.selection.rows[0]
-        podnik_id, podnik_nazev = podnik_info[selected_idx]
+        podnik_id = podnik_info[selected_idx]
         # Použít aktuální měsíc
         current_month = datetime.now().month
-        st.session_state.srazky_detail_podnik = podnik_id if podnik_id else podnik_nazev
+        st.session_state.srazky_detail_podnik = podnik_id
         st.session_state.srazky_detail_mesic = current_month
         st.rerun()
 
+    render_weather(data_manager, selected_year, podniky['nazev'], zkratky)
+
+
+def render_weather(data_manager, selected_year, nazvy: pd.Series, zkratky: dict):
+    """Teplota a vlhkost z meteostanic - měsíční průměry a roční období (jen podniky s uloženým počasím)"""
+    monthly = data_manager.weather.monthly(start=f"{selected_year}-01-01", end=f"{selected_year}-12-31")
+    # Zima začíná prosincem předchozího roku
+    seasonal = data_manager.weather.seasonal(start=f"{selected_year - 1}-12-01", end=f"{selected_year}-11-30")
+    seasonal = seasonal[seasonal['rok'] == selected_year]
+    if monthly.empty and seasonal.empty:
+        return
+
+    st.subheader(f"Počasí z meteostanic {selected_year}")
+    if not monthly.empty:
+        teploty = monthly.pivot_table(index='podnik_id', columns='mesic', values='temp_c')
+        teploty = teploty[teploty.index.isin(nazvy.index)]
+        teploty.columns = [f"{zkratky[m]} [°C]" for m in teploty.columns]
+        teploty.insert(0, 'Podnik', nazvy.reindex(teploty.index).values)
+        st.dataframe(teploty.round(1), use_container_width=True, hide_index=True)
+
+    if not seasonal.empty:
+        obdobi = seasonal[seasonal['podnik_id'].isin(nazvy.index)].assign(
+            Podnik=lambda d: nazvy.reindex(d['podnik_id']).values)
+        obdobi = obdobi[['Podnik', 'obdobi', 'rain_mm', 'temp_c', 'temp_min_c', 'temp_max_c', 'humidity_pct']].rename(columns={
+            'obdobi': 'Období', 'rain_mm': 'Srážky [mm]', 'temp_c': 'Teplota [°C]',
+            'temp_min_c': 'Min [°C]', 'temp_max_c': 'Max [°C]', 'humidity_pct': 'Vlhkost [%]'})
+        st.dataframe(obdobi.round(1), use_container_width=True, hide_index=True)
 
-def render_detail(data_manager, user, year_data, selected_year, podnik_id, mesic_num, mesice_nazvy, businesses):
+
+def render_detail(data_manager, user, rollups, selected_year, podnik_id, mesic_num, mesice_nazvy, businesses):
     """Zobrazí detail denních srážek pro podnik a měsíc"""
 
     # Tlačítko zpět
@@ -177,12 +165,8 @@ def render_detail(data_manager, user, year_data, selected_year, podnik_id, mesic
         st.rerun()
 
     # Získat název podniku
-    if isinstance(podnik_id, (int, float)):
-        podnik_nazev = businesses[businesses['id'] == podnik_id]['nazev'].iloc[0] if not businesses.empty else 'Neznámý'
-        detail_data = year_data[(year_data['PodnikID'] == podnik_id) & (year_data['mesic'] == mesic_num)]
-    else:
-        podnik_nazev = podnik_id
-        detail_data = year_data[(year_data['podnik_nazev'] == podnik_id) & (year_data['mesic'] == mesic_num)]
+    podnik_row = businesses[businesses['id'] == podnik_id] if not businesses.empty else pd.DataFrame()
+    podnik_nazev = podnik_row['nazev'].iloc[0] if not podnik_row.empty else 'Neznámý'
 
     mesic_nazev = mesice_nazvy[mesic_num]
 
@@ -191,35 +175,11 @@ def render_detail(data_manager, user, year_data, selected_year, podnik_id, mesic
     # Počet dnů v měsíci
     dni_v_mesici = calendar.monthrange(selected_year, mesic_num)[1]
 
-    # Vytvořit tabulku pro dny
-    data_rows = []
-
-    # Agregace podle míst (pokud existuje)
-    if 'Misto' in detail_data.columns:
-        mista = detail_data['Misto'].unique()
-    else:
-        mista = [podnik_nazev]
-
-    for misto in mista:
-        if 'Misto' in detail_data.columns:
-            misto_data = detail_data[detail_data['Misto'] == misto]
-        else:
-            misto_data = detail_data
-
-        row = {'Místo': misto if pd.notna(misto) else podnik_nazev}
-
-        for den in range(1, dni_v_mesici + 1):
-            den_hodnota = misto_data[misto_data['den'] == den]['Objem'].sum()
-            row[str(den)] = int(den_hodnota)
-
-        data_rows.append(row)
-
-    if not data_rows:
-        # Prázdná tabulka
-        row = {'Místo': podnik_nazev}
-        for den in range(1, dni_v_mesici + 1):
-            row[str(den)] = 0
-        data_rows.append(row)
+    # Denní hodnoty z předpočítaného souhrnu (chybějící dny = 0)
+    den_hodnoty = rollups.days(int(podnik_id), selected_year, mesic_num)
+    row = {'Místo': podnik_nazev}
+    row.update({str(den): int(hodnota) for den, hodnota in den_hodnoty.items()})
+    data_rows = [row]
 
     df = pd.DataFrame(data_rows)
 
@@ -249,8 +209,7 @@ def render_detail(data_manager, user, year_data, selected_year, podnik_id, mesic
         st.markdown("---")
 
         # Tlačítko pro stažení z meteostanice (pokud má podnik sensor_addr)
-        actual_podnik_id = podnik_id if isinstance(podnik_id, (int, float)) else businesses[businesses['nazev'] == podnik_id]['id'].iloc[0]
-        podnik_row = businesses[businesses['id'] == actual_podnik_id]
+        actual_podnik_id = podnik_id
 
         if not podnik_row.empty and 'sensor_addr' in businesses.columns:
             sensor_addr = podnik_row.iloc[0].get('sensor_addr')
@@ -275,36 +234,20 @@ def render_detail(data_manager, user, year_data, selected_year, podnik_id, mesic
                             if rain is None:
                                 rain = 0.0
 
-                            # Uložit do databáze
-                            misto_mapping = {1: 30, 2: 29, 3: 28, 4: 27, 5: 26, 6: 25, 8: 42, 9: 43}
-                            misto_id = misto_mapping.get(int(actual_podnik_id), 30)
-
-                            srazky_df = data_manager.get_sbernasrazky()
+                            # Uložit do databáze - srážky, pak počasí (chyba počasí jen varuje)
+                            result = data_manager.upsert_sbernasrazky([{
+                                'PodnikID': int(actual_podnik_id),
+                                'Datum': api_date,
+                                'Objem': rain
+                            }])
+                            if api_date:
+                                data_manager.save_weather([{**weather, 'podnik_id': int(actual_podnik_id)}])
 
-                            # Zkontrolovat existující záznam
-                            existing = srazky_df[
-                                (srazky_df['PodnikID'] == actual_podnik_id) &
-                                (srazky_df['Datum'].astype(str) == api_date)
-                            ]
-
-                            if not existing.empty:
-                                idx = existing.index[0]
-                                srazky_df.loc[idx, 'Objem'] = rain
+                            if result.get('updated'):
                                 msg = f"Aktualizováno: {api_date} - {rain:.1f} mm"
                             else:
-                                new_id = srazky_df['id'].max() + 1 if not srazky_df.empty else 1
-                                new_row = {
-                                    'id': new_id,
-                                    'MistoID': misto_id,
-                                    'PodnikID': actual_podnik_id,
-                                    'Datum': api_date,
-                                    'Objem': rain
-                                }
-                                srazky_df = pd.concat([srazky_df, pd.DataFrame([new_row])], ignore_index=True)
                                 msg = f"Uloženo: {api_date} - {rain:.1f} mm"
 
-                            data_manager.save_sbernasrazky(srazky_df)
-
                             if temp is not None:
                                 st.success(f"{msg} (teplota: {temp:.1f}°C)")
                             else:
@@ -336,25 +279,12 @@ def render_detail(data_manager, user, year_data, selected_year, podnik_id, mesic
                 # Vytvořit datum
                 datum = date(selected_year, mesic_num, den)
 
-                # Zjistit PodnikID
-                actual_podnik_id = podnik_id if isinstance(podnik_id, (int, float)) else businesses[businesses['nazev'] == podnik_id]['id'].iloc[0]
-
-                # Výchozí MistoID pro podniky
-                misto_mapping = {1: 30, 2: 29, 3: 28, 4: 27, 5: 26, 6: 25, 8: 42, 9: 43}
-                misto_id = misto_mapping.get(int(actual_podnik_id), 30)
-
-                # Přidat do CSV
-                new_row = {
-                    'id': data_manager.get_sbernasrazky()['id'].max() + 1 if not data_manager.get_sbernasrazky().empty else 1,
-                    'MistoID': misto_id,
-                    'PodnikID': actual_podnik_id,
+                # Přidat nebo přepsat srážku pro daný den
+                data_manager.upsert_sbernasrazky([{
+                    'PodnikID': int(actual_podnik_id),
                     'Datum': datum.strftime('%Y-%m-%d'),
                     'Objem': objem
-                }
-
-                srazky_df = data_manager.get_sbernasrazky()
-                srazky_df = pd.concat([srazky_df, pd.DataFrame([new_row])], ignore_index=True)
-                data_manager.save_sbernasrazky(srazky_df)
+                }])
 
                 st.success(f"Srážka {objem} mm pro {datum} byla přidána.")
                 st.rerun()
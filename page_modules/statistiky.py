@@ -6,20 +6,16 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from utils.aggregations import Aggregations
 
 
 def show(data_manager, user, auth_manager=None):
     """Vstupní bod pro zobrazení stránky"""
-    # Získání podniků uživatele
-    user_businesses = []
-    if user['role'] != 'admin':
-        userpodniky = data_manager.get_userpodniky()
-        user_businesses = userpodniky[userpodniky['user_id'] == user['id']]['podnik_id'].tolist()
+    # Data jsou omezená na podniky uživatele už v data_manager (viz ScopedData)
+    render(data_manager)
 
-    render(data_manager, user_businesses)
 
-
-def render(data_manager, user_businesses):
+def render(data_manager):
     """Vykreslí stránku se statistikami"""
     st.header("Roční statistiky")
 
@@ -30,11 +26,6 @@ def render(data_manager, user_businesses):
     varieties = data_manager.get_varieties_seed()
     odpisy = data_manager.get_odpisy()
 
-    # Filtrování podle podniků uživatele
-    if user_businesses:
-        fields = data_manager.filter_by_business(fields, user_businesses)
-        odpisy = data_manager.filter_by_business(odpisy, user_businesses)
-
     if fields.empty:
         st.warning("Nejsou k dispozici žádná data pro zobrazení statistik.")
         return
@@ -381,6 +372,37 @@ def render(data_manager, user_businesses):
 
     st.divider()
 
+    # ==================== SEKCE 4.5: POČASÍ SEZÓNY ====================
+    st.subheader(f"Počasí sezóny {selected_year - 1}/{selected_year}")
+
+    weather = Aggregations(data_manager).get_weather_features()
+    weather = weather[weather['rok_sklizne'] == selected_year]
+
+    if not weather.empty and not businesses.empty and not year_fields.empty:
+        podnik_vynos = year_fields.groupby('podnik_id').agg({'vymera': 'sum', production_col: 'sum'})
+        podnik_vynos['Výnos (t/ha)'] = podnik_vynos[production_col] / podnik_vynos['vymera'].where(podnik_vynos['vymera'] > 0)
+
+        weather = weather.merge(
+            businesses[['id', 'nazev']].rename(columns={'nazev': 'Podnik'}),
+            left_on='podnik_id',
+            right_on='id',
+            how='left'
+        ).merge(podnik_vynos[['Výnos (t/ha)']], left_on='podnik_id', right_index=True, how='left')
+
+        weather_display = weather[['Podnik', 'Výnos (t/ha)', 'srazky_sezona_mm', 'srazky_jaro_mm',
+                                   'srazky_leto_mm', 'max_sucho_dni', 'gdd']].rename(columns={
+            'srazky_sezona_mm': 'Srážky říjen-červenec (mm)',
+            'srazky_jaro_mm': 'Srážky jaro (mm)',
+            'srazky_leto_mm': 'Srážky léto (mm)',
+            'max_sucho_dni': 'Nejdelší sucho (dny)',
+            'gdd': 'GDD (°C·den)'
+        })
+        st.dataframe(weather_display.round(2), use_container_width=True, hide_index=True)
+    else:
+        st.info("Pro tento rok nejsou k dispozici data o počasí.")
+
+    st.divider()
+
     # ==================== SEKCE 5: ŽEBŘÍČKY ====================
     st.subheader(f"Žebříčky pro rok {selected_year}")
 
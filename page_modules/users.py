@@ -4,6 +4,8 @@ Správa uživatelů (pouze pro adminy)
 import streamlit as st
 import pandas as pd
 
+from utils.passwords import MAX_PASSWORD_BYTES, hash_password
+
 
 def show(data_manager, user, auth_manager):
     """Zobrazí stránku správy uživatelů"""
@@ -64,6 +66,8 @@ def show(data_manager, user, auth_manager):
                     st.error("Uživatelské jméno, email a heslo jsou povinné")
                 elif len(password) < 6:
                     st.error("Heslo musí mít alespoň 6 znaků")
+                elif len(password.encode('utf-8')) > MAX_PASSWORD_BYTES:
+                    st.error(f"Heslo může mít nejvýš {MAX_PASSWORD_BYTES} bajtů")
                 else:
                     # Kontrola, zda uživatel již existuje
                     if not users.empty and username in users['username'].values:
@@ -72,7 +76,7 @@ def show(data_manager, user, auth_manager):
                         new_user = {
                             'username': username,
                             'email': email,
-                            'password': '',  # V produkci by se mělo hashovat
+                            'password': hash_password(password),
                             'role': role,
                             'full_name': full_name,
                             'business_ids': business_ids,
@@ -83,7 +87,6 @@ def show(data_manager, user, auth_manager):
                         }
                         if data_manager.add_record('users.csv', new_user):
                             st.success(f"Uživatel '{username}' byl úspěšně vytvořen!")
-                            st.info("💡 V demo režimu je heslo uloženo bez šifrování. V produkci se hesla šifrují.")
                             st.session_state.show_add_user_form = False
                             st.rerun()
 
@@ -11,20 +11,8 @@ def show(data_manager, user, auth_manager):
     """Vstupní bod pro zobrazení stránky zadávání dat"""
     st.title("📝 Zadávání dat")
 
-    # Načtení dat
-    businesses = data_manager.get_businesses()
-    fields = data_manager.get_fields()
-    crops = data_manager.get_crops()
-    varieties = data_manager.get_varieties_seed()
-    pozemky = data_manager.get_pozemky()
-    typpozemek = data_manager.get_typpozemek()
-    sbernasrazky = data_manager.get_sbernasrazky()
-    sbernamista = data_manager.get_sbernamista()
-    odpisy = data_manager.get_odpisy()
-    roky = data_manager.get_roky()
-
-    # Filtrovat podniky podle oprávnění uživatele
-    allowed_businesses = auth_manager.get_allowed_podniky(user, businesses)
+    # Podniky uživatele (data stránky jsou na ně omezená) - tabulky se načtou až podle zvoleného podniku
+    allowed_businesses = data_manager.allowed_businesses()
 
     if allowed_businesses.empty:
         st.warning("Nemáte přiřazený žádný podnik. Kontaktujte administrátora.")
@@ -45,6 +33,17 @@ def show(data_manager, user, auth_manager):
 
     podnik_name = podnik_options[selected_podnik]
 
+    # Tabulky se načtou až při prvním použití; sdílená cache načte celou tabulku,
+    # stránka si kopíruje jen řádky podniku
+    fields = data_manager.lazy('fields.csv', where={'podnik_id': selected_podnik})
+    pozemky = data_manager.lazy('pozemky.csv', where={'PodnikID': selected_podnik})
+    sbernasrazky = data_manager.lazy('sbernasrazky.csv', where={'PodnikID': selected_podnik})
+    odpisy = data_manager.lazy('odpisy.csv', where={'podnik_id': selected_podnik})
+    crops = data_manager.lazy('crops.csv', columns=['id', 'nazev'])
+    varieties = data_manager.lazy('varieties_seed.csv', columns=['id', 'nazev'])
+    typpozemek = data_manager.lazy('typpozemek.csv', columns=['id', 'Nazev'])
+    sbernamista = data_manager.lazy('sbernamista.csv', columns=['id', 'Nazev'])
+
     # Kontrola práv k editaci
     can_edit = auth_manager.can_edit_podnik(user, selected_podnik)
 
@@ -86,13 +85,13 @@ def show(data_manager, user, auth_manager):
 
         # === FORMULÁŘE ===
         if st.session_state.get('show_form') == 'pole':
-            show_pole_form(data_manager, selected_podnik, podnik_name, crops, varieties, fields)
+            show_pole_form(data_manager, selected_podnik, podnik_name, crops.df, varieties.df, fields)
 
         elif st.session_state.get('show_form') == 'pozemek':
-            show_pozemek_form(data_manager, selected_podnik, podnik_name, typpozemek, pozemky)
+            show_pozemek_form(data_manager, selected_podnik, podnik_name, typpozemek.df, pozemky)
 
         elif st.session_state.get('show_form') == 'srazky':
-            show_srazky_form(data_manager, selected_podnik, podnik_name, sbernamista, sbernasrazky)
+            show_srazky_form(data_manager, selected_podnik, podnik_name, sbernamista.df, sbernasrazky)
 
         elif st.session_state.get('show_form') == 'odpis':
             show_odpis_form(data_manager, selected_podnik, podnik_name, odpisy)
@@ -103,7 +102,7 @@ def show(data_manager, user, auth_manager):
     st.markdown("---")
 
     # === TABULKA DAT ===
-    show_data_table(data_manager, selected_podnik, podnik_name, can_edit, fields, crops, varieties, pozemky, typpozemek, sbernasrazky, sbernamista)
+    show_data_table(data_manager, selected_podnik, podnik_name, can_edit, fields, crops, varieties, pozemky, typpozemek, sbernasrazky, sbernamista, odpisy)
 
 
 def show_pole_form(data_manager, podnik_id, podnik_name, crops, varieties, fields):
@@ -201,12 +200,8 @@ def show_pozemek_form(data_manager, podnik_id, podnik_name, typpozemek, pozemky)
             if velikost <= 0:
                 st.error("Velikost musí být větší než 0")
             else:
-                # Najít max ID
-                max_id = pozemky['id'].max() if not pozemky.empty else 0
-                new_id = int(max_id) + 1
-
+                # ID přidělí add_record ze sekvence tabulky
                 new_pozemek = {
-                    'id': new_id,
                     'PodnikID': podnik_id,
                     'Year': int(rok),
                     'Velikost': velikost,
@@ -239,7 +234,7 @@ def show_srazky_form(data_manager, podnik_id, podnik_name, sbernamista, sbernasr
             # Sběrné místo
             misto_options = {}
             if not sbernamista.empty:
-                misto_options = {row['id']: row['nazev'] for _, row in sbernamista.iterrows()}
+                misto_options = {row['id']: row['Nazev'] for _, row in sbernamista.iterrows()}
             selected_misto = st.selectbox("Sběrné místo *", options=list(misto_options.keys()), format_func=lambda x: misto_options[x]) if misto_options else None
 
         col1, col2 = st.columns(2)
@@ -254,12 +249,8 @@ def show_srazky_form(data_manager, podnik_id, podnik_name, sbernamista, sbernasr
             elif not selected_misto:
                 st.error("Vyberte sběrné místo")
             else:
-                # Najít max ID
-                max_id = sbernasrazky['id'].max() if not sbernasrazky.empty else 0
-                new_id = int(max_id) + 1
-
+                # ID přidělí add_record ze sekvence tabulky
                 new_srazka = {
-                    'id': new_id,
                     'MistoID': selected_misto,
                     'PodnikID': podnik_id,
                     'Objem': objem,
@@ -328,24 +319,22 @@ def show_odpis_form(data_manager, podnik_id, podnik_name, odpisy):
             st.rerun()
 
 
-def show_data_table(data_manager, podnik_id, podnik_name, can_edit, fields, crops, varieties, pozemky, typpozemek, sbernasrazky, sbernamista):
-    """Zobrazí tabulku dat s akcemi"""
+def show_data_table(data_manager, podnik_id, podnik_name, can_edit, fields, crops, varieties, pozemky, typpozemek, sbernasrazky, sbernamista, odpisy):
+    """Zobrazí tabulku dat s akcemi (tabulky jsou LazyTable, načte se jen vybraná)"""
     st.subheader(f"📊 Data podniku: {podnik_name}")
 
-    # Tabs pro různé typy dat
-    tab1, tab2, tab3, tab4 = st.tabs(["🚜 Pole", "🗺️ Pozemky", "📦 Srážky", "📝 Odpisy"])
-
-    with tab1:
-        show_fields_table(data_manager, podnik_id, can_edit, fields, crops, varieties)
+    # Výběr typu dat - st.tabs by vykreslil všechny záložky a načetl všechny tabulky
+    tabulky = ["🚜 Pole", "🗺️ Pozemky", "📦 Srážky", "📝 Odpisy"]
+    vyber = st.radio("Data", tabulky, horizontal=True, key="zadavani_tabulka", label_visibility="collapsed")
 
-    with tab2:
-        show_pozemky_table(data_manager, podnik_id, can_edit, pozemky, typpozemek)
-
-    with tab3:
-        show_srazky_table(data_manager, podnik_id, can_edit, sbernasrazky, sbernamista)
-
-    with tab4:
-        show_odpisy_table(data_manager, podnik_id, can_edit)
+    if vyber == tabulky[0]:
+        show_fields_table(data_manager, podnik_id, can_edit, fields.df, crops.df, varieties.df)
+    elif vyber == tabulky[1]:
+        show_pozemky_table(data_manager, podnik_id, can_edit, pozemky.df, typpozemek.df)
+    elif vyber == tabulky[2]:
+        show_srazky_table(data_manager, podnik_id, can_edit, sbernasrazky.df, sbernamista.df)
+    else:
+        show_odpisy_table(data_manager, podnik_id, can_edit, odpisy.df)
 
 
 def show_fields_table(data_manager, podnik_id, can_edit, fields, crops, varieties):
@@ -471,8 +460,8 @@ def show_srazky_table(data_manager, podnik_id, can_edit, sbernasrazky, sbernamis
 
     # Sloučit s názvy míst
     if not sbernamista.empty:
-        podnik_srazky = podnik_srazky.merge(sbernamista[['id', 'nazev']], left_on='MistoID', right_on='id', how='left', suffixes=('', '_misto'))
-        podnik_srazky['misto'] = podnik_srazky['nazev'].fillna('-')
+        podnik_srazky = podnik_srazky.merge(sbernamista[['id', 'Nazev']], left_on='MistoID', right_on='id', how='left', suffixes=('', '_misto'))
+        podnik_srazky['misto'] = podnik_srazky['Nazev'].fillna('-')
     else:
         podnik_srazky['misto'] = '-'
 
@@ -504,9 +493,8 @@ def show_srazky_table(data_manager, podnik_id, can_edit, sbernasrazky, sbernamis
         st.markdown("---")
 
 
-def show_odpisy_table(data_manager, podnik_id, can_edit):
+def show_odpisy_table(data_manager, podnik_id, can_edit, odpisy):
     """Zobrazí tabulku odpisů"""
-    odpisy = data_manager.get_odpisy()
     podnik_odpisy = odpisy[odpisy['podnik_id'] == podnik_id] if not odpisy.empty and 'podnik_id' in odpisy.columns else pd.DataFrame()
 
     if podnik_odpisy.empty:
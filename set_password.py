@@ -0,0 +1,15 @@
+"""
+Nastavení hesla uživatele v users.csv (bcrypt)
+
+Použití:
+    python set_password.py adminpetr
+    python set_password.py agronom --rounds 13
+    python set_password.py agronom --data-dir /cesta/k/datům
+"""
+import sys
+
+from utils.passwords import main
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,253 @@
+"""
+Lokální snímek dat agenta (Parquet) s obnovou z API na pozadí
+
+Snímek leží ve složce (jedna na URL API):
+    agent_cache/<hash URL>/snapshot.json   - verze sad, ETag, časy
+    agent_cache/<hash URL>/fields.parquet  - jedna datová sada
+
+Po restartu se data načtou ze snímku bez dotazu na API. Obnova se ptá
+nejdřív na /data/versions (s If-None-Match) a stahuje jen sady, jejichž
+verze se změnila - ve sloupcovém tvaru (/data?layout=columns).
+"""
+import os
+import json
+import hashlib
+import threading
+import requests
+import pandas as pd
+from datetime import datetime
+from typing import Optional, List
+
+# Datové sady z /data (klíč _type záznamů)
+DATA_TYPES = [
+    "businesses", "crops", "fields", "pozemky", "varieties_seed", "sbernamista",
+    "sbernasrazky", "typpozemek", "roky", "sumplodiny", "userpodniky", "odpisy",
+    "field_lineage",
+]
+
+SNAPSHOT_FILE = 'snapshot.json'
+
+# Po neúspěšné obnově se na pozadí zkouší znovu nejdřív po této době (s)
+RETRY_AFTER = 60
+
+
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Sloupce se smíšenými typy (čísla i text) převede na text - Parquet je neumí"""
+    for col in df.columns[df.dtypes == object]:
+        values = df[col].dropna()
+        if values.map(type).nunique() > 1:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def frames_from_columns(payload: dict, types: Optional[List[str]] = None) -> dict:
+    """
+    DataFrame pro každou sadu z odpovědi /data?layout=columns
+
+    Sloupce přicházejí jako seznamy hodnot, tabulka se tak staví po
+    sloupcích bez procházení jednotlivých záznamů a každá sada má jen
+    své sloupce.
+    """
+    return {data_type: normalize_frame(pd.DataFrame(payload[data_type])) if payload.get(data_type) else pd.DataFrame()
+            for data_type in (types or DATA_TYPES)}
+
+
+def split_records(records: list, types: Optional[List[str]] = None) -> dict:
+    """Rozdělí záznamy z /data podle _type na DataFrame pro každou sadu (API bez layout=columns)"""
+    grouped = {data_type: [] for data_type in (types or DATA_TYPES)}
+    for record in records:
+        record_type = record.pop("_type", None)
+        if record_type in grouped:
+            grouped[record_type].append(record)
+    return {data_type: normalize_frame(pd.DataFrame(rows)) if rows else pd.DataFrame()
+            for data_type, rows in grouped.items()}
+
+
+class AgentSnapshot:
+    """Data agenta uložená lokálně a obnovovaná z API
+
+    Objekt sdílí všechny session (st.cache_resource); obnova na pozadí
+    vymění data najednou pod zámkem, další překreslení stránky už vidí
+    novou verzi. Obnovy (tlačítko i vlákno na pozadí) se střídají pod
+    vlastním zámkem, takže do souborů snímku nikdy nezapisují dvě najednou.
+    """
+
+    def __init__(self, api_url: str, cache_dir: str, max_age: int = 3600):
+        """
+        Args:
+            api_url: Adresa API (např. http://localhost:8888)
+            cache_dir: Kořenová složka snímků
+            max_age: Po kolika sekundách od poslední kontroly se ptát API znovu
+        """
+        self.api_url = api_url.rstrip('/')
+        self.path = os.path.join(cache_dir, hashlib.sha1(self.api_url.encode()).hexdigest()[:12])
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+        # Sady, které se nepodařilo uložit na disk - zkusí se při příští obnově
+        self._unsaved = set()
+        self._failed_at = None
+        self.error = None
+        self.meta = {'api_url': self.api_url, 'versions': {}, 'etag': None, 'updated_at': None, 'checked_at': None}
+        self.frames = None
+        self._load()
+
+    def _load(self):
+        """Načte snímek z disku (pokud existuje a je úplný)"""
+        meta_path = os.path.join(self.path, SNAPSHOT_FILE)
+        if not os.path.exists(meta_path):
+            return
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            frames = {}
+            for data_type in DATA_TYPES:
+                path = os.path.join(self.path, f"{data_type}.parquet")
+                if os.path.exists(path):
+                    frames[data_type] = pd.read_parquet(path)
+                else:
+                    # Sada přidaná po uložení snímku - stáhne se při příští obnově
+                    frames[data_type] = pd.DataFrame()
+                    meta.get('versions', {}).pop(data_type, None)
+                    meta['etag'] = None
+        except Exception as e:
+            # Poškozený nebo neúplný snímek - stáhne se znovu
+            self.error = f"Snímek nelze načíst: {e}"
+            return
+        self.meta, self.frames = meta, frames
+
+    def _save(self, frames: dict, changed: List[str]):
+        """
+        Uloží změněné sady a metadata; chyba zápisu obnovu neukončí
+
+        Metadata se zapíší až po všech sadách - při chybě zůstanou na disku
+        staré verze, takže snímek po restartu neúplné sady stáhne znovu.
+        """
+        pending = self._unsaved | set(changed)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            for data_type in sorted(pending):
+                path = os.path.join(self.path, f"{data_type}.parquet")
+                frames.get(data_type, pd.DataFrame()).to_parquet(path + '.tmp', index=False)
+                os.replace(path + '.tmp', path)
+            self._save_meta()
+        except Exception as e:
+            self._unsaved = pending
+            self.error = f"Snímek nelze uložit: {e}"
+            return
+        self._unsaved = set()
+
+    def _save_meta(self):
+        os.makedirs(self.path, exist_ok=True)
+        meta_path = os.path.join(self.path, SNAPSHOT_FILE)
+        with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False, indent=1)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def get(self) -> Optional[dict]:
+        """
+        Data pro stránky ve tvaru původního fetch_all_data
+
+        Returns:
+            Dict sada -> DataFrame + _last_update, _version, _status; None bez snímku
+        """
+        with self.lock:
+            if self.frames is None:
+                return None
+            data = dict(self.frames)
+            data["_last_update"] = self.meta['updated_at']
+            data["_checked_at"] = self.meta['checked_at']
+            data["_version"] = self.meta['etag'] or self.meta['updated_at']
+            data["_status"] = "ok"
+            return data
+
+    def is_stale(self) -> bool:
+        checked = self.meta.get('checked_at')
+        if self.frames is None or not checked:
+            return True
+        age = datetime.now() - datetime.strptime(checked, "%Y-%m-%d %H:%M:%S")
+        return age.total_seconds() > self.max_age
+
+    def _fetch(self, types: Optional[List[str]] = None) -> dict:
+        params = {'layout': 'columns'}
+        if types:
+            params['types'] = ','.join(types)
+        response = requests.get(f"{self.api_url}/data", params=params, timeout=30)
+        response.raise_for_status()
+        payload = response.json()
+        # Starší API parametr layout nezná a vrací pole záznamů
+        if isinstance(payload, list):
+            return split_records(payload, types)
+        return frames_from_columns(payload, types)
+
+    def refresh(self) -> bool:
+        """
+        Obnoví snímek z API (synchronně)
+
+        Běží-li právě jiná obnova (na pozadí), počká se na její konec.
+
+        Returns:
+            True pokud se data změnila
+        """
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self) -> bool:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        headers = {'If-None-Match': self.meta['etag']} if self.meta.get('etag') and self.frames is not None else {}
+        try:
+            response = requests.get(f"{self.api_url}/data/versions", headers=headers, timeout=30)
+
+            if response.status_code == 304:
+                with self.lock:
+                    self.meta['checked_at'] = now
+                    self.error = None
+                    frames = self.frames
+                self._save(frames, [])
+                return False
+
+            if response.status_code == 404:
+                # Starší API bez verzí - stáhnout vše
+                versions, etag = {}, None
+                changed = list(DATA_TYPES)
+                fetched = self._fetch()
+            else:
+                response.raise_for_status()
+                versions, etag = response.json(), response.headers.get('ETag')
+                known = self.meta.get('versions', {}) if self.frames is not None else {}
+                changed = [t for t in DATA_TYPES if t not in known or versions.get(t) != known[t]]
+                fetched = self._fetch(changed if len(changed) < len(DATA_TYPES) else None) if changed else {}
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self.error = str(e)
+            self._failed_at = datetime.now()
+            return False
+
+        with self.lock:
+            frames = dict(self.frames or {})
+            frames.update(fetched)
+            self.frames = frames
+            self.meta.update(versions=versions, etag=etag, checked_at=now)
+            if changed:
+                self.meta['updated_at'] = now
+            self.error = None
+        self._save(frames, changed)
+        return bool(changed)
+
+    def refresh_async(self) -> bool:
+        """
+        Spustí obnovu na pozadí, pokud je snímek starší než max_age
+
+        Returns:
+            True pokud se obnova spustila
+        """
+        if not self.is_stale():
+            return False
+        if self._failed_at is not None and (datetime.now() - self._failed_at).total_seconds() < RETRY_AFTER:
+            return False
+        with self.lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(target=self.refresh, daemon=True, name="agent-snapshot-refresh")
+            self._thread.start()
+        return True
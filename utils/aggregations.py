@@ -3,6 +3,7 @@ Agregační funkce pro výpočty podle Nette aplikace
 """
 import pandas as pd
 import numpy as np
+from typing import Optional, List
 
 
 class Aggregations:
@@ -214,3 +215,46 @@ class Aggregations:
             return summary
 
         return pd.DataFrame()
+
+    def get_weather_features(self, podnik_ids: Optional[List[int]] = None) -> pd.DataFrame:
+        """
+        Počasí za vegetační sezónu podle podniku a roku sklizně
+
+        Args:
+            podnik_ids: Seznam ID podniků (None = všechny povolené data_manageru)
+
+        Returns:
+            DataFrame se sloupci podnik_id, rok_sklizne, srazky_sezona_mm,
+            srazky_jaro_mm, srazky_leto_mm, max_sucho_dni, gdd, dni_teplota
+        """
+        if podnik_ids is None:
+            podnik_ids = self.data_manager.podnik_ids
+        return self.data_manager.get_weather_features().table(podnik_ids)
+
+    def get_yield_weather(self, podnik_ids: Optional[List[int]] = None) -> pd.DataFrame:
+        """
+        Výnosy podle podniku, roku a plodiny spojené s počasím sezóny
+
+        Args:
+            podnik_ids: Seznam ID podniků (None = všechny)
+
+        Returns:
+            DataFrame s výměrou, čistou váhou, výnosem a sloupci z get_weather_features
+        """
+        fields = self.data_manager.get_fields()
+        if fields.empty:
+            return pd.DataFrame()
+
+        fields = self.data_manager.filter_by_business(fields, podnik_ids)
+
+        yields = fields.groupby(['podnik_id', 'rok_sklizne', 'plodina_id']).agg({
+            'vymera': 'sum',
+            'cista_vaha': 'sum'
+        }).reset_index()
+        yields['cisty_vynos'] = (yields['cista_vaha'] / yields['vymera'].where(yields['vymera'] > 0)).round(2).fillna(0)
+
+        weather = self.get_weather_features(podnik_ids)
+        yields['podnik_id'] = yields['podnik_id'].astype(int)
+        yields['rok_sklizne'] = yields['rok_sklizne'].astype(int)
+
+        return yields.merge(weather, on=['podnik_id', 'rok_sklizne'], how='left')
@@ -0,0 +1,209 @@
+"""
+Výpočty analýz agenta v samostatných procesech s výsledky uloženými na disku
+
+Úloha se odešle s klíčem z obsahu (druh úlohy + verze dat + parametry).
+Stejný klíč znamená stejný výsledek - hotová úloha se jen načte z disku,
+běžící se neposílá znovu. Stránka se mezitím vykreslí a průběh si přečte
+ze souboru, který úloha v procesu průběžně přepisuje:
+
+    <cache_dir>/<klíč>.pkl       - výsledek (pickle)
+    <cache_dir>/<klíč>.progress  - průběh běžící úlohy (JSON)
+"""
+import os
+import json
+import time
+import pickle
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import pandas as pd
+
+from utils.yield_stability import YieldStability
+from utils.yield_trends import YieldTrends
+
+# Kolik načtených výsledků držet v paměti
+MEMORY_RESULTS = 16
+
+# Výsledky starší než tato doba (s) se při startu smažou
+MAX_AGE = 7 * 24 * 3600
+
+
+class Progress:
+    """Zápis průběhu úlohy do souboru (předává se do procesu místo callbacku)"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, done: int, total: int, message: str = ""):
+        with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'done': done, 'total': total, 'message': message}, f)
+        os.replace(self.path + '.tmp', self.path)
+
+
+def _run(func, args: tuple, result_path: str, progress_path: str) -> str:
+    """Spustí úlohu v procesu workeru a uloží výsledek"""
+    result = func(*args, progress=Progress(progress_path))
+    with open(result_path + '.tmp', 'wb') as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(result_path + '.tmp', result_path)
+    if os.path.exists(progress_path):
+        os.remove(progress_path)
+    return result_path
+
+
+class AnalyticsWorker:
+    """Pool procesů pro analýzy agenta (sdílený všemi session přes st.cache_resource)
+
+    Procesy se zakládají metodou spawn - Streamlit běží ve vláknech a fork
+    takového procesu není bezpečný. Spawn v procesu znovu načte hlavní
+    skript, agent_app proto spouští main() jen pod __main__.
+    """
+
+    def __init__(self, cache_dir: str, max_workers: Optional[int] = None):
+        """
+        Args:
+            cache_dir: Složka výsledků a průběhu
+            max_workers: Počet procesů (None = počet jader)
+        """
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+        self._executor = None
+        self._futures = {}
+        self._results = OrderedDict()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.prune()
+
+    @staticmethod
+    def job_key(kind: str, params: tuple) -> str:
+        """Klíč úlohy z druhu a parametrů (parametry musí jít převést na JSON)"""
+        content = json.dumps([kind, params], default=str, sort_keys=True)
+        return f"{kind}-{hashlib.sha1(content.encode()).hexdigest()[:16]}"
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.{suffix}")
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def submit(self, kind: str, params: tuple, func, *args) -> str:
+        """
+        Odešle úlohu func(*args, progress=...), pokud ještě není hotová ani neběží
+
+        Args:
+            kind: Druh úlohy (část klíče a názvu souboru)
+            params: Parametry, které určují výsledek (verze dat, filtry)
+            func: Funkce na úrovni modulu (musí jít předat do procesu)
+
+        Returns:
+            Klíč úlohy pro status() a result()
+        """
+        key = self.job_key(kind, params)
+        with self.lock:
+            if key in self._results or os.path.exists(self._path(key, 'pkl')):
+                return key
+            # Chyba úlohy zůstává zobrazená do nové verze dat, znovu se posílá jen po pádu poolu
+            future = self._futures.get(key)
+            if future is not None and not (future.done() and isinstance(future.exception(), BrokenProcessPool)):
+                return key
+            progress_path = self._path(key, 'progress')
+            Progress(progress_path)(0, 1, "Čeká ve frontě")
+            try:
+                self._futures[key] = self._pool().submit(_run, func, args, self._path(key, 'pkl'), progress_path)
+            except BrokenProcessPool:
+                # Spadlý proces shodil celý pool - založit nový
+                self._executor = None
+                self._futures[key] = self._pool().submit(_run, func, args, self._path(key, 'pkl'), progress_path)
+        return key
+
+    def status(self, key: str) -> dict:
+        """
+        Stav úlohy
+
+        Returns:
+            Dict se state ('done', 'running', 'error', 'missing'), progress (0-1),
+            message a error
+        """
+        if key in self._results or os.path.exists(self._path(key, 'pkl')):
+            return {'state': 'done', 'progress': 1.0, 'message': "Hotovo", 'error': None}
+
+        future = self._futures.get(key)
+        if future is None:
+            return {'state': 'missing', 'progress': 0.0, 'message': "", 'error': None}
+        if future.done() and future.exception() is not None:
+            if isinstance(future.exception(), BrokenProcessPool):
+                self._executor = None
+            return {'state': 'error', 'progress': 0.0, 'message': "", 'error': str(future.exception())}
+
+        try:
+            with open(self._path(key, 'progress'), encoding='utf-8') as f:
+                progress = json.load(f)
+        except (OSError, ValueError):
+            # Soubor průběhu se právě přepisuje nebo už byl smazán
+            return {'state': 'running', 'progress': 0.0, 'message': "", 'error': None}
+        share = progress['done'] / progress['total'] if progress['total'] else 0.0
+        return {'state': 'running', 'progress': min(share, 1.0), 'message': progress['message'], 'error': None}
+
+    def result(self, key: str):
+        """Výsledek hotové úlohy (poslední výsledky drží i v paměti)"""
+        with self.lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+        with open(self._path(key, 'pkl'), 'rb') as f:
+            value = pickle.load(f)
+        with self.lock:
+            self._results[key] = value
+            self._futures.pop(key, None)
+            while len(self._results) > MEMORY_RESULTS:
+                self._results.popitem(last=False)
+        return value
+
+    def shutdown(self):
+        """Ukončí procesy workeru (rozpracované úlohy doběhnou)"""
+        with self.lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def prune(self, max_age: int = MAX_AGE):
+        """Smaže výsledky a soubory průběhu starší než max_age sekund"""
+        cutoff = time.time() - max_age
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+
+
+# Úlohy pro agent_app - volají se v procesu workeru s parametrem progress
+
+def trends_job(fields: pd.DataFrame, progress) -> YieldTrends:
+    """Tabulka trendů všech plodin, podniků a odrůd"""
+    progress(0, 1, "Regrese všech řad")
+    return YieldTrends(fields)
+
+
+def stability_job(fields: pd.DataFrame, crops: pd.DataFrame, lineage: pd.DataFrame, years: Optional[list],
+                  weighted: bool, progress) -> pd.DataFrame:
+    """Stabilita výnosů po polích (liniích polí) pro vybrané roky"""
+    progress(0, 2, "Příprava výnosů")
+    stability = YieldStability(fields, crops, lineage)
+    progress(1, 2, "Variabilita po polích")
+    return stability.table(years=years, weighted=weighted)
+
+
+def rolling_stability_job(fields: pd.DataFrame, crops: pd.DataFrame, lineage: pd.DataFrame, window: int,
+                          weighted: bool, progress) -> pd.DataFrame:
+    """Stabilita výnosů v klouzavém okně sezón"""
+    progress(0, 2, "Příprava výnosů")
+    stability = YieldStability(fields, crops, lineage)
+    progress(1, 2, f"Klouzavé okno {window} sezón")
+    return stability.rolling(window=window, weighted=weighted)
@@ -1,15 +1,25 @@
 """
 Autentizační modul pro správu uživatelů a rolí
 """
+import os
+import time
 import streamlit as st
 import pandas as pd
-import hashlib
-import hmac
 from typing import Optional, Dict
 
+import config
+from utils.passwords import dummy_hash, verify_password
+
 
 class AuthManager:
-    """Správce autentizace a autorizace"""
+    """Správce autentizace a autorizace
+
+    Uživatelé a jejich podniky se drží v paměti (sdílená instance přes
+    st.cache_resource): index uživatelů podle jména a id a pro každého
+    uživatele bitová maska povolených podniků (bit = ID podniku). Přihlášení
+    i kontroly přístupu jsou tak jen vyhledání ve slovníku. Indexy se
+    přestaví, když se změní users.csv, userpodniky.csv nebo businesses.csv.
+    """
 
     ROLES = {
         'admin': ['read', 'write', 'delete', 'manage_users'],
@@ -17,18 +27,109 @@ class AuthManager:
         'watcher': ['read']
     }
 
-    def __init__(self, users_csv_path: str):
+    # Jak často (s) se kontroluje změna souborů (jen čas změny, bez čtení)
+    RELOAD_CHECK = 5
+
+    def __init__(self, users_csv_path: str, data_dir: Optional[str] = None, demo: Optional[bool] = None):
+        """
+        Args:
+            users_csv_path: Cesta k users.csv
+            data_dir: Složka s userpodniky.csv a businesses.csv (výchozí složka users.csv)
+            demo: Přijímat jakékoliv heslo (None = config.AUTH_DEMO)
+        """
         self.users_csv_path = users_csv_path
+        self.data_dir = data_dir or os.path.dirname(users_csv_path)
+        self.demo = config.AUTH_DEMO if demo is None else demo
+        self._stamps = None
+        self._checked_at = 0.0
         self._load_users()
+        if not self.demo:
+            # Fiktivní hash předem - první přihlášení neznámého jména nesmí trvat déle
+            dummy_hash()
+
+    def _paths(self) -> list:
+        return [self.users_csv_path,
+                os.path.join(self.data_dir, 'userpodniky.csv'),
+                os.path.join(self.data_dir, 'businesses.csv')]
+
+    def _file_stamps(self) -> tuple:
+        stamps = []
+        for path in self._paths():
+            try:
+                stat = os.stat(path)
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
 
     def _load_users(self):
-        """Načte uživatele z CSV"""
+        """Načte uživatele a přiřazení podniků z CSV a postaví indexy"""
+        self._stamps = self._file_stamps()
+        self._checked_at = time.monotonic()
         try:
             self.users_df = pd.read_csv(self.users_csv_path)
         except Exception as e:
             st.error(f"Chyba při načítání uživatelů: {e}")
             self.users_df = pd.DataFrame()
 
+        records = self.users_df.to_dict('records') if not self.users_df.empty else []
+        # Při duplicitním jménu platí první řádek (jako dřív iloc[0])
+        self.users_by_name = {}
+        for record in records:
+            self.users_by_name.setdefault(record['username'], record)
+        self.users_by_id = {record['id']: record for record in reversed(records)}
+        self._build_access()
+
+    def _build_access(self):
+        """Seznam a bitová maska podniků pro každého uživatele z users.csv"""
+        # Uživatel bez přiřazení (i po odebrání posledního podniku) nemá přístup nikam
+        self.podniky = {user_id: [] for user_id in self.users_by_id}
+        self.access = {user_id: 0 for user_id in self.users_by_id}
+        try:
+            userpodniky_df = pd.read_csv(self._paths()[1])
+            businesses_df = pd.read_csv(self._paths()[2])
+        except Exception:
+            # Bez přiřazení nebo číselníku podniků nemá nikdo přístup
+            return
+
+        for user_id, podnik_ids in userpodniky_df.groupby('userId', sort=False)['podnikId']:
+            if user_id in self.users_by_id:
+                self.podniky[user_id] = podnik_ids.tolist()
+
+        # Admin vidí všechny podniky
+        all_ids = businesses_df['id'].tolist()
+        for user_id, record in self.users_by_id.items():
+            if record.get('role') == 'admin':
+                self.podniky[user_id] = all_ids
+
+        for user_id, podnik_ids in self.podniky.items():
+            mask = 0
+            for podnik_id in podnik_ids:
+                if pd.notna(podnik_id) and podnik_id >= 0:
+                    mask |= 1 << int(podnik_id)
+            self.access[user_id] = mask
+
+    def _maybe_reload(self):
+        """Přestaví indexy, pokud se od posledního načtení změnil některý soubor"""
+        now = time.monotonic()
+        if now - self._checked_at < self.RELOAD_CHECK:
+            return
+        self._checked_at = now
+        if self._file_stamps() != self._stamps:
+            self._load_users()
+
+    def _has_access(self, user: Dict, podnik_id) -> bool:
+        """Bit podniku v masce uživatele (uživatel, který není v users.csv, nemá přístup)"""
+        try:
+            bit = int(podnik_id)
+        except (TypeError, ValueError):
+            return False
+        if bit < 0:
+            return False
+        self._maybe_reload()
+        mask = self.access.get(user.get('id'), 0)
+        return bool(mask >> bit & 1)
+
     def authenticate(self, username: str, password: str) -> Optional[Dict]:
         """
         Autentizuje uživatele
@@ -40,39 +141,41 @@ class AuthManager:
         Returns:
             Dict s informacemi o uživateli nebo None
         """
-        user = self.users_df[self.users_df['username'] == username]
+        self._maybe_reload()
+        user = self.users_by_name.get(username)
 
-        if user.empty:
+        if user is None:
+            # Stejně dlouhé ověření jako u existujícího jména
+            if not self.demo:
+                verify_password(password, None)
             return None
 
-        user = user.iloc[0]
+        # Heslo se ověřuje i u neaktivního účtu, aby doba odpovědi neprozradila existující jméno
+        if not self._verify_password(password, user):
+            return None
 
         # Kontrola aktivity
         if not user.get('is_active', True):
             return None
 
-        # Ověření hesla (zjednodušená verze - v produkci použít bcrypt)
-        if self._verify_password(password, user):
-            # Získat přiřazené podniky podle userpodniky
-            podniky = self.get_user_podniky(user['id'])
-
-            return {
-                'id': user['id'],
-                'username': user['username'],
-                'email': user['email'],
-                'role': user['role'],
-                'full_name': user['full_name'],
-                'business_ids': user.get('business_ids', ''),
-                'podniky': podniky  # Seznam ID podniků uživatele
-            }
-
-        return None
-
-    def _verify_password(self, password: str, user: pd.Series) -> bool:
-        """Ověří heslo (zjednodušená verze)"""
-        # DEMO REŽIM - akceptuje jakékoliv heslo
-        # V produkci implementovat správné ověření s bcrypt/pbkdf2
-        return True
+        # Získat přiřazené podniky podle userpodniky
+        podniky = self.get_user_podniky(user['id'])
+
+        return {
+            'id': user['id'],
+            'username': user['username'],
+            'email': user['email'],
+            'role': user['role'],
+            'full_name': user['full_name'],
+            'business_ids': user.get('business_ids', ''),
+            'podniky': podniky  # Seznam ID podniků uživatele
+        }
+
+    def _verify_password(self, password: str, user: Dict) -> bool:
+        """Ověří heslo proti bcrypt nebo PBKDF2 hashi (v demo režimu projde jakékoliv)"""
+        if self.demo:
+            return True
+        return verify_password(password, user)
 
     def has_permission(self, role: str, permission: str) -> bool:
         """
@@ -100,32 +203,19 @@ class AuthManager:
         Vrátí seznam ID podniků přiřazených uživateli
         Admin vidí všechny podniky
         """
-        import os
-        import config
+        self._maybe_reload()
+        return list(self.podniky.get(user_id, []))
 
-        # Načti userpodniky
-        userpodniky_path = os.path.join(config.DATA_DIR, 'userpodniky.csv')
-        try:
-            userpodniky_df = pd.read_csv(userpodniky_path)
-        except:
-            return []
-
-        # Načti podniky
-        businesses_path = os.path.join(config.DATA_DIR, 'businesses.csv')
-        try:
-            businesses_df = pd.read_csv(businesses_path)
-        except:
-            return []
-
-        # Zkontroluj, zda je admin
-        user = self.users_df[self.users_df['id'] == user_id]
-        if not user.empty and user.iloc[0]['role'] == 'admin':
-            # Admin vidí všechny podniky
-            return businesses_df['id'].tolist()
+    def data_scope(self, user: Dict) -> Optional[list]:
+        """
+        Podniky, na které se omezují data stránek (DataManager.scoped)
 
-        # Ostatní vidí jen své přiřazené podniky
-        user_businesses = userpodniky_df[userpodniky_df['userId'] == user_id]
-        return user_businesses['podnikId'].tolist()
+        Returns:
+            None pro admina (bez omezení), jinak aktuální seznam přiřazených podniků
+        """
+        if user.get('role') == 'admin':
+            return None
+        return self.get_user_podniky(user.get('id'))
 
     def authorize_podnik(self, user: Dict, podnik_id: int) -> bool:
         """
@@ -142,9 +232,8 @@ class AuthManager:
         if user.get('role') == 'admin':
             return True
 
-        # Kontrola, zda podnik je v seznamu povolených podniků
-        podniky = user.get('podniky', [])
-        return podnik_id in podniky
+        # Kontrola, zda podnik je v masce povolených podniků
+        return self._has_access(user, podnik_id)
 
     def can_edit_podnik(self, user: Dict, podnik_id: int) -> bool:
         """
@@ -169,8 +258,7 @@ class AuthManager:
 
         # Editor může editovat jen přiřazené podniky
         if role == 'editor':
-            podniky = user.get('podniky', [])
-            return podnik_id in podniky
+            return self._has_access(user, podnik_id)
 
         return False
 
@@ -0,0 +1,125 @@
+"""
+Předpočítaná fakta pro chat agenta - součty, roční řady, TOP pole a ukazatele podniků
+"""
+import re
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+# Počet polí v žebříčcích TOP
+TOP_N = 5
+
+YEAR_PATTERN = re.compile(r'\b(?:19|20)\d{2}\b')
+
+
+def _names(table: Optional[pd.DataFrame]) -> dict:
+    """id -> název z číselníku (plodiny, podniky)"""
+    if table is None or table.empty or 'nazev' not in table.columns:
+        return {}
+    table = table.dropna(subset=['id', 'nazev']).drop_duplicates(subset=['id'])
+    return dict(zip(table['id'].astype(int), table['nazev'].astype(str)))
+
+
+def _totals(df: pd.DataFrame) -> dict:
+    area, prod = df['vymera'].sum(), df['cista_vaha'].sum()
+    return {'vymera': area, 'cista_vaha': prod, 'vynos': prod / area if area > 0 else 0}
+
+
+class ChatFacts:
+    """Odpovědi chatu pro jednu verzi dat
+
+    Vše, na co se chat ptá, se spočítá jednou při založení (get_chat_facts
+    v agent_app, klíčem je verze snímku); dotaz je pak vyhledání ve slovníku.
+    """
+
+    def __init__(self, fields: pd.DataFrame, crops: Optional[pd.DataFrame] = None,
+                 businesses: Optional[pd.DataFrame] = None, top_n: int = TOP_N):
+        self.crop_names = _names(crops)
+        self.business_names = _names(businesses)
+        self.top_n = top_n
+        self.totals = None
+        self.yearly = {}
+        self.top = {}
+        self.businesses = {}
+        if fields.empty or not {'vymera', 'cista_vaha'} <= set(fields.columns):
+            return
+
+        df = pd.DataFrame({
+            'id': fields['id'],
+            'pole': fields['nazev_honu'] if 'nazev_honu' in fields.columns else np.nan,
+            'plodina_id': pd.to_numeric(fields['plodina_id'], errors='coerce') if 'plodina_id' in fields.columns else np.nan,
+            'podnik_id': pd.to_numeric(fields['podnik_id'], errors='coerce') if 'podnik_id' in fields.columns else np.nan,
+            'rok': pd.to_numeric(fields['rok_sklizne'], errors='coerce') if 'rok_sklizne' in fields.columns else np.nan,
+            'vymera': pd.to_numeric(fields['vymera'], errors='coerce'),
+            'cista_vaha': pd.to_numeric(fields['cista_vaha'], errors='coerce'),
+        })
+        df['pole'] = df['pole'].fillna('Pole ' + df['id'].astype(str))
+        df['vynos'] = df['cista_vaha'] / df['vymera']
+
+        self.totals = _totals(df)
+        self._build_yearly(df)
+        self._build_top(df)
+        self._build_businesses(df)
+
+    def _build_yearly(self, df: pd.DataFrame):
+        """Roční součty celkem (klíč None) a po plodinách"""
+        df = df.dropna(subset=['rok']).assign(rok=lambda d: d['rok'].astype(int))
+        sums = ['vymera', 'cista_vaha']
+        self.yearly[None] = df.groupby('rok', as_index=False)[sums].sum()
+        per_crop = df.dropna(subset=['plodina_id']).groupby(['plodina_id', 'rok'], as_index=False)[sums].sum()
+        for plodina_id, group in per_crop.groupby('plodina_id', sort=False):
+            self.yearly[int(plodina_id)] = group[['rok'] + sums].reset_index(drop=True)
+        for table in self.yearly.values():
+            table['vynos'] = table['cista_vaha'] / table['vymera']
+
+    def _build_top(self, df: pd.DataFrame):
+        """TOP N polí celkem, po plodinách, po rocích a po plodině a roce"""
+        ranked = df[np.isfinite(df['vynos'])].sort_values('vynos', ascending=False, kind='stable')
+        ranked = ranked.assign(plodina_id=ranked['plodina_id'].fillna(-1).astype(int),
+                               rok=ranked['rok'].fillna(-1).astype(int))
+
+        self.top[(None, None)] = list(zip(ranked['pole'].head(self.top_n), ranked['vynos'].head(self.top_n)))
+        for keys in (['plodina_id'], ['rok'], ['plodina_id', 'rok']):
+            # Pole bez plodiny nebo roku patří jen do žebříčku celkem
+            part = ranked[(ranked[keys] != -1).all(axis=1)].groupby(keys, sort=False).head(self.top_n)
+            for c, y, pole, vynos in zip(part['plodina_id'], part['rok'], part['pole'], part['vynos']):
+                key = (int(c) if 'plodina_id' in keys else None, int(y) if 'rok' in keys else None)
+                self.top.setdefault(key, []).append((pole, vynos))
+
+    def _build_businesses(self, df: pd.DataFrame):
+        """Souhrnné ukazatele po podnicích"""
+        df = df.dropna(subset=['podnik_id'])
+        stats = df.groupby('podnik_id').agg(
+            vymera=('vymera', 'sum'), cista_vaha=('cista_vaha', 'sum'), zaznamu=('id', 'count'),
+            plodin=('plodina_id', 'nunique'), rok_od=('rok', 'min'), rok_do=('rok', 'max'))
+        stats['vynos'] = np.where(stats['vymera'] > 0, stats['cista_vaha'] / stats['vymera'], 0.0)
+        self.businesses = {int(podnik_id): row for podnik_id, row in stats.to_dict(orient='index').items()}
+
+    @property
+    def empty(self) -> bool:
+        return self.totals is None
+
+    def top_fields(self, plodina_id: Optional[int] = None, rok: Optional[int] = None) -> list:
+        """Seznam (pole, výnos) sestupně, nejvýš top_n položek"""
+        return self.top.get((plodina_id, rok), [])
+
+    def year_series(self, plodina_id: Optional[int] = None) -> pd.DataFrame:
+        """Roční výnosy celkem nebo jedné plodiny (sloupce rok, vymera, cista_vaha, vynos)"""
+        return self.yearly.get(plodina_id, pd.DataFrame(columns=['rok', 'vymera', 'cista_vaha', 'vynos']))
+
+    @staticmethod
+    def _match(names: dict, query: str) -> Optional[int]:
+        """ID s nejdelším názvem obsaženým v dotazu"""
+        found = [(len(name), item_id) for item_id, name in names.items() if name.lower() in query]
+        return max(found)[1] if found else None
+
+    def match_crop(self, query: str) -> Optional[int]:
+        return self._match(self.crop_names, query)
+
+    def match_business(self, query: str) -> Optional[int]:
+        return self._match(self.business_names, query)
+
+    @staticmethod
+    def match_year(query: str) -> Optional[int]:
+        found = YEAR_PATTERN.search(query)
+        return int(found.group()) if found else None
@@ -1,16 +1,47 @@
 """
 Správce dat pro práci s CSV soubory
 """
+import numpy as np
 import pandas as pd
 import streamlit as st
 from typing import Optional, List
 from datetime import datetime
 import os
+from utils.weather_store import WeatherStore
+from utils.rain_rollups import RainRollups
+from utils.weather_features import WeatherFeatures
+from utils.rain_quality import RainQuality
+from utils.field_lineage import FieldLineage, LINEAGE_FILE, add_links
+from utils.id_allocator import IdAllocator, max_id_in_csv
+from utils.lazy_table import LazyTable
+from utils.partitioned_table import PartitionedTable, PARTITIONED_TABLES
 
 
 class DataManager:
     """Správce dat z CSV souborů"""
 
+    # Výchozí sběrné místo (MistoID) pro srážky podle podniku
+    SRAZKY_MISTO_MAP = {1: 30, 2: 29, 3: 28, 4: 27, 5: 26, 6: 25, 8: 42, 9: 43}
+
+    # Sloupce roku a podniku v tabulkách pro query (rok srážek se odvozuje z data)
+    YEAR_COLUMNS = {'fields.csv': 'rok_sklizne', 'pozemky.csv': 'Year', 'odpisy.csv': 'rok', 'sbernasrazky.csv': 'rok',
+                    'sumplodiny.csv': 'Year'}
+    PODNIK_COLUMNS = {'fields.csv': 'podnik_id', 'pozemky.csv': 'PodnikID', 'odpisy.csv': 'podnik_id', 'sbernasrazky.csv': 'PodnikID',
+                      'sumplodiny.csv': 'PodnikID'}
+    # Povolené podniky - DataManager je bez omezení, omezený pohled vrací scoped()
+    podnik_ids = None
+
+    # Tabulky omezené na podniky uživatele ve ScopedData (srážky sdílí celá skupina)
+    SCOPED_TABLES = ['fields.csv', 'pozemky.csv', 'odpisy.csv', 'sumplodiny.csv']
+    # Tabulky, které ScopedData vrací celé (číselníky a srážky); ostatní (uživatelé, ...) nevrací vůbec
+    SHARED_TABLES = ['businesses.csv', 'crops.csv', 'varieties_seed.csv', 'roky.csv', 'typpozemek.csv',
+                     'sbernamista.csv', 'sbernasrazky.csv']
+    # Tabulky bez sloupce podniku: soubor -> (sloupec s ID, nadřazená tabulka)
+    SCOPED_CHILDREN = {'nabidky.csv': ('odpis_id', 'odpisy.csv')}
+    DERIVED_COLUMNS = {
+        ('sbernasrazky.csv', 'rok'): lambda df: pd.to_numeric(df['Datum'].astype(str).str[:4], errors='coerce'),
+    }
+
     def __init__(self, base_path: str):
         """
         Args:
@@ -18,6 +49,23 @@ class DataManager:
         """
         self.base_path = base_path
         self.cache = {}
+        # Indexy nad cache: název souboru -> dict klíč -> index řádku
+        self.indexes = {}
+        # Indexy hodnot sloupců: (soubor, sloupec) -> dict hodnota -> pozice řádků
+        self.value_indexes = {}
+        # Předpočítané souhrny nad cache: název souboru -> objekt souhrnů
+        self.rollups = {}
+        # Kompletní denní počasí z meteostanic (Parquet po rocích a podnicích)
+        self.weather = WeatherStore(os.path.join(base_path, 'weather'))
+        self._weather_features = None
+        # Příznaky kvality srážek (duplicity, odlehlé hodnoty, výpadky)
+        self.rain_quality = RainQuality(os.path.join(base_path, 'sbernasrazky_flags.csv'))
+        # Stabilní klíč pole napříč sezónami (id pole -> pole_key)
+        self.lineage = FieldLineage(os.path.join(base_path, LINEAGE_FILE))
+        # Sekvence ID pro všechny tabulky
+        self.ids = IdAllocator(base_path, seed=self._max_id)
+        # Tabulky uložené po rocích (pokud jsou převedené, viz migrate_partitions.py)
+        self.partitions = {filename: PartitionedTable(base_path, filename) for filename in PARTITIONED_TABLES}
 
     def load_csv(self, filename: str, force_reload: bool = False) -> pd.DataFrame:
         """
@@ -34,8 +82,7 @@ class DataManager:
             return self.cache[filename].copy()
 
         try:
-            filepath = os.path.join(self.base_path, filename)
-            df = pd.read_csv(filepath)
+            df = self._read_table(filename)
 
             # Přidej nové záznamy ze session state
             if 'new_records' in st.session_state and filename in st.session_state.new_records:
@@ -45,11 +92,195 @@ class DataManager:
                     df = pd.concat([df, new_df], ignore_index=True)
 
             self.cache[filename] = df
+            self.indexes.pop(filename, None)
+            self._drop_value_indexes(filename)
+            self.rollups.pop(filename, None)
+            self.rollups.pop(filename + '#valid', None)
+            if 'id' in df.columns and not df.empty:
+                self.ids.observe(filename, df['id'].max())
             return df.copy()
         except Exception as e:
             st.error(f"Chyba při načítání {filename}: {e}")
             return pd.DataFrame()
 
+    def _partitioned(self, filename: str) -> Optional[PartitionedTable]:
+        """Úložiště po rocích, pokud je tabulka převedená"""
+        table = self.partitions.get(filename)
+        return table if table is not None and table.exists() else None
+
+    def _read_table(self, filename: str) -> pd.DataFrame:
+        """Načte tabulku z disku - z oddílů (nezměněné roky z paměti), jinak z CSV"""
+        table = self._partitioned(filename)
+        if table is not None:
+            return table.read()
+        return pd.read_csv(os.path.join(self.base_path, filename))
+
+    def _write_table(self, filename: str, df: pd.DataFrame, years=None):
+        """
+        Uloží celou tabulku
+
+        U tabulky po rocích se přepíšou jen oddíly roků v years
+        (None = oddíly, jejichž obsah se změnil), jinak celý CSV soubor.
+        """
+        table = self._partitioned(filename)
+        if table is None:
+            df.to_csv(os.path.join(self.base_path, filename), index=False)
+        elif years is None:
+            table.write(df)
+        else:
+            years = set(years)
+            table.write(df[table.year_of(df).isin(years)], years)
+
+    def _max_id(self, filename: str) -> int:
+        """Nejvyšší ID tabulky pro založení sekvence (z cache, jinak ze souboru)"""
+        df = self.cache.get(filename)
+        if df is not None and 'id' in df.columns and df['id'].notna().any():
+            return int(df['id'].max())
+        return max_id_in_csv(self.base_path, filename)
+
+    def _drop_value_indexes(self, filename: str):
+        for key in [k for k in self.value_indexes if k[0] == filename]:
+            del self.value_indexes[key]
+
+    def invalidate(self, filename: str):
+        """Zahodí cache a indexy souboru"""
+        self.cache.pop(filename, None)
+        self.indexes.pop(filename, None)
+        self._drop_value_indexes(filename)
+        self.rollups.pop(filename, None)
+        self.rollups.pop(filename + '#valid', None)
+
+    def _value_index(self, filename: str, column: str) -> Optional[dict]:
+        """
+        Index hodnot sloupce nad cache: hodnota -> pozice řádků
+
+        Staví se jednou po načtení tabulky, pro odvozené sloupce
+        (DERIVED_COLUMNS) se hodnoty spočítají jen při stavbě indexu.
+
+        Returns:
+            Dict hodnota -> numpy pole pozic, None pokud sloupec neexistuje
+        """
+        key = (filename, column)
+        if key in self.value_indexes:
+            return self.value_indexes[key]
+
+        df = self.cache.get(filename, pd.DataFrame())
+        if column in df.columns:
+            values = df[column]
+        elif key in self.DERIVED_COLUMNS and not df.empty:
+            values = self.DERIVED_COLUMNS[key](df)
+        else:
+            return None
+
+        index = pd.Series(values.values).groupby(values.values, sort=False).indices
+        self.value_indexes[key] = index
+        return index
+
+    def select(self, filename: str, where: Optional[dict] = None,
+               columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Načte jen řádky a sloupce odpovídající filtru
+
+        Řádky se najdou přes index hodnot sloupců a kopíruje se jen výsledek -
+        ne celá tabulka jako u load_csv. Filtr na sloupec, který tabulka nemá,
+        je chyba (KeyError) - tichým vynecháním by se vrátily všechny řádky.
+
+        Args:
+            filename: Název CSV souboru
+            where: Filtr sloupec -> hodnota nebo seznam hodnot
+            columns: Sloupce výsledku (None = všechny)
+
+        Returns:
+            DataFrame s vybranými řádky v původním pořadí
+        """
+        if filename not in self.cache:
+            self.load_csv(filename)
+        df = self.cache.get(filename, pd.DataFrame())
+
+        positions = None
+        for col, value in (where or {}).items():
+            index = self._value_index(filename, col)
+            if index is None:
+                # Chybějící soubor nebo prázdná tabulka bez odvozených hodnot = žádné řádky
+                if len(df.columns) and (filename, col) not in self.DERIVED_COLUMNS:
+                    raise KeyError(f"Tabulka {filename} nemá sloupec {col}")
+                index = {}
+            values = list(value) if isinstance(value, (list, tuple, set, pd.Series)) else [value]
+            found = [index[v] for v in values if v in index]
+            col_positions = np.unique(np.concatenate(found)) if found else np.array([], dtype=int)
+            positions = col_positions if positions is None else np.intersect1d(positions, col_positions)
+
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+        result = df.iloc[positions] if positions is not None else df
+        return result.copy()
+
+    def query(self, filename: str, year=None, podnik_ids=None,
+              columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Řádky tabulky pro rok a podniky (sloupce podle YEAR_COLUMNS a PODNIK_COLUMNS)
+
+        Args:
+            filename: Název CSV souboru
+            year: Rok nebo seznam roků (None = všechny)
+            podnik_ids: ID podniku nebo seznam ID (None = všechny)
+            columns: Sloupce výsledku (None = všechny)
+        """
+        where = {}
+        if year is not None:
+            where[self.YEAR_COLUMNS[filename]] = year
+        if podnik_ids is not None:
+            where[self.PODNIK_COLUMNS[filename]] = podnik_ids
+        return self.select(filename, where, columns)
+
+    def fields(self, year=None, podnik_ids=None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Pole pro rok sklizně a podniky"""
+        return self.query('fields.csv', year, podnik_ids, columns)
+
+    def srazky(self, year=None, podnik_ids=None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Sběrné srážky pro kalendářní rok a podniky"""
+        return self.query('sbernasrazky.csv', year, podnik_ids, columns)
+
+    def pozemky(self, year=None, podnik_ids=None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Pozemky pro rok a podniky"""
+        return self.query('pozemky.csv', year, podnik_ids, columns)
+
+    def odpisy(self, year=None, podnik_ids=None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Odpisy pro rok a podniky"""
+        return self.query('odpisy.csv', year, podnik_ids, columns)
+
+    def years(self, filename: str, podnik_ids=None) -> List[int]:
+        """
+        Roky, pro které tabulka obsahuje data, sestupně (z indexu, bez kopie tabulky)
+
+        Args:
+            filename: Název CSV souboru
+            podnik_ids: Jen roky těchto podniků (None = všech)
+        """
+        if filename not in self.cache:
+            self.load_csv(filename)
+        year_index = self._value_index(filename, self.YEAR_COLUMNS[filename])
+        if not year_index:
+            return []
+
+        if podnik_ids is None:
+            years = year_index.keys()
+        else:
+            podnik_index = self._value_index(filename, self.PODNIK_COLUMNS[filename]) or {}
+            ids = podnik_ids if isinstance(podnik_ids, (list, tuple, set)) else [podnik_ids]
+            found = [podnik_index[i] for i in ids if i in podnik_index]
+            if not found:
+                return []
+            podnik_positions = np.concatenate(found)
+            years = [y for y, pos in year_index.items() if np.isin(pos, podnik_positions).any()]
+
+        return sorted({int(y) for y in years if pd.notna(y)}, reverse=True)
+
+    def lazy(self, filename: str, where: Optional[dict] = None,
+             columns: Optional[List[str]] = None) -> LazyTable:
+        """Odkaz na tabulku, která se načte (s filtrem) až při prvním přístupu"""
+        return LazyTable(self, filename, where, columns)
+
     def get_businesses(self) -> pd.DataFrame:
         """Načte seznam podniků"""
         return self.load_csv('businesses.csv')
@@ -62,6 +293,18 @@ class DataManager:
         """Načte data o polích"""
         return self.load_csv('fields.csv')
 
+    def get_field_lineage(self) -> pd.DataFrame:
+        """
+        Vrátí linie polí (sloupce id, pole_key, zdroj_id, metoda)
+
+        Klíč se přiřazuje jen uloženým řádkům polí, které ho ještě nemají.
+        Neuložené kopie polí ze session převezmou klíč zdroje jen v paměti
+        (ostatní neuložené řádky dostanou klíč v lineage_keys).
+        """
+        lineage = self.lineage.refresh(self.base_path)
+        links = st.session_state.get('lineage_links', {})
+        return add_links(lineage, links) if links else lineage
+
     def get_users(self) -> pd.DataFrame:
         """Načte uživatele"""
         return self.load_csv('users.csv')
@@ -105,16 +348,282 @@ class DataManager:
     def save_sbernasrazky(self, df: pd.DataFrame) -> bool:
         """Uloží sběrné srážky do CSV"""
         try:
-            filepath = os.path.join(self.base_path, 'sbernasrazky.csv')
-            df.to_csv(filepath, index=False)
-            # Invaliduj cache
-            if 'sbernasrazky.csv' in self.cache:
-                del self.cache['sbernasrazky.csv']
+            self._write_table('sbernasrazky.csv', df)
+            self.invalidate('sbernasrazky.csv')
             return True
         except Exception as e:
             st.error(f"Chyba při ukládání sbernasrazky.csv: {e}")
             return False
 
+    def _get_srazky_index(self) -> dict:
+        """
+        Vrátí index sběrných srážek podle (PodnikID, datum)
+
+        Index se staví jednou nad cache a při upsertu se udržuje průběžně.
+        Při duplicitách pro stejný den platí první záznam.
+        """
+        filename = 'sbernasrazky.csv'
+        if filename in self.indexes and filename in self.cache:
+            return self.indexes[filename]
+
+        self.load_csv(filename)
+        df = self.cache.get(filename, pd.DataFrame())
+
+        index = {}
+        self.indexes[filename] = index
+        if df.empty:
+            return index
+
+        keys = zip(
+            pd.to_numeric(df['PodnikID'], errors='coerce').fillna(-1).astype(int),
+            df['Datum'].astype(str).str[:10]
+        )
+        for key, row_idx in zip(keys, df.index):
+            index.setdefault(key, row_idx)
+
+        return index
+
+    def get_srazka(self, podnik_id: int, datum: str) -> Optional[pd.Series]:
+        """
+        Najde záznam srážek podniku pro daný den přes index
+
+        Args:
+            podnik_id: ID podniku
+            datum: Datum ve formátu YYYY-MM-DD (případný čas se ignoruje)
+
+        Returns:
+            Řádek záznamu nebo None
+        """
+        row_idx = self._get_srazky_index().get((int(podnik_id), str(datum)[:10]))
+        if row_idx is None:
+            return None
+        return self.cache['sbernasrazky.csv'].loc[row_idx].copy()
+
+    def get_srazky_rollups(self, valid_only: bool = False) -> RainRollups:
+        """
+        Vrátí předpočítané denní/měsíční/roční souhrny srážek podle podniku
+
+        Souhrny se postaví při prvním přístupu a upsert_sbernasrazky je
+        průběžně aktualizuje.
+
+        Args:
+            valid_only: Pouze záznamy bez příznaku podezřelosti (viz get_srazky_flags)
+        """
+        filename = 'sbernasrazky.csv'
+        if filename not in self.rollups or filename not in self.cache:
+            self.load_csv(filename)
+            self.rollups[filename] = RainRollups(self.cache.get(filename, pd.DataFrame()))
+
+        if not valid_only:
+            return self.rollups[filename]
+
+        key = filename + '#valid'
+        if key not in self.rollups:
+            df = self.cache[filename]
+            flags = self.get_srazky_flags()
+            suspicious = flags.loc[flags['podezrely'].astype(bool), 'id']
+            self.rollups[key] = RainRollups(df[~df['id'].isin(suspicious)] if not df.empty else df)
+        return self.rollups[key]
+
+    def get_srazky_flags(self) -> pd.DataFrame:
+        """
+        Vrátí příznaky kvality srážek (klíčem je id záznamu)
+
+        Kontrola běží jen pro záznamy, které ještě příznaky nemají, a pro dny
+        změněné přes upsert_sbernasrazky.
+        """
+        df = self.load_csv('sbernasrazky.csv')
+        if df.empty:
+            return pd.DataFrame(columns=RainQuality.COLUMNS)
+        return self.rain_quality.update(df)
+
+    def get_weather_features(self) -> WeatherFeatures:
+        """
+        Vrátí počasí agregované na (podnik, rok sklizně)
+
+        Tabulka žije nad souhrny srážek; po přestavbě souhrnů se založí znovu,
+        jinak se přepočítávají jen skupiny zasažené novými záznamy.
+        """
+        rollups = self.get_srazky_rollups()
+        if self._weather_features is None or self._weather_features.rollups is not rollups:
+            self._weather_features = WeatherFeatures(rollups, self.weather)
+        return self._weather_features
+
+    def save_weather(self, records: List[dict]) -> int:
+        """
+        Uloží denní počasí z meteostanic (viz WeatherStore.save_days)
+
+        Počasí je doplněk ke srážkám - ukládá se až po nich a chyba zápisu
+        (Parquet) jen varuje, uložené srážky zůstávají.
+
+        Returns:
+            Počet uložených záznamů (0 při chybě)
+        """
+        try:
+            return self.weather.save_days(records)
+        except Exception as e:
+            st.warning(f"Počasí z meteostanice se nepodařilo uložit: {e}")
+            return 0
+
+    def upsert_sbernasrazky(self, rows: List[dict]) -> dict:
+        """
+        Vloží nebo aktualizuje srážky podle klíče (PodnikID, datum)
+
+        Dávka pro více stanic se zapíše jedním zápisem - nové záznamy se
+        připojí na konec CSV, celý soubor se přepíše jen při aktualizaci
+        existujících dnů.
+
+        Args:
+            rows: Seznam slovníků s klíči PodnikID, Datum, Objem (volitelně MistoID)
+
+        Returns:
+            Dict s počty {'inserted': n, 'updated': n}, prázdný při chybě
+        """
+        filename = 'sbernasrazky.csv'
+        try:
+            index = self._get_srazky_index()
+            df = self.cache.get(filename, pd.DataFrame())
+
+            updates = {}
+            inserts = {}
+            changes = []
+            for row in rows:
+                key = (int(row['PodnikID']), str(row['Datum'])[:10])
+                if key in index:
+                    old = df.at[index[key], 'Objem'] if index[key] not in updates else updates[index[key]]
+                    updates[index[key]] = row['Objem']
+                    changes.append((key[0], key[1], float(row['Objem']) - float(0.0 if pd.isna(old) else old)))
+                else:
+                    # Poslední hodnota v dávce vyhrává
+                    inserts[key] = row
+
+            new_ids = iter(self.ids.allocate(filename, len(inserts))) if inserts else iter(())
+            new_rows = []
+            for (podnik_id, _), row in inserts.items():
+                new_rows.append({
+                    'id': next(new_ids),
+                    'MistoID': row.get('MistoID', self.SRAZKY_MISTO_MAP.get(podnik_id, 30)),
+                    'PodnikID': podnik_id,
+                    'Objem': row['Objem'],
+                    'Datum': row['Datum'],
+                })
+
+            filepath = os.path.join(self.base_path, filename)
+            columns = list(df.columns) if not df.empty else ['id', 'MistoID', 'PodnikID', 'Objem', 'Datum']
+            start = int(df.index.max()) + 1 if not df.empty else 0
+            new_df = pd.DataFrame(new_rows, columns=columns, index=range(start, start + len(new_rows)))
+
+            if updates:
+                df.loc[list(updates.keys()), 'Objem'] = list(updates.values())
+            if new_rows:
+                df = pd.concat([df, new_df]) if not df.empty else new_df
+
+            table = self._partitioned(filename)
+            if table is not None:
+                # Přepsat jen roky s aktualizovanými dny, ostatní nové řádky připojit
+                years = set(table.year_of(df.loc[list(updates.keys())])) if updates else set()
+                if years:
+                    self._write_table(filename, df, years)
+                appended = new_df[~table.year_of(new_df).isin(years)] if years and new_rows else new_df
+                if not appended.empty:
+                    table.append(appended)
+            elif updates or not os.path.exists(filepath):
+                df.to_csv(filepath, index=False)
+            elif new_rows:
+                new_df.to_csv(filepath, mode='a', header=False, index=False)
+
+            # Cache, index i souhrny zůstávají platné - jen je doplníme
+            self.cache[filename] = df
+            self._drop_value_indexes(filename)
+            index.update(zip(inserts.keys(), new_df.index))
+            if filename in self.rollups:
+                changes.extend((r['PodnikID'], r['Datum'], float(r['Objem'])) for r in new_rows)
+                self.rollups[filename].apply_changes(changes)
+                if self._weather_features is not None and self._weather_features.rollups is self.rollups[filename]:
+                    self._weather_features.mark_dirty([c[0] for c in changes], [c[1] for c in changes])
+
+            # Kontrola kvality jen pro dotčené dny
+            if self.rain_quality.flags is not None:
+                self.rain_quality.update(df, [key[1] for key in inserts] + [str(df.at[i, 'Datum'])[:10] for i in updates])
+            self.rollups.pop(filename + '#valid', None)
+
+            return {'inserted': len(new_rows), 'updated': len(updates)}
+        except Exception as e:
+            st.error(f"Chyba při ukládání {filename}: {e}")
+            return {}
+
+    def apply_changes(self, filename: str, changes, defaults: Optional[dict] = None) -> dict:
+        """
+        Uloží změny z editoru tabulky (EditorChanges) jedním zápisem CSV
+
+        Zapisují se jen dotčené řádky - upravené sloupce, smazaná ID
+        a nové řádky s ID ze sekvence tabulky.
+
+        Args:
+            filename: Název CSV souboru
+            changes: EditorChanges z diff_editor
+            defaults: Hodnoty doplněné do nových řádků (např. podnik_id, rok)
+
+        Returns:
+            Dict s počty {'inserted': n, 'updated': n, 'deleted': n}, prázdný při chybě
+        """
+        try:
+            table = self._partitioned(filename)
+            filepath = os.path.join(self.base_path, filename)
+            if table is not None or os.path.exists(filepath):
+                df = self._read_table(filename)
+            else:
+                df = pd.DataFrame(columns=['id'])
+            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+            deleted = df['id'].isin(changes.deleted)
+            updated = changes.updated.drop_duplicates(subset=['id']).set_index('id')
+            # Roky dotčených řádků - u tabulky po rocích se přepíšou jen jejich oddíly
+            years = set(table.year_of(df[deleted | df['id'].isin(updated.index)])) if table is not None else None
+
+            df = df[~deleted]
+            touched = df['id'].isin(updated.index)
+            for col in [c for c in updated.columns if c in df.columns]:
+                df[col] = df[col].where(~touched, df['id'].map(updated[col]))
+            if 'datum_upravy' in df.columns:
+                df.loc[touched, 'datum_upravy'] = now
+
+            new_df = changes.inserted.assign(**(defaults or {}))
+            if not new_df.empty:
+                new_df['id'] = list(self.ids.allocate(filename, len(new_df)))
+                if 'datum_upravy' in df.columns:
+                    new_df['datum_upravy'] = now
+                df = pd.concat([df, new_df.reindex(columns=df.columns)], ignore_index=True)
+                if table is not None:
+                    years |= set(table.year_of(new_df.reindex(columns=df.columns)))
+
+            if table is not None:
+                # Rok upravených řádků se mohl změnit - zapsat i jejich nové roky
+                years |= set(table.year_of(df[touched.reindex(df.index, fill_value=False)]))
+            self._write_table(filename, df, years)
+            self.invalidate(filename)
+
+            return {'inserted': len(new_df), 'updated': int(touched.sum()), 'deleted': int(deleted.sum())}
+        except Exception as e:
+            st.error(f"Chyba při ukládání {filename}: {e}")
+            return {}
+
+    def scoped(self, podnik_ids: Optional[List[int]]):
+        """
+        Pohled na data omezený na podniky (viz ScopedData)
+
+        Args:
+            podnik_ids: Povolené podniky; None = bez omezení (vrátí self)
+        """
+        if podnik_ids is None:
+            return self
+        from utils.scoped_data import ScopedData
+        return ScopedData(self, podnik_ids)
+
+    def allowed_businesses(self) -> pd.DataFrame:
+        """Podniky pro výběr na stránce - bez omezení všechny"""
+        return self.get_businesses()
+
     def filter_by_business(self, df: pd.DataFrame, business_ids: List[int]) -> pd.DataFrame:
         """
         Filtruje data podle ID podniků
@@ -145,10 +654,9 @@ class DataManager:
         try:
             df = self.load_csv(filename)
 
-            # Generuj nové ID
-            if 'id' in df.columns and len(df) > 0:
-                new_id = df['id'].max() + 1
-                data['id'] = new_id
+            # Nové ID ze sekvence tabulky
+            if 'id' in df.columns:
+                data['id'] = self.ids.next_id(filename)
 
             # Přidej časové razítko
             if 'datum_upravy' in df.columns:
@@ -163,15 +671,75 @@ class DataManager:
 
             st.session_state.new_records[filename].append(data)
 
-            # Invaliduj cache
-            if filename in self.cache:
-                del self.cache[filename]
+            self.invalidate(filename)
 
             return True
         except Exception as e:
             st.error(f"Chyba při přidávání záznamu: {e}")
             return False
 
+    def add_records(self, filename: str, rows: List[dict]) -> int:
+        """
+        Přidá více záznamů najednou (simulace - pro produkci potřeba backend)
+
+        ID se přidělí jako souvislý blok, časové razítko a kontrola sloupců
+        proběhnou pro celou dávku najednou a cache se zneplatní jen jednou.
+
+        Args:
+            filename: Název CSV souboru
+            rows: Seznam záznamů k přidání
+
+        Returns:
+            Počet přidaných záznamů (0 při chybě)
+        """
+        if not rows:
+            return 0
+
+        try:
+            df = self.load_csv(filename)
+            new_df = pd.DataFrame(rows)
+
+            # Původ kopie pole (_zdroj_id) se neukládá do tabulky, ale do linií polí
+            sources = new_df.pop('_zdroj_id') if '_zdroj_id' in new_df.columns else None
+
+            # Kontrola sloupců - dávka nesmí obsahovat neznámé sloupce
+            if not df.empty:
+                unknown = [col for col in new_df.columns if col not in df.columns]
+                if unknown:
+                    st.error(f"Neznámé sloupce pro {filename}: {', '.join(unknown)}")
+                    return 0
+
+            # Blok nových ID ze sekvence tabulky
+            if 'id' in df.columns:
+                new_df['id'] = list(self.ids.allocate(filename, len(new_df)))
+
+            if 'datum_upravy' in df.columns:
+                new_df['datum_upravy'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+            # Pro demo - uložíme do session state
+            if 'new_records' not in st.session_state:
+                st.session_state.new_records = {}
+
+            if filename not in st.session_state.new_records:
+                st.session_state.new_records[filename] = []
+
+            records = new_df.astype(object).where(new_df.notna(), None).to_dict('records')
+            st.session_state.new_records[filename].extend(records)
+
+            # Řádky jsou jen v session - původ kopie se drží v session, ne ve sdíleném indexu
+            if sources is not None and filename == 'fields.csv':
+                if 'lineage_links' not in st.session_state:
+                    st.session_state.lineage_links = {}
+                st.session_state.lineage_links.update(
+                    {int(i): int(z) for i, z in zip(new_df['id'], sources) if pd.notna(z)})
+
+            self.invalidate(filename)
+
+            return len(records)
+        except Exception as e:
+            st.error(f"Chyba při přidávání záznamů: {e}")
+            return 0
+
     def update_record(self, filename: str, record_id: int, data: dict) -> bool:
         """
         Aktualizuje záznam (simulace)
@@ -195,9 +763,7 @@ class DataManager:
             data['datum_upravy'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             st.session_state.updated_records[filename][record_id] = data
 
-            # Invaliduj cache
-            if filename in self.cache:
-                del self.cache[filename]
+            self.invalidate(filename)
 
             return True
         except Exception as e:
@@ -225,9 +791,7 @@ class DataManager:
 
             st.session_state.deleted_records[filename].append(record_id)
 
-            # Invaliduj cache
-            if filename in self.cache:
-                del self.cache[filename]
+            self.invalidate(filename)
 
             return True
         except Exception as e:
@@ -0,0 +1,76 @@
+"""
+Rozdíl mezi původní tabulkou a výstupem st.data_editor
+"""
+import pandas as pd
+from typing import Optional, List
+
+
+class EditorChanges:
+    """Změny provedené v st.data_editor
+
+    Attributes:
+        inserted: Nové řádky (sloupce editoru)
+        updated: Změněné řádky (sloupce editoru + id)
+        deleted: ID smazaných řádků
+    """
+
+    def __init__(self, inserted: pd.DataFrame, updated: pd.DataFrame, deleted: List[int]):
+        self.inserted = inserted
+        self.updated = updated
+        self.deleted = deleted
+
+    def __bool__(self) -> bool:
+        return not self.inserted.empty or not self.updated.empty or bool(self.deleted)
+
+    def summary(self) -> str:
+        return f"nové: {len(self.inserted)}, upravené: {len(self.updated)}, smazané: {len(self.deleted)}"
+
+
+def _values_differ(original: pd.Series, edited: pd.Series) -> pd.Series:
+    """Porovnání sloupců - dvě chybějící hodnoty se považují za shodné"""
+    both_missing = original.isna() & edited.isna()
+    try:
+        differ = original != edited
+    except TypeError:
+        differ = original.astype(str) != edited.astype(str)
+    return differ & ~both_missing
+
+
+def diff_editor(original: pd.DataFrame, edited: pd.DataFrame, ids,
+                columns: Optional[List[str]] = None) -> EditorChanges:
+    """
+    Porovná data předaná do st.data_editor s jeho výstupem
+
+    Řádky se párují podle indexu: data_editor zachovává index existujících
+    řádků, smazané řádky z něj zmizí a nové dostanou nový index.
+
+    Args:
+        original: DataFrame předaný do st.data_editor
+        edited: Výstup st.data_editor
+        ids: ID záznamů ve stejném pořadí jako řádky original
+        columns: Porovnávané sloupce (None = všechny společné, např. bez dopočítaných)
+
+    Returns:
+        EditorChanges
+    """
+    ids = pd.Series(list(ids), index=original.index)
+    columns = [c for c in (columns or original.columns) if c in original.columns and c in edited.columns]
+
+    deleted_index = original.index.difference(edited.index)
+    inserted_index = edited.index.difference(original.index)
+    common = original.index.intersection(edited.index)
+
+    before = original.loc[common, columns]
+    after = edited.loc[common, columns]
+    changed = pd.Series(False, index=common)
+    for col in columns:
+        changed |= _values_differ(before[col], after[col])
+
+    updated = after[changed].copy()
+    updated['id'] = ids.loc[updated.index].astype(int)
+
+    return EditorChanges(
+        inserted=edited.loc[inserted_index, columns].copy(),
+        updated=updated,
+        deleted=ids.loc[deleted_index].astype(int).tolist(),
+    )
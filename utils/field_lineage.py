@@ -0,0 +1,324 @@
+"""
+Linie polí - stabilní klíč pole napříč sezónami
+
+Každá sezóna má vlastní řádky polí s novými id (kopírování osevního plánu
+zakládá nové záznamy). Index přiřazuje každému id celočíselný klíč pole
+(pole_key), který je pro tentýž hon ve všech letech stejný, takže
+víceleté analýzy po polích seskupují podle čísla místo podle textu.
+"""
+import os
+import json
+import threading
+import pandas as pd
+from typing import Optional, Callable
+
+from utils.partitioned_table import read_table, table_version
+
+try:
+    import fcntl
+except ImportError:  # Windows - zámek jen v rámci procesu
+    fcntl = None
+
+LINEAGE_FILE = 'field_lineage.csv'
+
+# Jak byl řádek k linii přiřazen
+METHODS = ['kopie', 'cislo_honu', 'nazev_honu', 'nove']
+
+
+def _normalize(values: pd.Series) -> pd.Series:
+    """Název nebo číslo honu pro porovnání (velká písmena, jedna mezera, prázdné = '')"""
+    text = values.astype(object).where(values.notna(), '').astype(str)
+    return text.str.strip().str.upper().str.replace(r'\s+', ' ', regex=True).replace('NAN', '')
+
+
+def prepare_fields(fields: pd.DataFrame) -> pd.DataFrame:
+    """Sloupce polí potřebné pro párování (id, podnik_id, rok, cislo, nazev, vymera)"""
+    def column(name):
+        return fields[name] if name in fields.columns else pd.Series(None, index=fields.index, dtype=object)
+
+    df = pd.DataFrame({
+        'id': pd.to_numeric(fields['id'], errors='coerce'),
+        'podnik_id': pd.to_numeric(column('podnik_id'), errors='coerce').fillna(-1).astype(int),
+        'rok': pd.to_numeric(column('rok_sklizne'), errors='coerce'),
+        'cislo': _normalize(column('cislo_honu')),
+        'nazev': _normalize(column('nazev_honu')),
+        'vymera': pd.to_numeric(column('vymera'), errors='coerce').fillna(0.0),
+    })
+    return df.dropna(subset=['id']).astype({'id': int}).drop_duplicates(subset=['id'])
+
+
+def _pair(pairs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Párování jedna ku jedné - nejdřív dvojice s nejbližší výměrou
+
+    Args:
+        pairs: Kandidáti se sloupci id, pole_key, diff
+
+    Returns:
+        Vybrané dvojice (id, pole_key), každé id i klíč nejvýš jednou
+    """
+    pairs = pairs.sort_values(['diff', 'id', 'pole_key'])
+    chosen = []
+    while not pairs.empty:
+        best = pairs.drop_duplicates('id').drop_duplicates('pole_key')
+        chosen.append(best[['id', 'pole_key']])
+        pairs = pairs[~pairs['id'].isin(best['id']) & ~pairs['pole_key'].isin(best['pole_key'])]
+    return pd.concat(chosen, ignore_index=True) if chosen else pd.DataFrame(columns=['id', 'pole_key'])
+
+
+class FieldLineage:
+    """Uložený index id pole -> pole_key
+
+    Nové řádky se přiřazují po letech vzestupně k poslednímu řádku linie
+    z dřívějších let ve stejném podniku:
+        kopie       - výslovný původ z kopírování osevního plánu (link)
+        cislo_honu  - shodné číslo honu
+        nazev_honu  - shodný název honu
+        nove        - bez shody, nová linie
+    Při více kandidátech rozhoduje nejbližší výměra; linie má v jednom roce
+    nejvýš jeden řádek. Jednou přiřazený klíč se už nemění (ani po přejmenování).
+
+    Index sdílí aplikace i API (více procesů). Doplnění se provádí pod
+    zámkem souboru nad čerstvě načteným indexem (jako u IdAllocator),
+    a když soubor mezitím změnil jiný proces, load ho načte znovu.
+    """
+
+    COLUMNS = ['id', 'pole_key', 'zdroj_id', 'metoda']
+
+    _thread_lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Cesta k CSV indexu (vedle něj .json s verzí tabulky polí);
+                  None = index jen v paměti
+        """
+        self.path = path
+        self.meta_path = os.path.splitext(path)[0] + '.json' if path else None
+        self.lock_path = path + '.lock' if path else None
+        self.lineage = None
+        self.meta = None
+        # Verze souboru indexu při posledním načtení nebo uložení
+        self.loaded_version = None
+
+    def _file_version(self) -> Optional[str]:
+        if not self.path or not os.path.exists(self.path):
+            return None
+        stat = os.stat(self.path)
+        return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+    def load(self, force: bool = False) -> pd.DataFrame:
+        """
+        Načte uložený index (prázdný, pokud ještě neexistuje)
+
+        Index se načte znovu, pokud soubor od posledního načtení změnil jiný
+        proces nebo je force.
+        """
+        version = self._file_version() if self.path else None
+        if self.lineage is None or force or version != self.loaded_version:
+            if version is not None:
+                lineage = pd.read_csv(self.path, dtype={'id': 'int64', 'pole_key': 'int64', 'zdroj_id': 'Int64'})
+            else:
+                lineage = pd.DataFrame({'id': pd.Series(dtype='int64'), 'pole_key': pd.Series(dtype='int64'),
+                                        'zdroj_id': pd.Series(dtype='Int64'), 'metoda': pd.Series(dtype=object)})
+            meta = {}
+            if self.meta_path and os.path.exists(self.meta_path):
+                with open(self.meta_path, encoding='utf-8') as f:
+                    meta = json.load(f)
+            self.lineage, self.meta, self.loaded_version = lineage, meta, version
+        return self.lineage
+
+    def save(self):
+        if self.lineage is None or not self.path:
+            return
+        with open(self.meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(self.meta_path + '.tmp', self.meta_path)
+        self.lineage.to_csv(self.path + '.tmp', index=False)
+        os.replace(self.path + '.tmp', self.path)
+        self.loaded_version = self._file_version()
+
+    def _locked(self, change: Callable[[], bool], save: bool = True) -> pd.DataFrame:
+        """
+        Provede change nad aktuálním indexem a uloží ho, pokud se změnil
+
+        Index se pod zámkem načte znovu z disku, takže se nepřepíšou řádky
+        doplněné jiným procesem a nové klíče navazují na jeho poslední klíč.
+        Bez save (nebo bez cesty) se index mění jen v paměti.
+        """
+        if not save or not self.path:
+            with self._thread_lock:
+                self.load()
+                change()
+                return self.lineage
+
+        with self._thread_lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.lock_path, 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self.load(force=True)
+                    if change():
+                        self.save()
+                    return self.lineage
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def keys(self) -> pd.Series:
+        """id -> pole_key"""
+        lineage = self.load()
+        return pd.Series(lineage['pole_key'].to_numpy(), index=lineage['id'].to_numpy())
+
+    def _next_key(self) -> int:
+        lineage = self.load()
+        return int(lineage['pole_key'].max()) + 1 if not lineage.empty else 1
+
+    def link(self, pairs: dict):
+        """
+        Zapíše výslovný původ nových řádků (nové id -> id zdrojového pole)
+
+        Jen pro řádky uložené ve fields.csv - původ neuložených řádků session
+        se do sdíleného indexu nezapisuje (viz add_links). Zdroj musí být
+        v indexu (zavolat nejdřív update); řádky s neznámým zdrojem se
+        přiřadí později heuristikou.
+        """
+        def change():
+            lineage = self.load()
+            self.lineage = add_links(lineage, pairs)
+            return len(self.lineage) != len(lineage)
+
+        self._locked(change)
+
+    def update(self, fields: pd.DataFrame, fields_version: Optional[str] = None,
+               save: bool = True) -> pd.DataFrame:
+        """
+        Přiřadí klíč řádkům polí, které ho ještě nemají
+
+        Args:
+            fields: Celá uložená tabulka polí (bez neuložených záznamů session)
+            fields_version: Verze tabulky (uloží se pro refresh)
+            save: Uložit index na disk (False = doplnit jen v paměti)
+
+        Returns:
+            Aktuální index (sloupce COLUMNS)
+        """
+        return self._locked(lambda: self._assign(fields, fields_version), save)
+
+    def _assign(self, fields: pd.DataFrame, fields_version: Optional[str]) -> bool:
+        """Doplní klíče do načteného indexu, vrací True při změně"""
+        lineage = self.load()
+        df = prepare_fields(fields)
+        new = df[~df['id'].isin(lineage['id'])]
+        if new.empty:
+            if fields_version is not None and self.meta.get('fields_version') != fields_version:
+                self.meta['fields_version'] = fields_version
+                return True
+            return False
+
+        # Řádky s klíčem - z nich se berou kandidáti pro další roky
+        known = df.merge(lineage[['id', 'pole_key']], on='id')
+        next_key = self._next_key()
+        assigned = []
+
+        # Bez roku sklizně nelze určit pořadí sezón - vlastní linie
+        undated = new[new['rok'].isna()]
+        for year, batch in new.dropna(subset=['rok']).groupby('rok', sort=True):
+            # Poslední řádek každé linie z dřívějších let; linie s řádkem v tomto roce se nepárují
+            used = set(known.loc[known['rok'] == year, 'pole_key'])
+            candidates = known[known['rok'] < year].sort_values(['rok', 'id']).drop_duplicates('pole_key', keep='last')
+            candidates = candidates[~candidates['pole_key'].isin(used)]
+
+            rest = batch
+            for method, column in (('cislo_honu', 'cislo'), ('nazev_honu', 'nazev')):
+                pairs = rest[rest[column] != ''].merge(candidates[candidates[column] != ''],
+                                                       on=['podnik_id', column], suffixes=('', '_linie'))
+                if pairs.empty:
+                    continue
+                pairs['diff'] = (pairs['vymera'] - pairs['vymera_linie']).abs()
+                matched = _pair(pairs).assign(metoda=method)
+                assigned.append(matched)
+                rest = rest[~rest['id'].isin(matched['id'])]
+                candidates = candidates[~candidates['pole_key'].isin(matched['pole_key'])]
+                known = pd.concat([known, batch.merge(matched[['id', 'pole_key']], on='id')], ignore_index=True)
+
+            fresh = pd.DataFrame({'id': rest['id'].to_numpy(),
+                                  'pole_key': range(next_key, next_key + len(rest)), 'metoda': 'nove'})
+            next_key += len(rest)
+            assigned.append(fresh)
+            known = pd.concat([known, rest.merge(fresh[['id', 'pole_key']], on='id')], ignore_index=True)
+
+        assigned.append(pd.DataFrame({'id': undated['id'].to_numpy(),
+                                      'pole_key': range(next_key, next_key + len(undated)), 'metoda': 'nove'}))
+        added = pd.concat(assigned, ignore_index=True).astype({'id': 'int64', 'pole_key': 'int64'})
+        added['zdroj_id'] = pd.array([pd.NA] * len(added), dtype='Int64')
+        self.lineage = pd.concat([lineage, added[self.COLUMNS]], ignore_index=True) if not lineage.empty else added[self.COLUMNS]
+        if fields_version is not None:
+            self.meta['fields_version'] = fields_version
+        return True
+
+    def refresh(self, base_path: str, save: bool = True) -> pd.DataFrame:
+        """
+        Index doplněný podle uložené tabulky polí, jen když se změnila
+
+        Verze tabulky (viz table_version) se ukládá vedle indexu, takže volání
+        bez změny polí tabulku vůbec nenačítá. Pole se čtou z disku, neuložené
+        záznamy session se do sdíleného indexu nedostanou.
+
+        Args:
+            base_path: Složka dat
+            save: Uložit doplněný index (False = jen v paměti, pro čtenáře jako API)
+        """
+        self.load()
+        version = table_version(base_path, 'fields.csv')
+        if version is not None and self.meta.get('fields_version') != version:
+            self.update(read_table(base_path, 'fields.csv'), fields_version=version, save=save)
+        return self.lineage
+
+
+def add_links(lineage: pd.DataFrame, pairs: dict) -> pd.DataFrame:
+    """
+    Index doplněný o výslovný původ řádků (nové id -> id zdrojového pole), bez ukládání
+
+    Nový řádek převezme pole_key zdroje; zdrojem může být i jiný nový řádek
+    (kopie kopie). Řádky s id v indexu nebo se zdrojem mimo index se vynechají.
+    """
+    links = pd.DataFrame({'id': list(pairs.keys()), 'zdroj_id': list(pairs.values())}).dropna().astype('int64')
+    links = links[~links['id'].isin(lineage['id'])].sort_values('id')
+    added = []
+    keys = pd.Series(lineage['pole_key'].to_numpy(), index=lineage['id'].to_numpy())
+    while not links.empty:
+        ready = links[links['zdroj_id'].isin(keys.index)]
+        if ready.empty:
+            break
+        ready = ready.assign(pole_key=ready['zdroj_id'].map(keys).astype('int64'), metoda='kopie')
+        added.append(ready)
+        keys = pd.concat([keys, pd.Series(ready['pole_key'].to_numpy(), index=ready['id'].to_numpy())])
+        links = links[~links['id'].isin(ready['id'])]
+    if not added:
+        return lineage
+    added = pd.concat(added, ignore_index=True)[FieldLineage.COLUMNS].astype({'zdroj_id': 'Int64'})
+    return pd.concat([lineage, added], ignore_index=True)
+
+
+def lineage_keys(fields: pd.DataFrame, lineage: Optional[pd.DataFrame] = None) -> pd.Series:
+    """
+    pole_key pro řádky polí (index jako fields)
+
+    Args:
+        fields: Tabulka polí
+        lineage: Index linií (sloupce id, pole_key); None nebo prázdný = spočítat
+                 v paměti bez ukládání (např. data ze staršího API)
+    """
+    if lineage is None or lineage.empty:
+        lineage = FieldLineage().update(fields)
+    mapping = pd.Series(lineage['pole_key'].to_numpy(), index=lineage['id'].to_numpy())
+    keys = pd.to_numeric(fields['id'], errors='coerce').map(mapping)
+
+    # Řádky novější než index - každý jako samostatná linie
+    missing = keys.isna()
+    if missing.any():
+        start = int(mapping.max()) + 1 if not mapping.empty else 1
+        keys[missing] = range(start, start + int(missing.sum()))
+    return keys.astype('int64')
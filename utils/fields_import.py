@@ -0,0 +1,404 @@
+"""
+Import polí z Excel exportů Tekro (jeden sešit na podnik) do fields.csv
+
+Použití jako příkaz:
+    python import_2025_data.py --year 2025 --dir 2025-data [--dry-run]
+"""
+import os
+import argparse
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict
+
+import config
+from utils.name_matcher import NameMatcher, fold
+from utils.import_manifest import ImportManifest, file_hash
+from utils.id_allocator import IdAllocator
+from utils.partitioned_table import read_table, write_table
+
+
+# Mapování podniků podle názvu souboru
+BUSINESS_MAP = {
+    'osek': 5,
+    'zbiroh': 1,
+    'stahlavy': 2,
+    'humburky': 3,
+    'zichlice': 4,
+    'zichlice-konv': 4,
+    'zichlice-eko': 9,
+    'horni-olesnice': 6,
+    'kratonohy': 8,
+}
+
+# Známé soubory, které nejdou odvodit jen z názvu podniku
+FILE_BUSINESS_MAP = {
+    'Osek-export.xlsx': 5,
+    'zbiroh-2025-excel.xlsx': 1,
+    'stahlavy-export.xlsx': 2,
+    'humburky-export.xlsx': 3,
+    'zichlice-2025-konv.xlsx': 4,
+    'zichlice-eko.xlsx': 9,
+    'horni-olesnice.xlsx': 6,
+    'kratonohy-export.xlsx': 8,
+}
+
+# Sloupec v exportu -> sloupec ve fields.csv (porovnává se bez diakritiky a velikosti písmen)
+COLUMN_PATTERNS = {
+    'plodina': 'plodina',
+    'nazev honu': 'nazev_honu',
+    'odruda': 'odruda',
+    'vymera': 'vymera',
+    'sklizeno': 'sklizeno',
+    'hruba vaha': 'hruba_vaha',
+    'cista vaha': 'cista_vaha',
+}
+
+# Manifest importů ve složce dat (otisky sešitů a ID jejich řádků)
+MANIFEST_FILE = 'import_manifest.json'
+
+NUMERIC_COLUMNS = ['vymera', 'sklizeno', 'cista_vaha', 'hruba_vaha']
+
+FIELDS_COLUMNS = ['id', 'vymera', 'sklizeno', 'cista_vaha', 'hruba_vaha', 'plodina_id', 'podnik_id',
+                  'datum_upravy', 'operation', 'datum_vznik', 'cislo_honu', 'nazev_honu', 'odruda_id',
+                  'stmn', 'datum_seti', 'rok_sklizne']
+
+
+def business_for_file(filename: str, file_map: Optional[Dict[str, int]] = None) -> Optional[int]:
+    """Najde ID podniku pro sešit - známý soubor nebo nejdelší shoda začátku názvu"""
+    file_map = FILE_BUSINESS_MAP if file_map is None else file_map
+    if filename in file_map:
+        return file_map[filename]
+
+    name = fold(os.path.splitext(filename)[0]).replace(' ', '-')
+    matches = [key for key in BUSINESS_MAP if name.startswith(key)]
+    return BUSINESS_MAP[max(matches, key=len)] if matches else None
+
+
+def read_workbook(filepath: str) -> pd.DataFrame:
+    """
+    Načte první neprázdný list sešitu a najde řádek hlavičky (obsahuje "Plodina")
+
+    Returns:
+        DataFrame s hlavičkou ze sešitu, prázdný pokud jsou všechny listy prázdné
+        nebo hlavička chybí
+    """
+    raw = pd.DataFrame()
+    with pd.ExcelFile(filepath) as workbook:
+        for sheet in workbook.sheet_names:
+            raw = workbook.parse(sheet, header=None, dtype=object).dropna(how='all')
+            if not raw.empty:
+                break
+    if raw.empty:
+        return raw
+
+    is_header = raw.astype(str).apply(lambda col: col.str.contains('Plodina', regex=False)).any(axis=1)
+    if not is_header.any():
+        return pd.DataFrame()
+
+    header_pos = int(is_header.values.argmax())
+    df = raw.iloc[header_pos + 1:].reset_index(drop=True)
+    df.columns = [str(c) for c in raw.iloc[header_pos]]
+    return df
+
+
+def map_columns(columns) -> Dict[str, str]:
+    """Namapuje sloupce exportu na sloupce fields.csv"""
+    col_map = {}
+    for col in columns:
+        col_norm = fold(col)
+        for pattern, target in COLUMN_PATTERNS.items():
+            if pattern in col_norm and target not in col_map.values():
+                col_map[col] = target
+                break
+    return col_map
+
+
+def parse_workbook(filepath: str, business_id: int, year: int) -> pd.DataFrame:
+    """
+    Načte sešit jednoho podniku do tvaru fields.csv (bez ID a mapování názvů)
+
+    Funkce běží v samostatném procesu, proto pracuje jen s cestou k souboru.
+    """
+    df = read_workbook(filepath)
+    if df.empty:
+        return pd.DataFrame()
+
+    df = df.rename(columns=map_columns(df.columns))
+    df = df[[c for c in COLUMN_PATTERNS.values() if c in df.columns]].copy()
+
+    if 'plodina' not in df.columns:
+        return pd.DataFrame()
+
+    # Přeskočit prázdné řádky nebo řádky bez plodiny
+    df['plodina'] = df['plodina'].astype(str).str.strip()
+    df = df[df['plodina'].ne('') & df['plodina'].ne('nan') & df['plodina'].ne('None')]
+
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0.0) if col in df.columns else 0.0
+
+    # Nesklizená pole mají sklizenou výměru rovnou výměře
+    df['sklizeno'] = df['sklizeno'].where(df['sklizeno'] > 0, df['vymera'])
+
+    for col in ['nazev_honu', 'odruda']:
+        df[col] = df[col].fillna('').astype(str).str.strip() if col in df.columns else ''
+    df['cislo_honu'] = ''
+    df['stmn'] = ''
+    df['datum_seti'] = ''
+
+    df['podnik_id'] = business_id
+    df['rok_sklizne'] = year
+    df['zdroj'] = os.path.basename(filepath)
+    return df.reset_index(drop=True)
+
+
+def map_names(df: pd.DataFrame, crops: pd.DataFrame, varieties: pd.DataFrame):
+    """
+    Doplní plodina_id a odruda_id přes NameMatcher (každý unikátní název se hledá jen jednou)
+
+    Returns:
+        (DataFrame, nenamapované plodiny, nenamapované odrůdy,
+         názvy namapované na duplicitní název číselníku)
+    """
+    crop_matcher = NameMatcher.from_dataframe(crops)
+    variety_matcher = NameMatcher.from_dataframe(varieties)
+
+    df = df.assign(
+        plodina_id=crop_matcher.match_many(df['plodina']),
+        odruda_id=variety_matcher.match_many(df['odruda']),
+    )
+
+    unmapped_crops = sorted(set(df.loc[df['plodina_id'].isna() & df['plodina'].ne(''), 'plodina']))
+    unmapped_varieties = sorted(set(df.loc[df['odruda_id'].isna() & df['odruda'].ne(''), 'odruda']))
+    ambiguous = crop_matcher.ambiguous_matches(df['plodina'].dropna().unique()) + \
+        variety_matcher.ambiguous_matches(df['odruda'].dropna().unique())
+    return df, unmapped_crops, unmapped_varieties, ambiguous
+
+
+def diff_report(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    Porovná stávající a importovaná pole roku po podnicích
+
+    Pole se párují podle (podnik_id, nazev_honu, plodina_id), název bez ohledu na velikost písmen.
+
+    Returns:
+        DataFrame s počty polí a výměrou před/po a počty přidaných, odebraných a změněných polí
+    """
+    key = ['podnik_id', 'nazev_honu', 'plodina_id']
+    values = ['vymera', 'cista_vaha']
+
+    def keyed(df):
+        df = df[key + values].copy()
+        df['nazev_honu'] = df['nazev_honu'].fillna('').astype(str).str.strip().str.upper()
+        df['plodina_id'] = pd.to_numeric(df['plodina_id'], errors='coerce').fillna(-1).astype(int)
+        df['podnik_id'] = df['podnik_id'].astype(int)
+        df['poradi'] = df.groupby(key).cumcount()
+        return df
+
+    merged = keyed(old).merge(keyed(new), on=key + ['poradi'], how='outer', suffixes=('_pred', '_po'), indicator=True)
+    changed = (merged['_merge'] == 'both') & (
+        (merged['vymera_pred'].round(2) != merged['vymera_po'].round(2)) |
+        (merged['cista_vaha_pred'].round(2) != merged['cista_vaha_po'].round(2))
+    )
+    merged = merged.assign(
+        pridano=merged['_merge'] == 'right_only',
+        odebrano=merged['_merge'] == 'left_only',
+        zmeneno=changed,
+        pole_pred=merged['_merge'] != 'right_only',
+        pole_po=merged['_merge'] != 'left_only',
+    )
+
+    return merged.groupby('podnik_id').agg(
+        pole_pred=('pole_pred', 'sum'),
+        pole_po=('pole_po', 'sum'),
+        vymera_pred=('vymera_pred', 'sum'),
+        vymera_po=('vymera_po', 'sum'),
+        pridano=('pridano', 'sum'),
+        odebrano=('odebrano', 'sum'),
+        zmeneno=('zmeneno', 'sum'),
+    ).round(2).reset_index()
+
+
+def find_workbooks(import_dir: str, files: Optional[List[str]] = None,
+                   file_map: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Sešity ve složce s rozpoznaným podnikem: cesta -> ID podniku"""
+    names = files or sorted(f for f in os.listdir(import_dir) if f.endswith('.xlsx') and not f.startswith('~$'))
+    workbooks = {}
+    for name in names:
+        business_id = business_for_file(name, file_map)
+        if business_id is None:
+            print(f"PŘESKOČENO (neznámý podnik): {name}")
+            continue
+        workbooks[os.path.join(import_dir, name)] = business_id
+    return workbooks
+
+
+def import_fields(import_dir: str, year: int, data_dir: str = config.DATA_DIR,
+                  files: Optional[List[str]] = None, workers: Optional[int] = None,
+                  dry_run: bool = False, force: bool = False, replace_empty: bool = False) -> dict:
+    """
+    Naimportuje sešity ze složky do fields.csv
+
+    Zpracují se jen sešity, jejichž obsah se od posledního importu změnil
+    (podle manifestu importů). Změněné sešity se čtou paralelně v procesech,
+    nahradí se jen řádky, které z nich vznikly při minulém importu,
+    a fields.csv se zapíše jednou. Sešit, který v manifestu ještě není,
+    nahradí pole svého podniku v daném roce, která nepatří jinému sešitu
+    z manifestu. Sešit bez záznamů
+    se přeskočí (nic nenahradí), pokud není replace_empty.
+
+    Args:
+        import_dir: Složka se sešity
+        year: Rok sklizně
+        data_dir: Složka s CSV soubory aplikace
+        files: Jen vybrané soubory (názvy ve složce), None = všechny .xlsx
+        workers: Počet procesů (None = podle počtu CPU)
+        dry_run: Jen spočítat rozdíl, nic nezapisovat
+        force: Zpracovat i nezměněné sešity
+        replace_empty: I sešit bez záznamů nahradí svá pole (smaže je)
+
+    Returns:
+        Dict s klíči records (nová pole), report (rozdíl po podnicích),
+        unmapped_crops, unmapped_varieties, ambiguous (názvy s více ID
+        v číselníku) a skipped (nezměněné sešity)
+    """
+    result = {'records': pd.DataFrame(), 'report': pd.DataFrame(),
+              'unmapped_crops': [], 'unmapped_varieties': [], 'ambiguous': [], 'skipped': []}
+
+    workbooks = find_workbooks(import_dir, files) if os.path.isdir(import_dir) else {}
+    if not workbooks:
+        print(f"Ve složce {import_dir} nejsou žádné sešity k importu")
+        return result
+
+    manifest = ImportManifest(os.path.join(data_dir, MANIFEST_FILE))
+    hashes = {path: file_hash(path) for path in workbooks}
+    for path in list(workbooks):
+        if not force and manifest.is_current('fields.csv', year, os.path.basename(path), hashes[path]):
+            result['skipped'].append(os.path.basename(path))
+            del workbooks[path]
+
+    if not workbooks:
+        return result
+
+    fields_df = read_table(data_dir, 'fields.csv')
+    crops_df = pd.read_csv(os.path.join(data_dir, 'crops.csv'))
+    varieties_df = pd.read_csv(os.path.join(data_dir, 'varieties_seed.csv'))
+
+    frames = []
+    parsed = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {path: pool.submit(parse_workbook, path, business_id, year) for path, business_id in workbooks.items()}
+        for path, future in futures.items():
+            try:
+                df = future.result()
+            except Exception as e:
+                print(f"CHYBA ({os.path.basename(path)}): {e}")
+                continue
+            print(f"{os.path.basename(path)} (podnik ID: {workbooks[path]}): {len(df)} záznamů")
+            if df.empty and not replace_empty:
+                print(f"PŘESKOČENO (prázdný sešit, pole zůstávají): {os.path.basename(path)}")
+                continue
+            parsed.append(path)
+            if not df.empty:
+                frames.append(df)
+
+    new_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=FIELDS_COLUMNS + ['plodina', 'odruda', 'zdroj'])
+    new_df, unmapped_crops, unmapped_varieties, ambiguous = map_names(new_df, crops_df, varieties_df)
+
+    # Nahrazují se jen řádky úspěšně načtených sešitů
+    replaced = pd.Series(False, index=fields_df.index)
+    for path in parsed:
+        owned = manifest.owned_ids('fields.csv', year, os.path.basename(path))
+        if owned is None:
+            # Nový sešit nahradí pole podniku v roce, ale ne řádky jiných sešitů z manifestu
+            others = manifest.ids_of_other_files('fields.csv', year, os.path.basename(path))
+            replaced |= ((fields_df['rok_sklizne'] == year) & (fields_df['podnik_id'] == workbooks[path])
+                         & ~fields_df['id'].isin(others))
+        else:
+            replaced |= fields_df['id'].isin(owned)
+    kept_df = fields_df[~replaced]
+
+    now = datetime.now()
+    # Při dry run se ID jen odhadnou, sekvence se neposouvá
+    if dry_run:
+        start_id = int(fields_df['id'].max()) + 1 if not fields_df.empty else 1
+        new_ids = range(start_id, start_id + len(new_df))
+    else:
+        new_ids = IdAllocator(data_dir).allocate('fields.csv', len(new_df))
+    new_df = new_df.assign(
+        id=list(new_ids),
+        datum_upravy=now.strftime('%Y-%m-%d %H:%M:%S'),
+        operation='insert',
+        datum_vznik=now.strftime('%Y-%m-%d'),
+    )
+
+    result.update(
+        records=new_df,
+        report=diff_report(fields_df[replaced], new_df),
+        unmapped_crops=unmapped_crops,
+        unmapped_varieties=unmapped_varieties,
+        ambiguous=ambiguous,
+    )
+
+    if not dry_run:
+        ids_by_file = new_df.groupby('zdroj')['id'].apply(list)
+        for path in parsed:
+            filename = os.path.basename(path)
+            manifest.begin('fields.csv', year, filename, hashes[path], workbooks[path], ids_by_file.get(filename, []))
+        manifest.save()
+
+        # U polí uložených po rocích se přepíše jen oddíl importovaného roku
+        result_df = pd.concat([kept_df, new_df.reindex(columns=fields_df.columns)], ignore_index=True)
+        years = {year} | set(fields_df.loc[replaced, 'rok_sklizne'].dropna().astype(int))
+        write_table(data_dir, 'fields.csv', result_df, years)
+
+        manifest.commit('fields.csv', year)
+        manifest.save()
+
+    return result
+
+
+def main(argv: Optional[List[str]] = None, default_year: Optional[int] = None):
+    """Příkazová řádka importu"""
+    parser = argparse.ArgumentParser(description="Import polí z Excel exportů Tekro do fields.csv")
+    parser.add_argument('--year', type=int, default=default_year or datetime.now().year, help="Rok sklizně")
+    parser.add_argument('--dir', dest='import_dir', help="Složka se sešity (výchozí <rok>-data)")
+    parser.add_argument('--data-dir', default=config.DATA_DIR, help="Složka s CSV soubory aplikace")
+    parser.add_argument('--file', action='append', dest='files', help="Importovat jen tento soubor (lze opakovat)")
+    parser.add_argument('--workers', type=int, default=None, help="Počet paralelních procesů")
+    parser.add_argument('--dry-run', action='store_true', help="Jen vypsat rozdíl, nic neukládat")
+    parser.add_argument('--force', action='store_true', help="Znovu naimportovat i nezměněné sešity")
+    parser.add_argument('--replace-empty', action='store_true',
+                        help="Sešit bez záznamů smaže pole svého podniku (jinak se přeskočí)")
+    args = parser.parse_args(argv)
+
+    import_dir = args.import_dir or os.path.join(config.BASE_DIR, f"{args.year}-data")
+
+    print(f"=== IMPORT {args.year} ZE SLOŽKY {import_dir} ===")
+    result = import_fields(import_dir, args.year, args.data_dir, args.files, args.workers, args.dry_run, args.force,
+                           args.replace_empty)
+
+    for filename in result['skipped']:
+        print(f"BEZE ZMĚNY: {filename}")
+
+    print(f"\n=== CELKEM IMPORTOVÁNO: {len(result['records'])} záznamů ===")
+    if not result['report'].empty:
+        print("\n=== ROZDÍL PO PODNICÍCH ===")
+        print(result['report'].to_string(index=False))
+
+    if result['unmapped_crops']:
+        print(f"\n=== NENAMAPOVANÉ PLODINY ({len(result['unmapped_crops'])}) ===")
+        for crop in result['unmapped_crops']:
+            print(f"  - {crop}")
+
+    if result['unmapped_varieties']:
+        print(f"\n=== NENAMAPOVANÉ ODRŮDY ({len(result['unmapped_varieties'])}) ===")
+        for variety in result['unmapped_varieties']:
+            print(f"  - {variety}")
+
+    if result['ambiguous']:
+        print(f"\n=== NEJEDNOZNAČNÉ NÁZVY ({len(result['ambiguous'])}) - platí poslední ID v číselníku ===")
+        for name in result['ambiguous']:
+            print(f"  - {name}")
+
+    print("\nDRY RUN - nic nebylo uloženo" if args.dry_run else "\nHOTOVO!")
@@ -0,0 +1,129 @@
+"""
+Přidělování ID záznamů pro všechny tabulky (sekvence s uloženou horní hranicí)
+"""
+import os
+import json
+import threading
+from typing import Optional, Callable
+
+import pandas as pd
+
+from utils.partitioned_table import PartitionedTable, PARTITIONED_TABLES
+
+try:
+    import fcntl
+except ImportError:  # Windows - zámek jen v rámci procesu
+    fcntl = None
+
+
+# Soubor se sekvencemi ve složce dat
+SEQUENCES_FILE = 'id_sequences.json'
+
+
+def max_id_in_csv(base_path: str, filename: str) -> int:
+    """Nejvyšší ID v CSV souboru (0 pokud soubor nebo sloupec id chybí)"""
+    if filename in PARTITIONED_TABLES:
+        table = PartitionedTable(base_path, filename)
+        if table.exists():
+            return table.max_id()
+
+    filepath = os.path.join(base_path, filename)
+    if not os.path.exists(filepath):
+        return 0
+    try:
+        ids = pd.read_csv(filepath, usecols=['id'])['id']
+    except ValueError:
+        return 0
+    return int(ids.max()) if ids.notna().any() else 0
+
+
+class IdAllocator:
+    """Sekvence ID pro tabulky (klíčem je název CSV souboru)
+
+    Pro každou tabulku se v JSON ukládá poslední přidělené ID. Přidělení
+    je O(1) - tabulka se prochází jen jednou, když sekvence ještě neexistuje.
+    Hromadné vložení dostane souvislý blok ID jedním voláním.
+
+    Čtení a zápis sekvencí chrání zámek souboru (souběžné procesy)
+    i zámek v paměti (souběžné session Streamlitu ve stejném procesu).
+    """
+
+    _thread_lock = threading.Lock()
+
+    def __init__(self, base_path: str, seed: Optional[Callable[[str], int]] = None):
+        """
+        Args:
+            base_path: Složka dat, kde leží soubor sekvencí
+            seed: Funkce vracející nejvyšší existující ID tabulky
+                  (výchozí načte sloupec id z CSV)
+        """
+        self.path = os.path.join(base_path, SEQUENCES_FILE)
+        self.lock_path = self.path + '.lock'
+        self.seed = seed or (lambda filename: max_id_in_csv(base_path, filename))
+        # Nejvyšší ID viděná v načtených tabulkách - uplatní se až při přidělení
+        self.observed = {}
+
+    def _read(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write(self, sequences: dict):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(sequences, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _locked(self, update: Callable[[dict], int]) -> int:
+        """Provede update nad sekvencemi pod zámkem a uloží je"""
+        with self._thread_lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.lock_path, 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    sequences = self._read()
+                    result = update(sequences)
+                    self._write(sequences)
+                    return result
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def allocate(self, table: str, count: int = 1) -> range:
+        """
+        Přidělí blok po sobě jdoucích ID
+
+        Args:
+            table: Název tabulky (CSV souboru)
+            count: Počet ID
+
+        Returns:
+            range s přidělenými ID
+        """
+        def update(sequences):
+            last = sequences.get(table)
+            if last is None:
+                last = int(self.seed(table))
+            last = max(last, self.observed.get(table, 0))
+            sequences[table] = last + count
+            return last + 1
+
+        start = self._locked(update)
+        return range(start, start + count)
+
+    def next_id(self, table: str) -> int:
+        """Přidělí jedno ID"""
+        return self.allocate(table, 1)[0]
+
+    def observe(self, table: str, max_id) -> None:
+        """
+        Zapamatuje si nejvyšší ID tabulky (ruční úpravy CSV)
+
+        Nic nezapisuje - volá se při každém načtení tabulky, i u pohledů
+        jen pro čtení. Sekvence se posune až při příštím přidělení ID.
+        """
+        if max_id is None or pd.isna(max_id):
+            return
+        self.observed[table] = max(self.observed.get(table, 0), int(max_id))
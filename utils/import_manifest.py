@@ -0,0 +1,89 @@
+"""
+Manifest importů - otisk zdrojových souborů a ID záznamů, které z nich vznikly
+"""
+import os
+import json
+import hashlib
+from datetime import datetime
+from typing import Optional, List
+
+
+def file_hash(filepath: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 obsahu souboru"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImportManifest:
+    """Záznam o importovaných souborech uložený v JSON
+
+    Pro každý cíl (např. fields.csv), rok a zdrojový soubor si pamatuje
+    otisk obsahu a ID vytvořených řádků. Opakovaný import tak zpracuje
+    jen změněné soubory a nahradí jen jejich řádky.
+
+    Zápis probíhá ve dvou krocích: před uložením dat se nová ID uloží
+    jako "pending", po uložení se potvrdí (commit). Pokud import spadne
+    mezi tím, další běh smaže i rozpracovaná ID a soubor naimportuje znovu.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Cesta k JSON souboru manifestu
+        """
+        self.path = path
+        self.data = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.data = json.load(f)
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def entry(self, target: str, year: int, filename: str) -> Optional[dict]:
+        return self.data.get(target, {}).get(str(year), {}).get(filename)
+
+    def is_current(self, target: str, year: int, filename: str, content_hash: str) -> bool:
+        """Soubor je naimportovaný v této verzi a import byl dokončen"""
+        entry = self.entry(target, year, filename)
+        return bool(entry) and entry.get('hash') == content_hash and 'pending' not in entry
+
+    def owned_ids(self, target: str, year: int, filename: str) -> Optional[List[int]]:
+        """
+        ID řádků, které patří souboru (včetně nedokončeného importu)
+
+        Returns:
+            Seznam ID, nebo None pokud soubor v manifestu ještě není
+        """
+        entry = self.entry(target, year, filename)
+        if not entry:
+            return None
+        return list(entry.get('ids', [])) + list(entry.get('pending', {}).get('ids', []))
+
+    def ids_of_other_files(self, target: str, year: int, filename: str) -> List[int]:
+        """ID řádků, které patří ostatním souborům cíle a roku (viz owned_ids)"""
+        ids = []
+        for other in self.data.get(target, {}).get(str(year), {}):
+            if other != filename:
+                ids.extend(self.owned_ids(target, year, other) or [])
+        return ids
+
+    def begin(self, target: str, year: int, filename: str, content_hash: str, podnik_id: int, ids: List[int]):
+        """Zaznamená rozpracovaný import souboru (před zápisem dat)"""
+        files = self.data.setdefault(target, {}).setdefault(str(year), {})
+        entry = files.setdefault(filename, {'hash': None, 'podnik_id': int(podnik_id), 'ids': []})
+        entry['pending'] = {'hash': content_hash, 'ids': [int(i) for i in ids]}
+
+    def commit(self, target: str, year: int):
+        """Potvrdí rozpracované importy roku po úspěšném zápisu dat"""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for entry in self.data.get(target, {}).get(str(year), {}).values():
+            pending = entry.pop('pending', None)
+            if pending:
+                entry.update(hash=pending['hash'], ids=pending['ids'], imported_at=now)
@@ -0,0 +1,51 @@
+"""
+Odložené načtení tabulky - data se čtou až při prvním použití
+"""
+import pandas as pd
+from typing import Optional, List
+
+
+class LazyTable:
+    """Odkaz na tabulku DataManageru s filtrem, který se načte až při přístupu
+
+    Filtr (where) a výběr sloupců se použijí už při načtení, takže stránka
+    nedrží kopii celé tabulky, když zobrazuje jen řádky jednoho podniku.
+    Sdílená cache DataManageru ale při prvním přístupu načte celou tabulku
+    (select hledá řádky přes její index) - úspora je jen v tabulkách,
+    na které stránka vůbec nesáhne.
+
+    Příklad:
+        pole = data_manager.lazy('fields.csv', where={'podnik_id': 3})
+        if zobrazit:
+            df = pole.df   # teprve zde se tabulka načte
+    """
+
+    def __init__(self, data_manager, filename: str, where: Optional[dict] = None,
+                 columns: Optional[List[str]] = None):
+        """
+        Args:
+            data_manager: DataManager, přes který se tabulka načte
+            filename: Název CSV souboru
+            where: Filtr sloupec -> hodnota nebo seznam hodnot
+            columns: Sloupce k načtení (None = všechny)
+        """
+        self.data_manager = data_manager
+        self.filename = filename
+        self.where = where or {}
+        self.columns = columns
+        self._df = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._df is not None
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Data tabulky (při prvním přístupu se načtou)"""
+        if self._df is None:
+            self._df = self.data_manager.select(self.filename, self.where, self.columns)
+        return self._df
+
+    def reset(self):
+        """Zahodí načtená data, další přístup je načte znovu"""
+        self._df = None
@@ -0,0 +1,178 @@
+"""
+Vyhledávání ID podle názvu s tolerancí překlepů (plodiny, odrůdy)
+"""
+import unicodedata
+from collections import defaultdict
+from typing import Optional, List, Tuple, Iterable
+import pandas as pd
+
+
+def fold(text) -> str:
+    """Malá písmena bez diakritiky, jednoduché mezery"""
+    if text is None or (isinstance(text, float) and pd.isna(text)):
+        return ''
+    text = unicodedata.normalize('NFKD', str(text).lower())
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.split())
+
+
+class NameMatcher:
+    """Index názvů pro mapování textu z importů na ID číselníku
+
+    Index se postaví jednou a obsahuje:
+        - přesnou mapu normalizovaných názvů (bez diakritiky a velikosti písmen)
+        - prefixový strom pro shodu začátku názvu
+        - index trigramů pro kandidáty s překlepem nebo částečnou shodou
+
+    Skóre kandidátů:
+        1.0          - shoda po normalizaci
+        0.5 až 0.95  - jeden název obsahuje druhý (podle poměru délek)
+        0 až 1       - podobnost trigramů (Diceův koeficient)
+
+    Pořadí je deterministické: skóre sestupně, pak název a ID.
+
+    Více položek se stejným normalizovaným názvem: platí poslední výskyt
+    (jako slovník v původním importu), ostatní ID jsou v ambiguous.
+    """
+
+    PREFIX_LIMIT = 50
+
+    def __init__(self, ids: Iterable, names: Iterable):
+        """
+        Args:
+            ids: ID položek číselníku
+            names: Názvy ve stejném pořadí
+        """
+        self.names = {}     # normalizovaný název -> (ID, původní název)
+        self.ambiguous = {}  # normalizovaný název -> všechna ID se stejným názvem (platné poslední)
+        self.trie = {}
+        self.trigrams = defaultdict(set)
+
+        for item_id, name in zip(ids, names):
+            if item_id is None or pd.isna(item_id):
+                continue
+            key = fold(name)
+            if not key:
+                continue
+            if key in self.names:
+                # Při duplicitních názvech platí poslední výskyt
+                previous = self.ambiguous.get(key, [self.names[key][0]])
+                if int(item_id) not in previous:
+                    self.ambiguous[key] = previous + [int(item_id)]
+                self.names[key] = (int(item_id), str(name).strip())
+                continue
+            self.names[key] = (int(item_id), str(name).strip())
+            self._trie_insert(key)
+            for gram in self._grams(key):
+                self.trigrams[gram].add(key)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, id_col: str = 'id', name_col: str = 'nazev') -> 'NameMatcher':
+        """Index z tabulky číselníku (např. crops.csv, varieties_seed.csv)"""
+        return cls(df[id_col].tolist(), df[name_col].tolist())
+
+    @staticmethod
+    def _grams(key: str) -> set:
+        padded = f"  {key} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def _trie_insert(self, key: str):
+        node = self.trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[''] = key
+
+    def _prefixes_of(self, query: str) -> List[str]:
+        """Názvy, kterými dotaz začíná"""
+        found = []
+        node = self.trie
+        for ch in query:
+            node = node.get(ch)
+            if node is None:
+                break
+            if '' in node:
+                found.append(node[''])
+        return found
+
+    def _starting_with(self, query: str) -> List[str]:
+        """Názvy začínající dotazem (nejvýše PREFIX_LIMIT)"""
+        node = self.trie
+        for ch in query:
+            node = node.get(ch)
+            if node is None:
+                return []
+
+        found = []
+        stack = [node]
+        while stack and len(found) < self.PREFIX_LIMIT:
+            node = stack.pop()
+            for ch in sorted(node, reverse=True):
+                if ch == '':
+                    found.append(node[''])
+                else:
+                    stack.append(node[ch])
+        return found
+
+    def _score(self, query: str, key: str, query_grams: set) -> float:
+        if query == key:
+            return 1.0
+        short, long_ = sorted((query, key), key=len)
+        score = 0.0
+        if short in long_:
+            score = 0.5 + 0.45 * len(short) / len(long_)
+        key_grams = self._grams(key)
+        dice = 2 * len(query_grams & key_grams) / (len(query_grams) + len(key_grams))
+        return round(max(score, dice), 4)
+
+    def candidates(self, name, limit: int = 5, min_score: float = 0.3) -> List[Tuple[int, str, float]]:
+        """
+        Seřazení kandidáti pro název
+
+        Returns:
+            Seznam (ID, název v číselníku, skóre), nejlepší první
+        """
+        query = fold(name)
+        if not query:
+            return []
+
+        if query in self.names and limit == 1:
+            item_id, original = self.names[query]
+            return [(item_id, original, 1.0)]
+
+        keys = set(self._prefixes_of(query)) | set(self._starting_with(query))
+        query_grams = self._grams(query)
+        for gram in query_grams:
+            keys |= self.trigrams.get(gram, set())
+
+        scored = []
+        for key in keys:
+            score = self._score(query, key, query_grams)
+            if score >= min_score:
+                item_id, original = self.names[key]
+                scored.append((item_id, original, score))
+
+        scored.sort(key=lambda c: (-c[2], fold(c[1]), c[0]))
+        return scored[:limit]
+
+    def match(self, name, min_score: float = 0.6) -> Optional[int]:
+        """ID nejlepšího kandidáta se skóre alespoň min_score, jinak None"""
+        found = self.candidates(name, limit=1, min_score=min_score)
+        return found[0][0] if found else None
+
+    def ambiguous_matches(self, names: Iterable, min_score: float = 0.6) -> List[str]:
+        """Popis názvů, které se namapovaly na název s více ID v číselníku"""
+        found = []
+        for name in sorted({str(n) for n in names if fold(n)}):
+            candidates = self.candidates(name, limit=1, min_score=min_score)
+            key = fold(candidates[0][1]) if candidates else None
+            if key in self.ambiguous:
+                item_id = self.names[key][0]
+                others = ', '.join(str(i) for i in self.ambiguous[key] if i != item_id)
+                found.append(f"{name} -> ID {item_id} (stejný název má i ID {others})")
+        return found
+
+    def match_many(self, names: pd.Series, min_score: float = 0.6) -> pd.Series:
+        """Namapuje sloupec názvů - každý unikátní název se hledá jen jednou"""
+        unique = names.dropna().unique()
+        lookup = {name: self.match(name, min_score) for name in unique}
+        return names.map(lookup)
@@ -0,0 +1,381 @@
+"""
+Tabulky uložené po rocích: data/fields/rok=2025.csv + katalog oddílů
+
+Katalog (catalogue.json) eviduje pro každý oddíl počet řádků, nejvyšší ID
+a verzi, která se zvýší při každém zápisu oddílu. Načtené oddíly se drží
+v paměti, dokud se jejich verze nezmění - historické roky se tak čtou
+z disku jen jednou a zápis aktuální sezóny přepíše jen její soubor.
+
+Dokud tabulka není převedená (katalog neexistuje), čte se a zapisuje
+původní jediný CSV soubor.
+
+Převod existujících dat:
+    python migrate_partitions.py [--back]
+"""
+import os
+import json
+import argparse
+import pandas as pd
+from datetime import datetime
+from typing import Optional, List, Iterable
+
+import config
+
+
+def _harvest_year(df: pd.DataFrame) -> pd.Series:
+    return pd.to_numeric(df['rok_sklizne'], errors='coerce')
+
+
+def _calendar_year(df: pd.DataFrame) -> pd.Series:
+    return pd.to_numeric(df['Datum'].astype(str).str[:4], errors='coerce')
+
+
+# Tabulky rozdělené po rocích: název CSV -> funkce vracející rok řádků
+PARTITIONED_TABLES = {
+    'fields.csv': _harvest_year,
+    'sbernasrazky.csv': _calendar_year,
+}
+
+CATALOGUE_FILE = 'catalogue.json'
+
+# Oddíl pro řádky bez platného roku
+UNKNOWN_YEAR = 'bez_roku'
+
+# Názvy textových typů sloupců (podle verze pandas)
+TEXT_DTYPES = ('object', 'str', 'string')
+
+
+class PartitionedTable:
+    """Jedna tabulka rozdělená do CSV souborů po rocích"""
+
+    def __init__(self, base_path: str, filename: str):
+        """
+        Args:
+            base_path: Složka dat (např. data)
+            filename: Název tabulky podle PARTITIONED_TABLES (např. fields.csv)
+        """
+        self.base_path = base_path
+        self.filename = filename
+        self.year_of = PARTITIONED_TABLES[filename]
+        self.path = os.path.join(base_path, os.path.splitext(filename)[0])
+        self.catalogue_path = os.path.join(self.path, CATALOGUE_FILE)
+        # Katalog se čte znovu jen při změně souboru
+        self._catalogue = None
+        self._catalogue_mtime = None
+        # Načtené oddíly: klíč -> (verze, DataFrame)
+        self.cache = {}
+
+    def exists(self) -> bool:
+        """Tabulka je převedená na oddíly"""
+        return os.path.exists(self.catalogue_path)
+
+    @property
+    def catalogue(self) -> dict:
+        mtime = os.path.getmtime(self.catalogue_path) if self.exists() else None
+        if self._catalogue is None or mtime != self._catalogue_mtime:
+            if mtime is None:
+                self._catalogue = {'columns': [], 'dtypes': {}, 'partitions': {}}
+            else:
+                with open(self.catalogue_path, encoding='utf-8') as f:
+                    self._catalogue = json.load(f)
+            self._catalogue_mtime = mtime
+        return self._catalogue
+
+    def _save_catalogue(self, catalogue: dict):
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = self.catalogue_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(catalogue, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.catalogue_path)
+        self._catalogue = catalogue
+        self._catalogue_mtime = os.path.getmtime(self.catalogue_path)
+
+    @staticmethod
+    def _key(year) -> str:
+        return UNKNOWN_YEAR if year is None or pd.isna(year) else str(int(year))
+
+    def _partition_path(self, key: str) -> str:
+        return os.path.join(self.path, f"rok={key}.csv")
+
+    def years(self) -> List[int]:
+        """Roky, pro které existuje oddíl (z katalogu, bez čtení dat)"""
+        return sorted(int(k) for k in self.catalogue['partitions'] if k != UNKNOWN_YEAR)
+
+    def max_id(self) -> int:
+        """Nejvyšší ID napříč oddíly (z katalogu)"""
+        return max((p.get('max_id') or 0 for p in self.catalogue['partitions'].values()), default=0)
+
+    def _read_partition(self, key: str) -> pd.DataFrame:
+        catalogue = self.catalogue
+        version = catalogue['partitions'][key]['version']
+        cached = self.cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        # Textové sloupce číst jako text i v roce, kde obsahují jen čísla
+        dtypes = catalogue.get('dtypes', {})
+        text_columns = {col: str for col, dtype in dtypes.items() if dtype in TEXT_DTYPES}
+        df = pd.read_csv(self._partition_path(key), dtype=text_columns)
+        self.cache[key] = (version, df)
+        return df
+
+    def read(self, years: Optional[Iterable[int]] = None) -> pd.DataFrame:
+        """
+        Načte oddíly tabulky
+
+        Args:
+            years: Roky k načtení (None = celá tabulka včetně řádků bez roku)
+
+        Returns:
+            DataFrame s řádky oddílů ve vzestupném pořadí roků
+        """
+        catalogue = self.catalogue
+        keys = sorted(catalogue['partitions'])
+        if years is not None:
+            wanted = {self._key(y) for y in years}
+            keys = [k for k in keys if k in wanted]
+
+        frames = [self._read_partition(k) for k in keys]
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return pd.DataFrame(columns=catalogue['columns'])
+
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].copy()
+        df = df.reindex(columns=catalogue['columns'])
+        # Číselné sloupce vrátit na typ celé tabulky (int v roce bez chybějících hodnot)
+        for col, dtype in catalogue.get('dtypes', {}).items():
+            if dtype not in TEXT_DTYPES and str(df[col].dtype) != dtype:
+                try:
+                    df[col] = df[col].astype(dtype)
+                except (ValueError, TypeError):
+                    pass
+        return df
+
+    def _unchanged(self, key: str, part: pd.DataFrame, partitions: dict) -> bool:
+        """Oddíl v cache má stejný obsah jako part (typy sloupců se nerozlišují)"""
+        cached = self.cache.get(key)
+        if key not in partitions or not cached or cached[0] != partitions[key]['version']:
+            return False
+        try:
+            pd.testing.assert_frame_equal(cached[1].reindex(columns=part.columns), part,
+                                          check_dtype=False, check_index_type=False)
+        except AssertionError:
+            return False
+        return True
+
+    def write(self, df: pd.DataFrame, years: Optional[Iterable[int]] = None) -> List[str]:
+        """
+        Zapíše tabulku do oddílů
+
+        Args:
+            df: Celá tabulka, nebo jen řádky roků v years
+            years: Roky, které df nahrazuje (None = df je celá tabulka; přepíšou
+                   se jen oddíly, jejichž obsah se liší od uloženého)
+
+        Returns:
+            Klíče přepsaných oddílů
+        """
+        catalogue = dict(self.catalogue)
+        partitions = dict(catalogue['partitions'])
+        columns = list(df.columns)
+        dtypes = {col: str(dtype) for col, dtype in df.dtypes.items()}
+        if years is not None:
+            # Částečný zápis nemění typ existujících sloupců (rok může mít jen čísla)
+            dtypes.update({col: dtype for col, dtype in catalogue.get('dtypes', {}).items() if col in dtypes})
+        catalogue['columns'] = columns
+        catalogue['dtypes'] = dtypes
+
+        groups = {self._key(y): part for y, part in df.groupby(self.year_of(df), dropna=False, sort=False)}
+        if years is None:
+            targets = set(groups) | set(partitions)
+        else:
+            targets = {self._key(y) for y in years} | (set(groups) - set(partitions))
+
+        os.makedirs(self.path, exist_ok=True)
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        written = []
+        for key in sorted(targets):
+            part = groups.get(key, pd.DataFrame(columns=columns)).reset_index(drop=True)
+            if years is None and self._unchanged(key, part, partitions):
+                continue
+
+            path = self._partition_path(key)
+            if part.empty:
+                if os.path.exists(path):
+                    os.remove(path)
+                if key in partitions:
+                    del partitions[key]
+                    self.cache.pop(key, None)
+                    written.append(key)
+                continue
+
+            part.to_csv(path, index=False)
+            version = partitions.get(key, {}).get('version', 0) + 1
+            partitions[key] = {
+                'rows': len(part),
+                'max_id': int(part['id'].max()) if 'id' in part.columns and part['id'].notna().any() else None,
+                'version': version,
+                'updated_at': now,
+            }
+            self.cache[key] = (version, part)
+            written.append(key)
+
+        if written or catalogue != self.catalogue:
+            catalogue['partitions'] = partitions
+            self._save_catalogue(catalogue)
+        return written
+
+    def append(self, df: pd.DataFrame) -> List[str]:
+        """Připojí nové řádky na konec oddílů jejich roků (bez přepsání souborů)"""
+        catalogue = dict(self.catalogue)
+        partitions = dict(catalogue['partitions'])
+        columns = catalogue['columns'] or list(df.columns)
+        if not catalogue['columns']:
+            catalogue['columns'] = columns
+            catalogue['dtypes'] = {col: str(dtype) for col, dtype in df.dtypes.items()}
+
+        os.makedirs(self.path, exist_ok=True)
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        written = []
+        for year, part in df.groupby(self.year_of(df), dropna=False, sort=False):
+            key = self._key(year)
+            part = part.reindex(columns=columns)
+            path = self._partition_path(key)
+            exists = key in partitions and os.path.exists(path)
+            part.to_csv(path, mode='a' if exists else 'w', header=not exists, index=False)
+
+            entry = dict(partitions.get(key, {'rows': 0, 'max_id': None, 'version': 0}))
+            ids = [entry['max_id']] if entry['max_id'] is not None else []
+            if 'id' in part.columns and part['id'].notna().any():
+                ids.append(int(part['id'].max()))
+            entry.update(rows=entry['rows'] + len(part), max_id=max(ids) if ids else None,
+                         version=entry['version'] + 1, updated_at=now)
+            partitions[key] = entry
+            self.cache.pop(key, None)
+            written.append(key)
+
+        catalogue['partitions'] = partitions
+        self._save_catalogue(catalogue)
+        return written
+
+
+def read_table(base_path: str, filename: str, years: Optional[Iterable[int]] = None) -> pd.DataFrame:
+    """
+    Načte tabulku z oddílů, pokud je převedená, jinak z CSV souboru
+
+    Args:
+        base_path: Složka dat
+        filename: Název CSV souboru
+        years: Jen tyto roky (u nepřevedené tabulky se filtruje po načtení)
+    """
+    if filename in PARTITIONED_TABLES:
+        table = PartitionedTable(base_path, filename)
+        if table.exists():
+            return table.read(years)
+
+    df = pd.read_csv(os.path.join(base_path, filename))
+    if years is not None and filename in PARTITIONED_TABLES:
+        df = df[PARTITIONED_TABLES[filename](df).isin(list(years))]
+    return df
+
+
+def write_table(base_path: str, filename: str, df: pd.DataFrame,
+                years: Optional[Iterable[int]] = None):
+    """
+    Uloží celou tabulku - převedenou do dotčených oddílů, jinak do CSV souboru
+
+    Args:
+        years: Roky, kterých se změna týká (ostatní oddíly se nepřepisují)
+    """
+    if filename in PARTITIONED_TABLES:
+        table = PartitionedTable(base_path, filename)
+        if table.exists():
+            if years is not None:
+                df = df[PARTITIONED_TABLES[filename](df).isin(list(years))]
+            table.write(df, years)
+            return
+
+    df.to_csv(os.path.join(base_path, filename), index=False)
+
+
+def table_exists(base_path: str, filename: str) -> bool:
+    """Tabulka existuje jako CSV soubor nebo jako oddíly"""
+    if filename in PARTITIONED_TABLES and PartitionedTable(base_path, filename).exists():
+        return True
+    return os.path.exists(os.path.join(base_path, filename))
+
+
+def table_version(base_path: str, filename: str) -> Optional[str]:
+    """
+    Značka verze tabulky pro podmíněné dotazy (mění se s každým zápisem)
+
+    U tabulky po rocích se bere katalog - přepisuje se při každém zápisu oddílu.
+
+    Returns:
+        Řetězec z času změny a velikosti souboru, None pokud tabulka neexistuje
+    """
+    path = os.path.join(base_path, filename)
+    if filename in PARTITIONED_TABLES:
+        table = PartitionedTable(base_path, filename)
+        if table.exists():
+            path = table.catalogue_path
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def migrate(base_path: str, filenames: Optional[List[str]] = None, back: bool = False) -> dict:
+    """
+    Převede tabulky z jednoho CSV na oddíly po rocích (nebo zpět)
+
+    Původní CSV se po převodu přejmenuje na *.csv.bak, aby ho nikdo
+    nečetl jako aktuální data.
+
+    Returns:
+        Dict název tabulky -> počet oddílů (při převodu zpět počet řádků)
+    """
+    result = {}
+    for filename in filenames or list(PARTITIONED_TABLES):
+        table = PartitionedTable(base_path, filename)
+        filepath = os.path.join(base_path, filename)
+
+        if back:
+            if not table.exists():
+                continue
+            df = table.read()
+            df.to_csv(filepath, index=False)
+            for key in list(table.catalogue['partitions']):
+                os.remove(table._partition_path(key))
+            os.remove(table.catalogue_path)
+            if not os.listdir(table.path):
+                os.rmdir(table.path)
+            result[filename] = len(df)
+            continue
+
+        if table.exists() or not os.path.exists(filepath):
+            continue
+        df = pd.read_csv(filepath)
+        table.write(df)
+        os.replace(filepath, filepath + '.bak')
+        result[filename] = len(table.catalogue['partitions'])
+    return result
+
+
+def main(argv: Optional[List[str]] = None):
+    """Příkazová řádka převodu tabulek na oddíly"""
+    parser = argparse.ArgumentParser(description="Převod tabulek fields a sbernasrazky na oddíly po rocích")
+    parser.add_argument('--data-dir', default=config.DATA_DIR, help="Složka s CSV soubory aplikace")
+    parser.add_argument('--table', action='append', dest='tables', choices=list(PARTITIONED_TABLES),
+                        help="Převést jen tuto tabulku (lze opakovat)")
+    parser.add_argument('--back', action='store_true', help="Sloučit oddíly zpět do jednoho CSV")
+    args = parser.parse_args(argv)
+
+    result = migrate(args.data_dir, args.tables, args.back)
+    if not result:
+        print("Není co převádět")
+    for filename, count in result.items():
+        if args.back:
+            print(f"{filename}: sloučeno {count} řádků")
+        else:
+            print(f"{filename}: {count} oddílů")
@@ -0,0 +1,141 @@
+"""
+Hashování a ověřování hesel uživatelů
+
+users.csv nese dva formáty:
+    password                      - bcrypt hash ($2b$<cost>$...), nová hesla
+    password_salt/hash/iters      - starší PBKDF2-SHA256 (sůl a hash v hex)
+
+Ověření je záměrně pomalé (desítky až stovky ms). Běží v malém sdíleném
+poolu vláken: bcrypt i hashlib během výpočtu uvolňují GIL, takže ostatní
+session běží dál, a počet současně počítaných hashů je omezený - nával
+přihlášení se řadí do fronty místo toho, aby zabral všechna jádra.
+"""
+import os
+import sys
+import hmac
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import bcrypt
+import pandas as pd
+
+import config
+
+# bcrypt hashuje jen prvních 72 bajtů hesla, delší heslo by se tiše zkrátilo
+MAX_PASSWORD_BYTES = 72
+
+_executor = None
+_dummy_hash = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=config.PASSWORD_WORKERS, thread_name_prefix='password')
+    return _executor
+
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    """
+    bcrypt hash hesla pro sloupec password
+
+    Args:
+        password: Heslo (nejvýš MAX_PASSWORD_BYTES bajtů v UTF-8)
+        rounds: Cena bcrypt (log2 počtu iterací); None = config.BCRYPT_ROUNDS
+    """
+    encoded = password.encode('utf-8')
+    if len(encoded) > MAX_PASSWORD_BYTES:
+        raise ValueError(f"Heslo je delší než {MAX_PASSWORD_BYTES} bajtů")
+    return bcrypt.hashpw(encoded, bcrypt.gensalt(rounds or config.BCRYPT_ROUNDS)).decode('ascii')
+
+
+def _text(value) -> str:
+    return '' if value is None or pd.isna(value) else str(value).strip()
+
+
+def check_password(password: str, user: Dict) -> bool:
+    """Porovná heslo s uloženým hashem (bez poolu - volá se ve vlákně poolu)"""
+    stored = _text(user.get('password'))
+    encoded = password.encode('utf-8')
+    if stored.startswith('$2'):
+        try:
+            return bcrypt.checkpw(encoded, stored.encode('ascii'))
+        except ValueError:
+            # Poškozený hash nebo heslo delší než 72 bajtů
+            return False
+
+    salt, digest = _text(user.get('password_salt')), _text(user.get('password_hash'))
+    try:
+        iters = int(float(_text(user.get('password_iters'))))
+        computed = hashlib.pbkdf2_hmac('sha256', encoded, bytes.fromhex(salt), iters).hex()
+    except ValueError:
+        # Uživatel bez hesla se přihlásit nemůže
+        return False
+    return bool(digest) and hmac.compare_digest(computed, digest.lower())
+
+
+def dummy_hash() -> str:
+    """Fiktivní hash se stejnou cenou pro neznámé uživatele (vytvoří se jednou)"""
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password('')
+    return _dummy_hash
+
+
+def verify_password(password: str, user: Optional[Dict]) -> bool:
+    """
+    Ověří heslo v poolu vláken hesel
+
+    Pro neznámého uživatele (None) se ověří proti fiktivnímu hashu se
+    stejnou cenou, aby doba odpovědi neprozradila, která jména existují.
+    """
+    if user is None:
+        _pool().submit(check_password, password, {'password': dummy_hash()}).result()
+        return False
+    return _pool().submit(check_password, password, user).result()
+
+
+def hash_rounds(user: Dict) -> Optional[int]:
+    """Cena uloženého bcrypt hashe (None pro PBKDF2 nebo chybějící heslo)"""
+    stored = _text(user.get('password'))
+    parts = stored.split('$')
+    if stored.startswith('$2') and len(parts) > 2 and parts[2].isdigit():
+        return int(parts[2])
+    return None
+
+
+def set_password(users_csv_path: str, username: str, password: str, rounds: Optional[int] = None):
+    """Nastaví uživateli nové heslo v users.csv (bcrypt, starší PBKDF2 sloupce se vyprázdní)"""
+    users = pd.read_csv(users_csv_path, dtype=str, keep_default_na=False)
+    mask = users['username'] == username
+    if not mask.any():
+        raise KeyError(f"Uživatel '{username}' neexistuje")
+    users.loc[mask, 'password'] = hash_password(password, rounds)
+    for column in ('password_salt', 'password_hash', 'password_iters'):
+        if column in users.columns:
+            users.loc[mask, column] = ''
+    users.to_csv(users_csv_path + '.tmp', index=False)
+    os.replace(users_csv_path + '.tmp', users_csv_path)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Příkazová řádka nastavení hesla"""
+    import getpass
+
+    parser = argparse.ArgumentParser(description="Nastavení hesla uživatele (bcrypt) v users.csv")
+    parser.add_argument('username', help="Uživatelské jméno")
+    parser.add_argument('--data-dir', default=config.DATA_DIR, help="Složka s users.csv")
+    parser.add_argument('--rounds', type=int, default=None,
+                        help=f"Cena bcrypt (výchozí {config.BCRYPT_ROUNDS}, viz benchmarks/bench_password_cost.py)")
+    args = parser.parse_args(argv)
+
+    password = getpass.getpass("Nové heslo: ")
+    if password != getpass.getpass("Heslo znovu: "):
+        sys.exit("Hesla se neshodují")
+    try:
+        set_password(os.path.join(args.data_dir, 'users.csv'), args.username, password, args.rounds)
+    except (KeyError, ValueError) as e:
+        sys.exit(str(e.args[0]))
+    print(f"Heslo uživatele {args.username} nastaveno")
@@ -0,0 +1,181 @@
+"""
+Import výměr pozemků z Excel exportů Tekro (2025-data/pozemky) do pozemky.csv
+
+Export má na řádcích typy pozemků a ve sloupcích roky ("2017[ha]" ...).
+
+Použití jako příkaz:
+    python import_pozemky.py --dir 2025-data/pozemky [--dry-run]
+"""
+import os
+import re
+import argparse
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List
+
+import config
+from utils.fields_import import find_workbooks
+from utils.name_matcher import NameMatcher, fold
+from utils.id_allocator import IdAllocator
+
+
+# Soubory exportů podle podniku (odpovídá ručně zadaným datům v pozemky.csv)
+POZEMKY_FILE_MAP = {
+    'Tekro excel export.xlsx': 5,
+    'zbiroh-pozemek.xlsx': 1,
+    'stahlavy-pozemek.xlsx': 2,
+    'humburky-pozemek.xlsx': 3,
+    'zichlice-pozemek.xlsx': 4,
+    'zichlice-konv-pozemek.xlsx': 9,
+    'kratonohy-pozemek.xlsx': 8,
+}
+
+YEAR_PATTERN = re.compile(r'(\d{4})')
+
+
+def read_pozemky_workbook(filepath: str, business_id: int) -> pd.DataFrame:
+    """
+    Načte export pozemků jednoho podniku v režimu read-only (řádek po řádku)
+
+    Returns:
+        DataFrame ve dlouhém tvaru: PodnikID, Year, Typ, Velikost (jen nenulové výměry)
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+
+        # Hlavička je první řádek s "Typ pozemku"
+        years = None
+        for row in rows:
+            if row and row[0] is not None and fold(row[0]) == 'typ pozemku':
+                years = {}
+                for pos, cell in enumerate(row[1:], start=1):
+                    found = YEAR_PATTERN.search(str(cell)) if cell is not None else None
+                    if found:
+                        years[pos] = int(found.group(1))
+                break
+
+        if not years:
+            return pd.DataFrame(columns=['PodnikID', 'Year', 'Typ', 'Velikost'])
+
+        typy, values = [], []
+        for row in rows:
+            # Prázdné řádky a součtový řádek přeskočit
+            if not row or row[0] is None or fold(row[0]) in ('', 'celkem'):
+                continue
+            typy.append(str(row[0]).strip())
+            values.append([row[pos] if pos < len(row) else None for pos in years])
+    finally:
+        wb.close()
+
+    wide = pd.DataFrame(values, columns=list(years.values()))
+    wide = wide.apply(pd.to_numeric, errors='coerce')
+    wide['Typ'] = typy
+
+    df = wide.melt(id_vars='Typ', var_name='Year', value_name='Velikost')
+    df = df[df['Velikost'].fillna(0) != 0]
+    df['PodnikID'] = business_id
+    df['Year'] = df['Year'].astype(int)
+    return df[['PodnikID', 'Year', 'Typ', 'Velikost']].reset_index(drop=True)
+
+
+def import_pozemky(import_dir: str, data_dir: str = config.DATA_DIR,
+                   files: Optional[List[str]] = None, workers: Optional[int] = None,
+                   dry_run: bool = False) -> dict:
+    """
+    Naimportuje výměry pozemků ze složky exportů do pozemky.csv
+
+    Sešity se čtou paralelně, výměry se sečtou po (PodnikID, Year, NazevId)
+    a pozemky.csv se zapíše jednou: existující řádky se přepíšou, chybějící
+    se přidají. Nulové hodnoty exportu se berou jako "bez údaje".
+
+    Returns:
+        Dict s klíči inserted, updated, unchanged a unmapped_types
+    """
+    pozemky_path = os.path.join(data_dir, 'pozemky.csv')
+    pozemky_df = pd.read_csv(pozemky_path)
+    typy_df = pd.read_csv(os.path.join(data_dir, 'typpozemek.csv'))
+
+    result = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'unmapped_types': []}
+
+    workbooks = find_workbooks(import_dir, files, POZEMKY_FILE_MAP) if os.path.isdir(import_dir) else {}
+    if not workbooks:
+        print(f"Ve složce {import_dir} nejsou žádné sešity k importu")
+        return result
+
+    frames = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {path: pool.submit(read_pozemky_workbook, path, business_id) for path, business_id in workbooks.items()}
+        for path, future in futures.items():
+            try:
+                df = future.result()
+            except Exception as e:
+                print(f"CHYBA ({os.path.basename(path)}): {e}")
+                continue
+            print(f"{os.path.basename(path)} (podnik ID: {workbooks[path]}): {len(df)} hodnot")
+            if not df.empty:
+                frames.append(df)
+
+    if not frames:
+        return result
+
+    imported = pd.concat(frames, ignore_index=True)
+    imported['NazevId'] = NameMatcher.from_dataframe(typy_df, name_col='Nazev').match_many(imported['Typ'])
+    result['unmapped_types'] = sorted(set(imported.loc[imported['NazevId'].isna(), 'Typ']))
+    imported = imported.dropna(subset=['NazevId'])
+    imported['NazevId'] = imported['NazevId'].astype(int)
+
+    key = ['PodnikID', 'Year', 'NazevId']
+    imported = imported.groupby(key, as_index=False)['Velikost'].sum()
+    imported['Velikost'] = imported['Velikost'].round(2)
+
+    existing = pozemky_df[key + ['id', 'Velikost']].drop_duplicates(subset=key)
+    merged = imported.merge(existing, on=key, how='left', suffixes=('', '_puvodni'))
+
+    is_new = merged['id'].isna()
+    is_changed = ~is_new & (merged['Velikost'].round(2) != merged['Velikost_puvodni'].round(2))
+    result['inserted'] = int(is_new.sum())
+    result['updated'] = int(is_changed.sum())
+    result['unchanged'] = int((~is_new & ~is_changed).sum())
+
+    if dry_run or not (is_new.any() or is_changed.any()):
+        return result
+
+    # Změněné výměry přepsat v místě
+    updates = merged[is_changed].set_index('id')['Velikost']
+    row_ids = pozemky_df['id'].map(updates)
+    pozemky_df['Velikost'] = row_ids.where(row_ids.notna(), pozemky_df['Velikost'])
+
+    # Nové řádky s ID ze sekvence tabulky
+    inserts = merged.loc[is_new, key + ['Velikost']].copy()
+    inserts['id'] = list(IdAllocator(data_dir).allocate('pozemky.csv', len(inserts)))
+
+    pozemky_df = pd.concat([pozemky_df, inserts.reindex(columns=pozemky_df.columns)], ignore_index=True)
+    pozemky_df.to_csv(pozemky_path, index=False)
+    return result
+
+
+def main(argv: Optional[List[str]] = None):
+    """Příkazová řádka importu pozemků"""
+    parser = argparse.ArgumentParser(description="Import výměr pozemků z Excel exportů Tekro do pozemky.csv")
+    parser.add_argument('--dir', dest='import_dir', default=os.path.join(config.BASE_DIR, '2025-data', 'pozemky'),
+                        help="Složka s exporty pozemků")
+    parser.add_argument('--data-dir', default=config.DATA_DIR, help="Složka s CSV soubory aplikace")
+    parser.add_argument('--file', action='append', dest='files', help="Importovat jen tento soubor (lze opakovat)")
+    parser.add_argument('--workers', type=int, default=None, help="Počet paralelních procesů")
+    parser.add_argument('--dry-run', action='store_true', help="Jen vypsat změny, nic neukládat")
+    args = parser.parse_args(argv)
+
+    print(f"=== IMPORT POZEMKŮ ZE SLOŽKY {args.import_dir} ===")
+    result = import_pozemky(args.import_dir, args.data_dir, args.files, args.workers, args.dry_run)
+
+    print(f"\nNové: {result['inserted']}, změněné: {result['updated']}, beze změny: {result['unchanged']}")
+
+    if result['unmapped_types']:
+        print(f"\n=== NENAMAPOVANÉ TYPY POZEMKŮ ({len(result['unmapped_types'])}) ===")
+        for typ in result['unmapped_types']:
+            print(f"  - {typ}")
+
+    print("\nDRY RUN - nic nebylo uloženo" if args.dry_run else "\nHOTOVO!")
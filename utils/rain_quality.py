@@ -0,0 +1,194 @@
+"""
+Kontrola kvality dat o srážkách (sbernasrazky)
+"""
+import os
+import pandas as pd
+from typing import Optional, Iterable
+
+
+class RainQuality:
+    """Vektorová kontrola záznamů srážek s uloženými příznaky
+
+    Příznaky (sloupce tabulky příznaků, klíčem je id záznamu):
+        duplicita        - další záznam téhož podniku pro stejný den
+        zaporne          - záporný objem
+        extrem_historie  - objem výrazně nad historickým rozdělením podniku
+        odlehla_sousede  - objem výrazně nad ostatními podniky ve stejný den
+        nula_podezrela   - nula, přestože ostatní podniky hlásí déšť
+        mezera_dni       - počet dnů od předchozího záznamu podniku
+        vypadek          - mezera delší než GAP_DAYS (informativní)
+
+    Záznam je podezřelý, pokud má některý z příznaků FLAGS. Tabulka nese
+    i den záznamu a otisk (podnik, den, objem), podle kterého update pozná
+    záznamy změněné mimo upsert (editor tabulky, ruční zápis do CSV).
+    """
+
+    FLAGS = ['duplicita', 'zaporne', 'extrem_historie', 'odlehla_sousede', 'nula_podezrela']
+    COLUMNS = ['id'] + FLAGS + ['mezera_dni', 'vypadek', 'podezrely', 'datum', 'otisk']
+
+    # Extrém vůči historii: nad HIST_FACTOR x 99. percentil podniku a zároveň nad HIST_MIN_MM
+    HIST_QUANTILE = 0.99
+    HIST_FACTOR = 2.0
+    HIST_MIN_MM = 30.0
+    # Odlehlá hodnota vůči sousedům: nad NEIGHBOUR_FACTOR x průměr ostatních + NEIGHBOUR_MIN_MM
+    NEIGHBOUR_FACTOR = 3.0
+    NEIGHBOUR_MIN_MM = 15.0
+    # Podezřelá nula: průměr ostatních podniků alespoň ZERO_NEIGHBOUR_MM
+    ZERO_NEIGHBOUR_MM = 5.0
+    # Mezera mezi záznamy, od které se hlásí výpadek
+    GAP_DAYS = 14
+
+    def __init__(self, flags_path: str):
+        """
+        Args:
+            flags_path: Cesta k CSV s uloženými příznaky
+        """
+        self.flags_path = flags_path
+        self.flags = None
+        self._hist_limits = None
+
+    @staticmethod
+    def _prepare(srazky: pd.DataFrame) -> pd.DataFrame:
+        df = pd.DataFrame({
+            'id': srazky['id'],
+            'PodnikID': pd.to_numeric(srazky['PodnikID'], errors='coerce'),
+            'datum': pd.to_datetime(srazky['Datum'].astype(str).str[:10], errors='coerce'),
+            'Objem': pd.to_numeric(srazky['Objem'], errors='coerce'),
+        })
+        return df.dropna(subset=['id', 'PodnikID', 'datum'])
+
+    @staticmethod
+    def _fingerprints(df: pd.DataFrame) -> pd.Series:
+        """Otisk (podnik, den, objem) každého záznamu připraveného přes _prepare"""
+        return pd.util.hash_pandas_object(df[['PodnikID', 'datum', 'Objem']], index=False).astype(str)
+
+    def _gaps(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Mezera ke předchozímu záznamu podniku - závisí na celé řadě podniku"""
+        order = df.sort_values(['PodnikID', 'datum', 'id'])
+        mezera = order.groupby('PodnikID')['datum'].diff().dt.days.reindex(df.index)
+        return pd.DataFrame({'id': df['id'], 'mezera_dni': mezera, 'vypadek': mezera > self.GAP_DAYS})
+
+    def _historical_limits(self, df: pd.DataFrame) -> pd.Series:
+        """Horní mez objemu pro každý podnik z jeho historie srážkových dnů"""
+        rainy = df[df['Objem'] > 0]
+        quantiles = rainy.groupby('PodnikID')['Objem'].quantile(self.HIST_QUANTILE)
+        return (quantiles * self.HIST_FACTOR).clip(lower=self.HIST_MIN_MM)
+
+    def compute(self, srazky: pd.DataFrame, dates: Optional[Iterable] = None) -> pd.DataFrame:
+        """
+        Spočítá příznaky pro záznamy (volitelně jen pro vybrané dny)
+
+        Duplicity a kontroly vůči sousedům závisí jen na záznamech téhož dne,
+        po změně tedy stačí přepočítat dotčené dny. Mezera ke předchozímu
+        záznamu se počítá z celé řady podniku - změna jednoho dne posouvá
+        mezeru následujícího záznamu, update ji proto obnovuje všem.
+
+        Args:
+            srazky: Celá tabulka sbernasrazky
+            dates: Dny (YYYY-MM-DD) k přepočtu, None = všechny
+
+        Returns:
+            DataFrame se sloupci COLUMNS
+        """
+        df = self._prepare(srazky)
+        if df.empty:
+            return pd.DataFrame(columns=self.COLUMNS)
+
+        if self._hist_limits is None or dates is None:
+            self._hist_limits = self._historical_limits(df)
+
+        # Předchozí záznam podniku - potřebuje celou řadu podniku
+        df['mezera_dni'] = self._gaps(df)['mezera_dni']
+
+        if dates is not None:
+            dates = pd.to_datetime(pd.Series(list(dates)).astype(str).str[:10], errors='coerce')
+            df = df[df['datum'].isin(dates)]
+            if df.empty:
+                return pd.DataFrame(columns=self.COLUMNS)
+
+        flags = pd.DataFrame({'id': df['id']}, index=df.index)
+
+        # Duplicity - první záznam dne zůstává platný
+        flags['duplicita'] = df.sort_values('id').duplicated(subset=['PodnikID', 'datum']).reindex(df.index)
+
+        flags['zaporne'] = df['Objem'] < 0
+
+        limits = df['PodnikID'].map(self._hist_limits).fillna(self.HIST_MIN_MM)
+        flags['extrem_historie'] = df['Objem'] > limits
+
+        # Průměr ostatních podniků ve stejný den (bez duplicit)
+        unique_day = df[~flags['duplicita']]
+        per_day = unique_day.groupby('datum')['Objem']
+        day_count = per_day.transform('count')
+        day_sum = per_day.transform('sum')
+        others_mean = ((day_sum - unique_day['Objem']) / (day_count - 1)).where(day_count > 1)
+        others = others_mean.reindex(df.index)
+
+        flags['odlehla_sousede'] = (df['Objem'] > others * self.NEIGHBOUR_FACTOR + self.NEIGHBOUR_MIN_MM).fillna(False)
+        flags['nula_podezrela'] = ((df['Objem'] == 0) & (others >= self.ZERO_NEIGHBOUR_MM)).fillna(False)
+
+        flags['mezera_dni'] = df['mezera_dni']
+        flags['vypadek'] = df['mezera_dni'] > self.GAP_DAYS
+        flags['podezrely'] = flags[self.FLAGS].any(axis=1)
+        flags['datum'] = df['datum'].dt.strftime('%Y-%m-%d')
+        flags['otisk'] = self._fingerprints(df)
+        return flags[self.COLUMNS].reset_index(drop=True)
+
+    def load(self) -> pd.DataFrame:
+        """Načte uložené příznaky (prázdné, pokud ještě neexistují)"""
+        if self.flags is None:
+            if os.path.exists(self.flags_path):
+                self.flags = pd.read_csv(self.flags_path, dtype={'datum': str, 'otisk': str})
+            else:
+                self.flags = pd.DataFrame(columns=self.COLUMNS)
+        return self.flags
+
+    def save(self):
+        if self.flags is not None:
+            self.flags.to_csv(self.flags_path, index=False)
+
+    def update(self, srazky: pd.DataFrame, dates: Optional[Iterable] = None) -> pd.DataFrame:
+        """
+        Aktualizuje uložené příznaky
+
+        Přepočítají se dny předané v dates a dny záznamů, které příznaky
+        nemají, změnily podnik, den nebo objem (otisk), nebo byly smazány -
+        u změněného záznamu původní i nový den. Mezery mezi záznamy se
+        obnoví všem záznamům.
+
+        Returns:
+            Aktuální tabulka příznaků
+        """
+        stored = self.load()
+
+        if stored.empty or 'otisk' not in stored.columns:
+            # Bez otisků (starší soubor příznaků) nelze změny poznat - přepočítat vše
+            self.flags = self.compute(srazky)
+            self.save()
+            return self.flags
+
+        df = self._prepare(srazky)
+        current = pd.DataFrame({'id': df['id'], 'datum': df['datum'].dt.strftime('%Y-%m-%d'),
+                                'otisk': self._fingerprints(df)})
+        previous = stored.drop_duplicates('id').set_index('id')
+        known = current['id'].isin(previous.index)
+        modified = known & (current['otisk'].values != previous['otisk'].reindex(current['id']).astype(str).values)
+        deleted = ~stored['id'].isin(current['id'])
+
+        changed = set(pd.Series(list(dates or []), dtype='object').astype(str).str[:10])
+        changed |= set(current.loc[~known | modified, 'datum'])
+        changed |= set(previous.loc[current.loc[modified, 'id'], 'datum'].dropna())
+        changed |= set(stored.loc[deleted, 'datum'].dropna())
+        if not changed:
+            return stored
+
+        fresh = self.compute(srazky, changed)
+        keep = ~deleted & ~stored['id'].isin(fresh['id'])
+        flags = pd.concat([stored[keep], fresh], ignore_index=True) if not fresh.empty else stored[keep].reset_index(drop=True)
+
+        gaps = self._gaps(df).drop_duplicates('id').set_index('id')
+        flags['mezera_dni'] = flags['id'].map(gaps['mezera_dni'])
+        flags['vypadek'] = flags['id'].map(gaps['vypadek']).fillna(False).astype(bool)
+        self.flags = flags[self.COLUMNS]
+        self.save()
+        return self.flags
@@ -0,0 +1,89 @@
+"""
+Předpočítané souhrny srážek podle podniku (den, měsíc, rok)
+"""
+import pandas as pd
+from typing import List, Tuple
+
+
+class RainRollups:
+    """Denní, měsíční a roční součty srážek podniků
+
+    Souhrny se postaví jednou z tabulky sbernasrazky a při každém novém
+    nebo změněném záznamu se jen přičte rozdíl, takže stránky nemusí
+    znovu procházet denní data všech let.
+    """
+
+    def __init__(self, srazky: pd.DataFrame):
+        """
+        Args:
+            srazky: Tabulka sbernasrazky (sloupce PodnikID, Datum, Objem)
+        """
+        self.daily = pd.Series(dtype='float64', index=pd.MultiIndex.from_tuples([], names=['PodnikID', 'datum']))
+        self.monthly = pd.Series(dtype='float64', index=pd.MultiIndex.from_tuples([], names=['PodnikID', 'rok', 'mesic']))
+        self.yearly = pd.Series(dtype='float64', index=pd.MultiIndex.from_tuples([], names=['PodnikID', 'rok']))
+
+        if not srazky.empty:
+            self.add(srazky['PodnikID'], srazky['Datum'], srazky['Objem'])
+
+    def add(self, podnik_ids, datumy, objemy):
+        """
+        Přičte objemy srážek do všech souhrnů (vektorově)
+
+        Pro změnu existujícího záznamu se předává rozdíl nová - stará hodnota.
+        """
+        delta = pd.DataFrame({
+            'PodnikID': pd.to_numeric(pd.Series(podnik_ids).reset_index(drop=True), errors='coerce'),
+            'datum': pd.to_datetime(pd.Series(datumy).reset_index(drop=True).astype(str).str[:10], errors='coerce'),
+            'Objem': pd.to_numeric(pd.Series(objemy).reset_index(drop=True), errors='coerce').fillna(0.0),
+        }).dropna(subset=['PodnikID', 'datum'])
+
+        if delta.empty:
+            return
+
+        delta['PodnikID'] = delta['PodnikID'].astype(int)
+        delta['rok'] = delta['datum'].dt.year
+        delta['mesic'] = delta['datum'].dt.month
+
+        self.daily = self.daily.add(delta.groupby(['PodnikID', 'datum'])['Objem'].sum(), fill_value=0.0)
+        self.monthly = self.monthly.add(delta.groupby(['PodnikID', 'rok', 'mesic'])['Objem'].sum(), fill_value=0.0)
+        self.yearly = self.yearly.add(delta.groupby(['PodnikID', 'rok'])['Objem'].sum(), fill_value=0.0)
+
+    def apply_changes(self, changes: List[Tuple[int, str, float]]):
+        """Zapracuje seznam změn (PodnikID, Datum, rozdíl objemu)"""
+        if changes:
+            podnik_ids, datumy, objemy = zip(*changes)
+            self.add(list(podnik_ids), list(datumy), list(objemy))
+
+    def years(self) -> List[int]:
+        """Roky s daty, sestupně"""
+        if self.yearly.empty:
+            return []
+        return sorted({int(y) for y in self.yearly.index.get_level_values('rok')}, reverse=True)
+
+    def month_table(self, year: int) -> pd.DataFrame:
+        """
+        Tabulka podnik x měsíc (1-12) pro daný rok
+
+        Returns:
+            DataFrame s indexem PodnikID a sloupci 1..12 (mm), chybějící měsíce = 0
+        """
+        if self.monthly.empty or year not in self.monthly.index.get_level_values('rok'):
+            return pd.DataFrame(columns=range(1, 13), dtype='float64')
+
+        return (self.monthly.xs(year, level='rok')
+                            .unstack('mesic', fill_value=0.0)
+                            .reindex(columns=range(1, 13), fill_value=0.0))
+
+    def days(self, podnik_id: int, year: int, month: int) -> pd.Series:
+        """Denní srážky podniku v měsíci, indexované dnem v měsíci"""
+        start = pd.Timestamp(year=year, month=month, day=1)
+        end = start + pd.offsets.MonthEnd(0)
+        result = pd.Series(0.0, index=pd.RangeIndex(1, end.day + 1))
+
+        if self.daily.empty or podnik_id not in self.daily.index.get_level_values('PodnikID'):
+            return result
+
+        podnik_days = self.daily.xs(podnik_id, level='PodnikID')
+        podnik_days = podnik_days[(podnik_days.index >= start) & (podnik_days.index <= end)]
+        result.loc[podnik_days.index.day] = podnik_days.values
+        return result
@@ -0,0 +1,193 @@
+"""
+Pohled na data omezený na podniky přihlášeného uživatele
+"""
+import pandas as pd
+import streamlit as st
+from typing import Optional, List
+
+from utils.data_manager import DataManager
+from utils.lazy_table import LazyTable
+
+
+class ScopedData:
+    """DataManager, který u tabulek podniků vrací jen řádky povolených podniků
+
+    Stránky dostanou místo DataManageru tento pohled (viz app.py a
+    config.SCOPED_PAGES) a už samy nefiltrují. Řádky se vybírají přes
+    index hodnot sloupce podniku nad sdílenou cache (DataManager.select),
+    takže stránka kopíruje a zpracovává jen data svých podniků.
+
+    Omezené tabulky jsou v DataManager.SCOPED_TABLES, nabídky se omezují
+    přes odpisy. Číselníky a srážky (DataManager.SHARED_TABLES) zůstávají
+    celé, seznam podniků pro výběr vrací allowed_businesses(). Ostatní
+    tabulky (uživatelé, vazby uživatel-podnik, ...) pohled nevydá vůbec.
+    Zápisy se předávají DataManageru, ale jen pro řádky povolených podniků.
+
+    Z DataManageru se přebírají jen atributy v SHARED (cache, indexy ani
+    nefiltrované metody se přes pohled nedostanou).
+    """
+
+    # Atributy DataManageru dostupné přes pohled beze změny
+    SHARED = frozenset({
+        'base_path', 'YEAR_COLUMNS', 'PODNIK_COLUMNS', 'SCOPED_TABLES', 'SCOPED_CHILDREN', 'SHARED_TABLES',
+        'get_businesses', 'get_crops', 'get_varieties_seed', 'get_roky', 'get_typpozemek', 'get_sbernamista',
+        'get_sbernasrazky', 'srazky', 'get_srazka', 'get_srazky_rollups', 'get_srazky_flags',
+        'get_weather_features',
+    })
+
+    def __init__(self, data_manager, podnik_ids: List[int]):
+        """
+        Args:
+            data_manager: Sdílený DataManager
+            podnik_ids: Povolené podniky (prázdný seznam = žádná data)
+        """
+        self.data_manager = data_manager
+        self.podnik_ids = [int(p) for p in podnik_ids if pd.notna(p)]
+
+    def __getattr__(self, name):
+        # Jen vyjmenované atributy (číselníky, srážky, počasí, cesty), nic dalšího
+        if name in ScopedData.SHARED:
+            return getattr(self.data_manager, name)
+        raise AttributeError(f"ScopedData nezpřístupňuje '{name}'")
+
+    # Dotazy DataManageru volají self.select / self.load_csv, nad pohledem tedy vracejí omezená data
+    query = DataManager.query
+    fields = DataManager.fields
+    pozemky = DataManager.pozemky
+    odpisy = DataManager.odpisy
+    get_fields = DataManager.get_fields
+    get_pozemky = DataManager.get_pozemky
+    get_odpisy = DataManager.get_odpisy
+    get_sumplodiny = DataManager.get_sumplodiny
+
+    def _column(self, filename: str) -> Optional[str]:
+        """Sloupec podniku, pokud se tabulka omezuje"""
+        if filename in self.data_manager.SCOPED_TABLES:
+            return self.data_manager.PODNIK_COLUMNS[filename]
+        return None
+
+    def _visible(self, filename: str) -> bool:
+        """Tabulka je pro pohled dostupná (omezená, podřízená nebo sdílená)"""
+        dm = self.data_manager
+        return filename in dm.SCOPED_TABLES or filename in dm.SCOPED_CHILDREN or filename in dm.SHARED_TABLES
+
+    def _check_table(self, filename: str) -> None:
+        if not self._visible(filename):
+            raise PermissionError(f"Tabulka {filename} není v omezeném pohledu dostupná")
+
+    def _allowed(self, requested=None) -> list:
+        """Požadované podniky zúžené na povolené (None = všechny povolené)"""
+        if requested is None:
+            return list(self.podnik_ids)
+        values = list(requested) if isinstance(requested, (list, tuple, set, pd.Series)) else [requested]
+        return [v for v in values if pd.notna(v) and int(v) in self.podnik_ids]
+
+    def select(self, filename: str, where: Optional[dict] = None,
+               columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Jako DataManager.select, u tabulek podniků navíc jen povolené podniky"""
+        self._check_table(filename)
+        parent = self.data_manager.SCOPED_CHILDREN.get(filename)
+        if parent is not None:
+            # Tabulka bez podniku - řádky patří k povoleným řádkům nadřazené tabulky
+            key, parent_file = parent
+            df = self.data_manager.select(filename, where)
+            if key in df.columns:
+                df = df[df[key].isin(self.select(parent_file, columns=['id']).get('id', []))]
+            return df[[c for c in columns if c in df.columns]] if columns is not None else df
+
+        column = self._column(filename)
+        if column is not None:
+            where = dict(where or {})
+            where[column] = self._allowed(where.get(column))
+        return self.data_manager.select(filename, where, columns)
+
+    def load_csv(self, filename: str, force_reload: bool = False) -> pd.DataFrame:
+        """Celá tabulka, u tabulek podniků jen řádky povolených podniků"""
+        self._check_table(filename)
+        if filename in self.data_manager.SHARED_TABLES:
+            return self.data_manager.load_csv(filename, force_reload)
+        if force_reload:
+            self.data_manager.load_csv(filename, force_reload=True)
+        return self.select(filename)
+
+    def years(self, filename: str, podnik_ids=None) -> List[int]:
+        """Roky s daty povolených podniků"""
+        self._check_table(filename)
+        if self._column(filename) is None:
+            return self.data_manager.years(filename, podnik_ids)
+        allowed = self._allowed(podnik_ids)
+        return self.data_manager.years(filename, allowed) if allowed else []
+
+    def lazy(self, filename: str, where: Optional[dict] = None,
+             columns: Optional[List[str]] = None) -> LazyTable:
+        self._check_table(filename)
+        return LazyTable(self, filename, where, columns)
+
+    def allowed_businesses(self) -> pd.DataFrame:
+        """Podniky uživatele (pro výběr podniku na stránce)"""
+        businesses = self.data_manager.get_businesses()
+        if businesses.empty:
+            return businesses
+        return businesses[businesses['id'].isin(self.podnik_ids)]
+
+    def filter_by_business(self, df: pd.DataFrame, business_ids: List[int]) -> pd.DataFrame:
+        """Jako DataManager.filter_by_business, ale vždy jen povolené podniky"""
+        if 'podnik_id' not in df.columns:
+            return df
+        return df[df['podnik_id'].isin(self._allowed(business_ids or None))]
+
+    # Zápisy
+
+    def _owns(self, filename: str, data: dict) -> bool:
+        """Záznam patří povolenému podniku (sdílené tabulky a řádky bez podniku se nekontrolují)"""
+        if not self._visible(filename):
+            return False
+        column = self._column(filename)
+        if column is None or pd.isna(data.get(column)):
+            return True
+        return bool(self._allowed(data[column]))
+
+    def _owns_ids(self, filename: str, ids) -> bool:
+        """Všechny záznamy s danými ID patří povoleným podnikům"""
+        ids = list(ids)
+        if not self._visible(filename):
+            return False
+        if self._column(filename) is None or not ids:
+            return True
+        everywhere = self.data_manager.select(filename, {'id': ids}, ['id'])
+        return len(self.select(filename, {'id': ids}, ['id'])) == len(everywhere)
+
+    def _denied(self) -> None:
+        st.error("Nemáte přístup k záznamům tohoto podniku")
+
+    def add_record(self, filename: str, data: dict) -> bool:
+        if not self._owns(filename, data):
+            self._denied()
+            return False
+        return self.data_manager.add_record(filename, data)
+
+    def add_records(self, filename: str, rows: List[dict]) -> int:
+        if not all(self._owns(filename, row) for row in rows):
+            self._denied()
+            return 0
+        return self.data_manager.add_records(filename, rows)
+
+    def update_record(self, filename: str, record_id: int, data: dict) -> bool:
+        if not (self._owns_ids(filename, [record_id]) and self._owns(filename, data)):
+            self._denied()
+            return False
+        return self.data_manager.update_record(filename, record_id, data)
+
+    def delete_record(self, filename: str, record_id: int) -> bool:
+        if not self._owns_ids(filename, [record_id]):
+            self._denied()
+            return False
+        return self.data_manager.delete_record(filename, record_id)
+
+    def apply_changes(self, filename: str, changes, defaults: Optional[dict] = None) -> dict:
+        touched = list(changes.deleted) + (changes.updated['id'].tolist() if 'id' in changes.updated.columns else [])
+        rows = [defaults or {}] + changes.updated.to_dict('records') + changes.inserted.to_dict('records')
+        if not (self._owns_ids(filename, touched) and all(self._owns(filename, row) for row in rows)):
+            self._denied()
+            return {}
+        return self.data_manager.apply_changes(filename, changes, defaults)
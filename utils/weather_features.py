@@ -0,0 +1,181 @@
+"""
+Počasí agregované na podnik a rok sklizně (vegetační sezóna)
+"""
+import os
+import pandas as pd
+from typing import Optional, List, Iterable
+
+
+class WeatherFeatures:
+    """Tabulka počasí pro každou dvojici (podnik, rok sklizně)
+
+    Sezóna roku sklizně R trvá od 1. 10. roku R-1 do 31. 7. roku R
+    (ozimy se sejí na podzim). Tabulka se počítá jen pro skupiny, kterých
+    se dotkla nová data: srážky hlásí DataManager přes mark_dirty, změny
+    teplot se poznají podle času úpravy oddílů WeatherStore.
+
+    Sloupce:
+        srazky_sezona_mm - srážky za celou sezónu
+        srazky_jaro_mm   - srážky březen až květen
+        srazky_leto_mm   - srážky červen až červenec
+        max_sucho_dni    - nejdelší řada dnů se srážkami pod DRY_DAY_MM
+        gdd              - růstové stupeň-dny nad GDD_BASE_C (jen dny s teplotou)
+        dni_teplota      - počet dnů, za které je teplota k dispozici
+    """
+
+    SEASON_START_MONTH = 10
+    SEASON_END_MONTH = 7
+    DRY_DAY_MM = 1.0
+    GDD_BASE_C = 5.0
+
+    COLUMNS = ['podnik_id', 'rok_sklizne', 'srazky_sezona_mm', 'srazky_jaro_mm',
+               'srazky_leto_mm', 'max_sucho_dni', 'gdd', 'dni_teplota']
+
+    def __init__(self, rollups, weather_store):
+        """
+        Args:
+            rollups: RainRollups se denními srážkami podniků
+            weather_store: WeatherStore s teplotami
+        """
+        self.rollups = rollups
+        self.weather_store = weather_store
+        self._table = pd.DataFrame(columns=self.COLUMNS).set_index(['podnik_id', 'rok_sklizne'])
+        self._dirty = None  # None = přepočítat vše
+        self._weather_mtimes = {}
+
+    @classmethod
+    def harvest_year(cls, dates: pd.Series) -> pd.Series:
+        """Rok sklizně pro datum, mimo sezónu (srpen, září) NaN"""
+        month = dates.dt.month
+        year = dates.dt.year + (month >= cls.SEASON_START_MONTH).astype(int)
+        in_season = (month >= cls.SEASON_START_MONTH) | (month <= cls.SEASON_END_MONTH)
+        return year.where(in_season)
+
+    def mark_dirty(self, podnik_ids: Iterable[int], datumy: Iterable[str]):
+        """Označí skupiny (podnik, rok sklizně) zasažené novými záznamy"""
+        if self._dirty is None:
+            return
+        dates = pd.to_datetime(pd.Series(list(datumy)).astype(str).str[:10], errors='coerce')
+        years = self.harvest_year(dates)
+        for podnik_id, year in zip(podnik_ids, years):
+            if pd.notna(year):
+                self._dirty.add((int(podnik_id), int(year)))
+
+    def _check_weather_changes(self):
+        """Najde oddíly počasí změněné od posledního výpočtu"""
+        for path in self.weather_store.partitions():
+            mtime = os.path.getmtime(path)
+            if self._weather_mtimes.get(path) == mtime:
+                continue
+            self._weather_mtimes[path] = mtime
+            if self._dirty is None:
+                continue
+            year = int(os.path.basename(os.path.dirname(path))[4:])
+            podnik_id = int(os.path.basename(path)[len('podnik='):-len('.parquet')])
+            # Kalendářní rok zasahuje do dvou sezón
+            self._dirty.update({(podnik_id, year), (podnik_id, year + 1)})
+
+    def _daily_frame(self, groups: Optional[set]) -> pd.DataFrame:
+        """Denní srážky a teploty pro vybrané skupiny na souvislém kalendáři"""
+        rain = self.rollups.daily.rename('rain_mm').reset_index()
+        rain.columns = ['podnik_id', 'date', 'rain_mm']
+
+        if groups is None:
+            temps = self.weather_store.load(columns=['temp_c'])
+        else:
+            # Jen oddíly počasí dotčených podniků a sezón
+            years = [year for _, year in groups]
+            temps = self.weather_store.load(
+                podnik_ids=sorted({podnik_id for podnik_id, _ in groups}),
+                start=f"{min(years) - 1}-{self.SEASON_START_MONTH:02d}-01",
+                end=f"{max(years)}-12-31",
+                columns=['temp_c']
+            )
+        temps = temps.dropna(subset=['temp_c']) if not temps.empty else temps
+
+        daily = rain.merge(temps, on=['podnik_id', 'date'], how='outer') if not temps.empty else rain.assign(temp_c=float('nan'))
+        if daily.empty:
+            return daily
+
+        daily['date'] = pd.to_datetime(daily['date'])
+        daily['rok_sklizne'] = self.harvest_year(daily['date'])
+        daily = daily.dropna(subset=['rok_sklizne'])
+        daily['rok_sklizne'] = daily['rok_sklizne'].astype(int)
+        daily['podnik_id'] = daily['podnik_id'].astype(int)
+
+        if groups is not None:
+            keys = pd.MultiIndex.from_frame(daily[['podnik_id', 'rok_sklizne']])
+            daily = daily[keys.isin(list(groups))]
+
+        # Souvislý kalendář sezóny až do posledního záznamu skupiny
+        # (dny bez záznamu se berou jako dny beze srážek)
+        bounds = daily.groupby(['podnik_id', 'rok_sklizne'])['date'].max().reset_index()
+        calendars = [
+            pd.DataFrame({
+                'podnik_id': podnik_id,
+                'rok_sklizne': year,
+                'date': pd.date_range(pd.Timestamp(year=year - 1, month=self.SEASON_START_MONTH, day=1), last)
+            })
+            for podnik_id, year, last in bounds.itertuples(index=False)
+        ]
+        if not calendars:
+            return daily.iloc[0:0]
+
+        calendar = pd.concat(calendars, ignore_index=True)
+        daily = calendar.merge(daily, on=['podnik_id', 'rok_sklizne', 'date'], how='left')
+        daily['rain_mm'] = daily['rain_mm'].fillna(0.0)
+        return daily
+
+    def _compute(self, groups: Optional[set]) -> pd.DataFrame:
+        daily = self._daily_frame(groups)
+        if daily.empty:
+            return pd.DataFrame(columns=self.COLUMNS).set_index(['podnik_id', 'rok_sklizne'])
+
+        keys = ['podnik_id', 'rok_sklizne']
+        month = daily['date'].dt.month
+        daily['jaro'] = daily['rain_mm'].where(month.between(3, 5), 0.0)
+        daily['leto'] = daily['rain_mm'].where(month.between(6, 7), 0.0)
+        daily['gdd'] = (daily['temp_c'] - self.GDD_BASE_C).clip(lower=0)
+
+        # Délka suchých period: čítač mokrých dnů rozdělí řadu na úseky
+        wet = daily['rain_mm'] >= self.DRY_DAY_MM
+        daily['usek'] = wet.groupby([daily['podnik_id'], daily['rok_sklizne']]).cumsum()
+        daily['sucho'] = (~wet).astype(int)
+        dry_runs = daily.groupby(keys + ['usek'])['sucho'].sum()
+
+        table = daily.groupby(keys).agg(
+            srazky_sezona_mm=('rain_mm', 'sum'),
+            srazky_jaro_mm=('jaro', 'sum'),
+            srazky_leto_mm=('leto', 'sum'),
+            gdd=('gdd', 'sum'),
+            dni_teplota=('temp_c', 'count'),
+        )
+        table['max_sucho_dni'] = dry_runs.groupby(level=keys).max()
+        table.loc[table['dni_teplota'] == 0, 'gdd'] = float('nan')
+        return table[self.COLUMNS[2:]]
+
+    def table(self, podnik_ids: Optional[List[int]] = None) -> pd.DataFrame:
+        """
+        Vrátí tabulku počasí, přepočítanou jen pro změněné skupiny
+
+        Args:
+            podnik_ids: Seznam ID podniků (None = všechny)
+
+        Returns:
+            DataFrame se sloupci COLUMNS
+        """
+        self._check_weather_changes()
+
+        if self._dirty is None:
+            self._table = self._compute(None)
+            self._dirty = set()
+        elif self._dirty:
+            fresh = self._compute(self._dirty)
+            keep = ~self._table.index.isin(list(self._dirty))
+            self._table = pd.concat([self._table[keep], fresh]).sort_index()
+            self._dirty = set()
+
+        result = self._table.reset_index()
+        if podnik_ids is not None:
+            result = result[result['podnik_id'].isin(podnik_ids)]
+        return result
@@ -0,0 +1,210 @@
+"""
+Úložiště denních meteorologických dat (časové řady)
+
+Data jsou uložena sloupcově v Parquet souborech rozdělených podle roku
+a podniku (meteostanice): weather/rok=2025/podnik=1.parquet
+"""
+import os
+import json
+import pandas as pd
+from typing import Optional, List
+
+
+# Meteorologická roční období (zima = prosinec až únor)
+SEASONS = {
+    12: 'zima', 1: 'zima', 2: 'zima',
+    3: 'jaro', 4: 'jaro', 5: 'jaro',
+    6: 'léto', 7: 'léto', 8: 'léto',
+    9: 'podzim', 10: 'podzim', 11: 'podzim',
+}
+
+
+class WeatherStore:
+    """Denní počasí podniků uložené po rocích a stanicích"""
+
+    COLUMNS = ['date', 'podnik_id', 'rain_mm', 'temp_c', 'humidity_pct', 'raw_metrics']
+
+    def __init__(self, base_path: str):
+        """
+        Args:
+            base_path: Kořenová složka úložiště (např. data/weather)
+        """
+        self.base_path = base_path
+        # Cache načtených oddílů: cesta -> (mtime, DataFrame)
+        self.cache = {}
+
+    def _partition_path(self, year: int, podnik_id: int) -> str:
+        return os.path.join(self.base_path, f"rok={int(year)}", f"podnik={int(podnik_id)}.parquet")
+
+    def partitions(self, podnik_ids: Optional[List[int]] = None,
+                   start_year: Optional[int] = None, end_year: Optional[int] = None) -> List[str]:
+        """Vrátí cesty k oddílům, které odpovídají filtru (bez čtení dat)"""
+        if not os.path.isdir(self.base_path):
+            return []
+
+        paths = []
+        for year_dir in sorted(os.listdir(self.base_path)):
+            if not year_dir.startswith('rok='):
+                continue
+            year = int(year_dir[4:])
+            if (start_year is not None and year < start_year) or (end_year is not None and year > end_year):
+                continue
+
+            for name in sorted(os.listdir(os.path.join(self.base_path, year_dir))):
+                if not (name.startswith('podnik=') and name.endswith('.parquet')):
+                    continue
+                podnik_id = int(name[len('podnik='):-len('.parquet')])
+                if podnik_ids is not None and podnik_id not in podnik_ids:
+                    continue
+                paths.append(os.path.join(self.base_path, year_dir, name))
+        return paths
+
+    def _read_partition(self, path: str) -> pd.DataFrame:
+        """Načte oddíl, dokud se soubor nezmění, vrací ho z cache"""
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=self.COLUMNS)
+
+        mtime = os.path.getmtime(path)
+        cached = self.cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        df = pd.read_parquet(path)
+        self.cache[path] = (mtime, df)
+        return df
+
+    def save_days(self, records: List[dict]) -> int:
+        """
+        Uloží denní záznamy počasí (upsert podle podniku a data)
+
+        Args:
+            records: Seznam slovníků s klíči podnik_id, date a výstupem
+                     get_today_weather (rain_mm, temp_c, humidity_pct, raw_metrics)
+
+        Returns:
+            Počet uložených záznamů
+        """
+        if not records:
+            return 0
+
+        new_df = pd.DataFrame([{
+            'date': rec['date'],
+            'podnik_id': int(rec['podnik_id']),
+            'rain_mm': rec.get('rain_mm'),
+            'temp_c': rec.get('temp_c'),
+            'humidity_pct': rec.get('humidity_pct'),
+            'raw_metrics': json.dumps(rec.get('raw_metrics') or {}, ensure_ascii=False, default=str),
+        } for rec in records], columns=self.COLUMNS)
+        new_df['date'] = pd.to_datetime(new_df['date'].astype(str).str[:10])
+        new_df[['rain_mm', 'temp_c', 'humidity_pct']] = new_df[['rain_mm', 'temp_c', 'humidity_pct']].astype('float64')
+
+        # Každý dotčený oddíl se přepíše jen jednou
+        for (year, podnik_id), part in new_df.groupby([new_df['date'].dt.year, 'podnik_id']):
+            path = self._partition_path(year, podnik_id)
+            existing = self._read_partition(path)
+
+            merged = pd.concat([existing, part], ignore_index=True) if not existing.empty else part
+            merged = (merged.drop_duplicates(subset=['date'], keep='last')
+                            .sort_values('date')
+                            .reset_index(drop=True))
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            merged.to_parquet(path, index=False)
+            self.cache.pop(path, None)
+
+        return len(new_df)
+
+    def save_day(self, podnik_id: int, weather: dict) -> int:
+        """Uloží jeden den z výstupu get_today_weather / get_yesterday_weather"""
+        if 'error' in weather or not weather.get('date'):
+            return 0
+        return self.save_days([{**weather, 'podnik_id': podnik_id}])
+
+    def load(self, podnik_ids: Optional[List[int]] = None, start: Optional[str] = None,
+             end: Optional[str] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Načte denní počasí pro rozsah dat
+
+        Čtou se jen oddíly, jejichž rok a podnik spadají do filtru.
+
+        Args:
+            podnik_ids: Seznam ID podniků (None = všechny)
+            start: Počáteční datum (včetně), např. '2025-03-01'
+            end: Koncové datum (včetně)
+            columns: Sloupce k vrácení (date a podnik_id jsou vždy zahrnuty)
+
+        Returns:
+            DataFrame seřazený podle podniku a data
+        """
+        start_ts = pd.Timestamp(start) if start is not None else None
+        end_ts = pd.Timestamp(end) if end is not None else None
+
+        paths = self.partitions(
+            podnik_ids,
+            start_ts.year if start_ts is not None else None,
+            end_ts.year if end_ts is not None else None
+        )
+        frames = [self._read_partition(path) for path in paths]
+        frames = [f for f in frames if not f.empty]
+
+        if not frames:
+            return pd.DataFrame(columns=self.COLUMNS if columns is None else ['date', 'podnik_id'] + list(columns))
+
+        df = pd.concat(frames, ignore_index=True)
+
+        mask = pd.Series(True, index=df.index)
+        if start_ts is not None:
+            mask &= df['date'] >= start_ts
+        if end_ts is not None:
+            mask &= df['date'] <= end_ts
+        df = df[mask]
+
+        if columns is not None:
+            df = df[['date', 'podnik_id'] + [c for c in columns if c not in ('date', 'podnik_id')]]
+
+        return df.sort_values(['podnik_id', 'date']).reset_index(drop=True)
+
+    ROLLUP_COLUMNS = {'rain_mm': 'float64', 'temp_c': 'float64', 'temp_min_c': 'float64',
+                      'temp_max_c': 'float64', 'humidity_pct': 'float64', 'dni': 'int64'}
+
+    def _rollup(self, df: pd.DataFrame, keys: dict) -> pd.DataFrame:
+        """Souhrn podle klíčů (název -> dtype); bez dat prázdná tabulka se stejnými typy"""
+        if df.empty:
+            return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in {**keys, **self.ROLLUP_COLUMNS}.items()})
+
+        return df.groupby(list(keys)).agg(
+            rain_mm=('rain_mm', 'sum'),
+            temp_c=('temp_c', 'mean'),
+            temp_min_c=('temp_c', 'min'),
+            temp_max_c=('temp_c', 'max'),
+            humidity_pct=('humidity_pct', 'mean'),
+            dni=('date', 'count'),
+        ).reset_index()
+
+    def monthly(self, podnik_ids: Optional[List[int]] = None, start: Optional[str] = None,
+                end: Optional[str] = None) -> pd.DataFrame:
+        """Měsíční souhrn: srážky (součet), teplota a vlhkost (průměr), počet dnů"""
+        keys = {'podnik_id': 'int64', 'rok': 'int64', 'mesic': 'int64'}
+        df = self.load(podnik_ids, start, end)
+        if df.empty:
+            return self._rollup(df, keys)
+        df = df.assign(rok=df['date'].dt.year, mesic=df['date'].dt.month)
+        return self._rollup(df, keys)
+
+    def seasonal(self, podnik_ids: Optional[List[int]] = None, start: Optional[str] = None,
+                 end: Optional[str] = None) -> pd.DataFrame:
+        """
+        Souhrn podle ročních období
+
+        Prosinec se počítá do zimy následujícího roku.
+        """
+        keys = {'podnik_id': 'int64', 'rok': 'int64', 'obdobi': 'object'}
+        df = self.load(podnik_ids, start, end)
+        if df.empty:
+            return self._rollup(df, keys)
+        month = df['date'].dt.month
+        df = df.assign(
+            rok=df['date'].dt.year + (month == 12).astype(int),
+            obdobi=month.map(SEASONS)
+        )
+        return self._rollup(df, keys)
@@ -0,0 +1,189 @@
+"""
+Stabilita výnosů polí - variabilita výnosu (CV) po polích a plodinách
+"""
+import warnings
+import numpy as np
+import pandas as pd
+from typing import Optional, Iterable
+
+from utils.field_lineage import lineage_keys
+
+
+def prepare_yields(fields: pd.DataFrame, crops: Optional[pd.DataFrame] = None,
+                   lineage: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Připraví výnosy polí pro výpočet stability
+
+    Args:
+        fields: Tabulka polí (nazev_honu, plodina_id, vymera, cista_vaha, rok_sklizne)
+        crops: Tabulka plodin pro názvy (id, nazev)
+        lineage: Linie polí (id, pole_key) - pole se pak sledují napříč sezónami
+                 i po přejmenování; prázdná tabulka = spočítat v paměti,
+                 None = pole podle názvu honu
+
+    Returns:
+        DataFrame se sloupci pole_key, pole, plodina, rok, vymera, vynos
+        (pole = název z posledního roku linie)
+    """
+    if fields.empty:
+        return pd.DataFrame(columns=['pole_key', 'pole', 'plodina', 'rok', 'vymera', 'vynos'])
+
+    fallback = 'Pole ' + fields['id'].astype(str)
+    pole = fields['nazev_honu'].fillna(fallback) if 'nazev_honu' in fields.columns else fallback
+    rok = pd.to_numeric(fields['rok_sklizne'], errors='coerce') if 'rok_sklizne' in fields.columns else pd.Series(np.nan, index=fields.index)
+
+    if lineage is not None:
+        pole_key = lineage_keys(fields, lineage)
+        latest = pd.DataFrame({'pole_key': pole_key, 'pole': pole, 'rok': rok}).sort_values('rok', kind='stable')
+        pole = pole_key.map(latest.drop_duplicates('pole_key', keep='last').set_index('pole_key')['pole'])
+    else:
+        pole_key = pd.Series(pd.factorize(pole)[0], index=fields.index)
+
+    if crops is not None and not crops.empty:
+        names = crops.drop_duplicates(subset=['id']).set_index('id')['nazev']
+        plodina = fields['plodina_id'].map(names).fillna('Neznámá')
+    else:
+        plodina = pd.Series('Neznámá', index=fields.index)
+
+    vymera = pd.to_numeric(fields['vymera'], errors='coerce')
+    return pd.DataFrame({
+        'pole_key': pole_key,
+        'pole': pole,
+        'plodina': plodina,
+        'rok': rok,
+        'vymera': vymera,
+        'vynos': pd.to_numeric(fields['cista_vaha'], errors='coerce') / vymera,
+    })
+
+
+def _cv(mean: pd.Series, std: pd.Series) -> pd.Series:
+    """Variační koeficient v % (0 pro nekladný průměr)"""
+    return pd.Series(np.where(mean > 0, std / mean * 100, 0.0), index=mean.index)
+
+
+class YieldStability:
+    """Stabilita výnosů nad jednou verzí dat polí
+
+    Výnosy se připraví jednou při založení, tabulky se počítají při každém
+    volání (worker analýz zakládá objekt pro každou úlohu).
+
+    Pozorováním je jeden řádek pole (jako v původní analýze), vážená
+    varianta váží výnosy výměrou. Pole se seskupují podle celočíselného
+    pole_key (linie polí, bez nich podle názvu honu).
+    """
+
+    COLUMNS = ['Pole', 'Plodina', 'Roky', 'Průměr', 'CV (%)', 'Min', 'Max']
+
+    def __init__(self, fields: pd.DataFrame, crops: Optional[pd.DataFrame] = None,
+                 lineage: Optional[pd.DataFrame] = None):
+        self.yields = prepare_yields(fields, crops, lineage)
+        self.names = self.yields.drop_duplicates('pole_key').set_index('pole_key')['pole']
+
+    def years(self) -> list:
+        """Roky sklizně v datech, vzestupně"""
+        return sorted(int(y) for y in self.yields['rok'].dropna().unique())
+
+    def table(self, years: Optional[Iterable[int]] = None, weighted: bool = False,
+              min_years: int = 2) -> pd.DataFrame:
+        """
+        Stabilita výnosu po (pole, plodina) seřazená od nejvyšší variability
+
+        Args:
+            years: Jen tyto roky sklizně (None = všechny)
+            weighted: Průměr a směrodatná odchylka vážené výměrou
+            min_years: Minimální počet pozorování pole
+
+        Returns:
+            DataFrame se sloupci COLUMNS
+        """
+        df = self.yields if years is None else self.yields[self.yields['rok'].isin(list(years))]
+        return self._table(df, weighted, min_years)
+
+    def _table(self, df: pd.DataFrame, weighted: bool, min_years: int) -> pd.DataFrame:
+        df = df.dropna(subset=['vynos'])
+        if weighted:
+            df = df[df['vymera'] > 0]
+            df = df.assign(w=df['vymera'], wx=df['vymera'] * df['vynos'], wx2=df['vymera'] * df['vynos'] ** 2)
+            stats = df.groupby(['pole_key', 'plodina']).agg(
+                Roky=('vynos', 'count'), w=('w', 'sum'), wx=('wx', 'sum'), wx2=('wx2', 'sum'),
+                Min=('vynos', 'min'), Max=('vynos', 'max'))
+            mean = stats['wx'] / stats['w']
+            std = np.sqrt((stats['wx2'] / stats['w'] - mean ** 2).clip(lower=0))
+        else:
+            stats = df.groupby(['pole_key', 'plodina'])['vynos'].agg(['count', 'mean', 'std', 'min', 'max'])
+            stats = stats.rename(columns={'count': 'Roky', 'min': 'Min', 'max': 'Max'})
+            mean, std = stats['mean'], stats['std']
+
+        stats['Průměr'] = mean
+        stats['CV (%)'] = _cv(mean, std)
+        stats = stats[stats['Roky'] >= min_years]
+        result = stats.reset_index().rename(columns={'plodina': 'Plodina'})
+        result['Pole'] = result['pole_key'].map(self.names)
+        return result[self.COLUMNS].sort_values('CV (%)', ascending=False)
+
+    def rolling(self, window: int = 3, weighted: bool = False, min_years: int = 2) -> pd.DataFrame:
+        """
+        Stabilita v klouzavém okně posledních `window` sezón pro každý rok
+
+        Součty po (pole, plodina, rok) se sčítají v okně přes roky najednou
+        pro všechna pole, takže výpočet neprochází skupiny v cyklu.
+
+        Returns:
+            DataFrame se sloupci Rok + COLUMNS (řádek = pole, plodina a konec okna)
+        """
+        # Nekonečné výnosy (nulová výměra) by v klouzavých součtech rozbily celé okno
+        df = self.yields.dropna(subset=['rok'])
+        df = df[np.isfinite(df['vynos'])]
+        if weighted:
+            df = df[df['vymera'] > 0]
+        if df.empty:
+            return pd.DataFrame(columns=['Rok'] + self.COLUMNS)
+
+        w = df['vymera'] if weighted else pd.Series(1.0, index=df.index)
+        df = df.assign(rok=df['rok'].astype(int), w=w, wx=w * df['vynos'], wx2=w * df['vynos'] ** 2)
+        per_year = df.groupby(['pole_key', 'plodina', 'rok']).agg(
+            n=('vynos', 'count'), w=('w', 'sum'), wx=('wx', 'sum'), wx2=('wx2', 'sum'),
+            Min=('vynos', 'min'), Max=('vynos', 'max'))
+
+        # Matice (pole_key, plodina) x rok pro každý součet, okno běží přes sloupce (roky)
+        first_year, last_year = int(df['rok'].min()), int(df['rok'].max())
+        all_years = np.arange(first_year, last_year + 1)
+        wide = per_year.unstack('rok').reindex(columns=pd.MultiIndex.from_product([per_year.columns, all_years]))
+        groups, width = wide.index, min(window, len(all_years))
+
+        windows = {}
+        for col in per_year.columns:
+            values = wide[col].to_numpy(dtype='float64')
+            if col in ('Min', 'Max'):
+                # Na začátku řady je okno kratší - doplnit prázdnými roky
+                padded = np.hstack([np.full((len(values), width - 1), np.nan), values])
+                view = np.lib.stride_tricks.sliding_window_view(padded, width, axis=1)
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore', RuntimeWarning)
+                    rolled = np.nanmin(view, axis=2) if col == 'Min' else np.nanmax(view, axis=2)
+            else:
+                cumsum = np.nancumsum(values, axis=1)
+                rolled = cumsum.copy()
+                rolled[:, width:] -= cumsum[:, :-width]
+            windows[col] = rolled.ravel()
+
+        stats = pd.DataFrame(windows, index=pd.MultiIndex.from_arrays([
+            groups.get_level_values('pole_key').repeat(len(all_years)),
+            groups.get_level_values('plodina').repeat(len(all_years)),
+            np.tile(all_years, len(groups)),
+        ], names=['pole_key', 'plodina', 'rok']))
+        stats = stats[stats['n'] >= min_years]
+        mean = stats['wx'] / stats['w']
+        if weighted:
+            var = stats['wx2'] / stats['w'] - mean ** 2
+        else:
+            # Výběrový rozptyl jako u pandas std (ddof=1)
+            var = (stats['wx2'] - stats['n'] * mean ** 2) / (stats['n'] - 1)
+        stats['Průměr'] = mean
+        stats['CV (%)'] = _cv(mean, np.sqrt(var.clip(lower=0)))
+        stats['Roky'] = stats['n'].astype(int)
+
+        result = stats.reset_index().rename(columns={'plodina': 'Plodina', 'rok': 'Rok'})
+        result['Pole'] = result['pole_key'].map(self.names)
+        result = result[['Rok'] + self.COLUMNS].sort_values(['Rok', 'CV (%)'], ascending=[True, False])
+        return result.reset_index(drop=True)
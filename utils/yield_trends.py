@@ -0,0 +1,166 @@
+"""
+Lineární trendy výnosů pro všechny plodiny najednou (predikce pro agent_app)
+"""
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+
+# Úrovně řad: název -> sloupce klíče (rok je vždy navíc)
+LEVELS = {
+    'plodina': ['plodina_id'],
+    'podnik': ['plodina_id', 'podnik_id'],
+    'odruda': ['plodina_id', 'odruda_id'],
+}
+
+# Sloupce klíče v tabulkách (chybějící úroveň = -1)
+KEY_COLUMNS = ['level', 'plodina_id', 'podnik_id', 'odruda_id']
+
+# Kvantil normálního rozdělení pro 95% interval
+Z_95 = 1.96
+
+
+def yearly_series(fields: pd.DataFrame) -> pd.DataFrame:
+    """
+    Roční výnosy všech řad (plodina, plodina+podnik, plodina+odrůda) pod sebou
+
+    Returns:
+        DataFrame se sloupci KEY_COLUMNS + rok, vymera, cista_vaha, vynos
+    """
+    df = pd.DataFrame({
+        'plodina_id': pd.to_numeric(fields['plodina_id'], errors='coerce'),
+        'podnik_id': pd.to_numeric(fields['podnik_id'], errors='coerce') if 'podnik_id' in fields.columns else np.nan,
+        'odruda_id': pd.to_numeric(fields['odruda_id'], errors='coerce') if 'odruda_id' in fields.columns else np.nan,
+        'rok': pd.to_numeric(fields['rok_sklizne'], errors='coerce'),
+        'vymera': pd.to_numeric(fields['vymera'], errors='coerce'),
+        'cista_vaha': pd.to_numeric(fields['cista_vaha'], errors='coerce'),
+    }).dropna(subset=['plodina_id', 'rok'])
+
+    frames = []
+    for level, keys in LEVELS.items():
+        part = df.dropna(subset=keys).groupby(keys + ['rok'], as_index=False)[['vymera', 'cista_vaha']].sum()
+        part['level'] = level
+        frames.append(part)
+
+    series = pd.concat(frames, ignore_index=True)
+    for col in KEY_COLUMNS[1:]:
+        series[col] = series[col].fillna(-1).astype(int)
+    series['rok'] = series['rok'].astype(int)
+    series['vynos'] = series['cista_vaha'] / series['vymera']
+    series = series[np.isfinite(series['vynos'])]
+    return series[KEY_COLUMNS + ['rok', 'vymera', 'cista_vaha', 'vynos']].sort_values(KEY_COLUMNS + ['rok'])
+
+
+def fit_trends(series: pd.DataFrame) -> pd.DataFrame:
+    """
+    Přímka výnos ~ rok pro každou řadu jedním výpočtem nad všemi body
+
+    Součty pro regresi se počítají přes kódy řad (np.bincount), takže
+    cena nezávisí na počtu řad.
+
+    Returns:
+        DataFrame indexovaný KEY_COLUMNS se sloupci n, last_year, x_mean,
+        sxx, slope, intercept, std_error (směrodatná odchylka reziduí),
+        resid_se (odhad chyby s n-2 stupni volnosti) a r2
+    """
+    codes, uniques = pd.MultiIndex.from_frame(series[KEY_COLUMNS]).factorize()
+    x = series['rok'].to_numpy(dtype='float64')
+    y = series['vynos'].to_numpy(dtype='float64')
+    count = len(uniques)
+
+    n = np.bincount(codes, minlength=count).astype('float64')
+    x_mean = np.bincount(codes, x, count) / n
+    y_mean = np.bincount(codes, y, count) / n
+    # Centrované hodnoty - roky kolem 2020 by v necentrovaných součtech ztrácely přesnost
+    xc = x - x_mean[codes]
+    yc = y - y_mean[codes]
+    sxx = np.bincount(codes, xc * xc, count)
+    sxy = np.bincount(codes, xc * yc, count)
+    syy = np.bincount(codes, yc * yc, count)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+        ssr = np.clip(syy - slope * sxy, 0, None)
+        r2 = np.where(syy > 0, 1 - ssr / syy, 0.0)
+        resid_se = np.where(n > 2, np.sqrt(ssr / (n - 2)), 0.0)
+
+    last_year = np.full(count, -np.inf)
+    np.maximum.at(last_year, codes, x)
+
+    table = pd.DataFrame({
+        'n': n.astype(int),
+        'last_year': last_year.astype(int),
+        'x_mean': x_mean,
+        'sxx': sxx,
+        'slope': slope,
+        'intercept': y_mean - slope * x_mean,
+        'std_error': np.sqrt(ssr / n),
+        'resid_se': resid_se,
+        'r2': r2,
+    }, index=uniques.set_names(KEY_COLUMNS))
+    return table[table['n'] >= 2].sort_index()
+
+
+class YieldTrends:
+    """Tabulka trendů všech řad pro jednu verzi dat
+
+    Regrese pro všechny plodiny, podniky a odrůdy se spočítá jednou při
+    založení; výběr na stránce je pak jen vyhledání řádku tabulky.
+    """
+
+    def __init__(self, fields: pd.DataFrame):
+        self.series = yearly_series(fields).set_index(KEY_COLUMNS)
+        self.coefficients = fit_trends(self.series.reset_index())
+        self.keys = self.coefficients.index.to_frame(index=False)
+
+    @staticmethod
+    def _key(level: str, plodina_id, podnik_id=None, odruda_id=None) -> tuple:
+        return (level, int(plodina_id),
+                int(podnik_id) if podnik_id is not None else -1,
+                int(odruda_id) if odruda_id is not None else -1)
+
+    def history(self, level: str, plodina_id, podnik_id=None, odruda_id=None) -> pd.DataFrame:
+        """Roční výnosy řady (sloupce rok, vymera, cista_vaha, vynos)"""
+        key = self._key(level, plodina_id, podnik_id, odruda_id)
+        if key not in self.series.index:
+            return pd.DataFrame(columns=['rok', 'vymera', 'cista_vaha', 'vynos'])
+        return self.series.loc[[key]].reset_index(drop=True)
+
+    def trend(self, level: str, plodina_id, podnik_id=None, odruda_id=None) -> Optional[pd.Series]:
+        """Koeficienty trendu řady, None pokud řada nemá aspoň 2 roky"""
+        key = self._key(level, plodina_id, podnik_id, odruda_id)
+        if key not in self.coefficients.index:
+            return None
+        return self.coefficients.loc[key]
+
+    def members(self, level: str, plodina_id) -> list:
+        """ID podniků nebo odrůd, které mají pro plodinu trend"""
+        column = {'podnik': 'podnik_id', 'odruda': 'odruda_id'}[level]
+        rows = self.keys[(self.keys['level'] == level) & (self.keys['plodina_id'] == int(plodina_id))]
+        return sorted(rows[column].unique().tolist())
+
+    @staticmethod
+    def forecast(trend: pd.Series, years_ahead: int) -> pd.DataFrame:
+        """
+        Predikce na další roky s 95% predikčním intervalem
+
+        Interval zahrnuje nejistotu přímky i rozptyl kolem ní a s odstupem
+        od posledního roku se rozšiřuje.
+
+        Returns:
+            DataFrame se sloupci Rok, Predikce, Min, Max
+        """
+        years = np.arange(1, years_ahead + 1) + trend['last_year']
+        values = trend['slope'] * years + trend['intercept']
+        spread = trend['resid_se'] * np.sqrt(1 + 1 / trend['n'] + (years - trend['x_mean']) ** 2 / trend['sxx'])
+        return pd.DataFrame({
+            'Rok': years.astype(int),
+            'Predikce': values,
+            'Min': values - Z_95 * spread,
+            'Max': values + Z_95 * spread,
+        })
+
+    def overview(self, level: str = 'plodina') -> pd.DataFrame:
+        """Trendy všech řad úrovně (pro srovnání plodin)"""
+        table = self.coefficients.reset_index()
+        return table[table['level'] == level].drop(columns='level').reset_index(drop=True)